@@ -1,8 +1,168 @@
-from collections import defaultdict
+from collections import defaultdict, deque
+import heapq
 import math
+from operator import itemgetter
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 
+class NegativeCycleError(ValueError):
+    # Levée quand un cycle de poids négatif est atteignable depuis la source ;
+    # cycle contient ses sommets dans l'ordre de parcours des arcs
+    def __init__(self, cycle):
+        super().__init__("Cycle négatif détecté : " + " -> ".join(map(str, cycle)))
+        self.cycle = cycle
+
+
+def _cycle_from_pred(pred, sommets):
+    # Cherche un cycle dans le graphe des prédécesseurs (chaque sommet n'a
+    # qu'un prédécesseur : on suit les pointeurs en marquant chaque remontée)
+    etat = {}
+    for depart in sommets:
+        node = depart
+        while node is not None and node not in etat:
+            etat[node] = depart
+            node = pred.get(node)
+        if node is not None and etat[node] == depart:
+            # node est sur un cycle rencontré pendant cette remontée
+            cycle = [node]
+            courant = pred[node]
+            while courant != node:
+                cycle.append(courant)
+                courant = pred[courant]
+            cycle.reverse()  # remis dans le sens des arcs
+            return cycle
+    return []
+
+
+# ===========================================================
+# Union-Find (ensembles disjoints)
+# ===========================================================
+
+class DisjointSet:
+    # Tableaux parent/taille indexés par entier : compression de chemin
+    # (par division de chemin) + union par taille, quasi O(1) par opération
+    def __init__(self, elements=()):
+        self.index = {}  # élément -> indice
+        self.items = []  # indice -> élément
+        self.parent = []
+        self.size = []
+        self.count = 0  # nombre d'ensembles
+        for x in elements:
+            self.add(x)
+
+    def add(self, x):
+        if x not in self.index:
+            self.index[x] = len(self.items)
+            self.items.append(x)
+            self.parent.append(len(self.parent))
+            self.size.append(1)
+            self.count += 1
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # raccourcit le chemin au passage
+            i = parent[i]
+        return i
+
+    def find(self, x):
+        return self.items[self._find(self.index[x])]
+
+    def union(self, x, y):
+        # Renvoie True si x et y étaient dans deux ensembles différents
+        rx, ry = self._find(self.index[x]), self._find(self.index[y])
+        if rx == ry:
+            return False
+        if self.size[rx] < self.size[ry]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx  # le plus petit arbre passe sous le plus grand
+        self.size[rx] += self.size[ry]
+        self.count -= 1
+        return True
+
+    def connected(self, x, y):
+        return self._find(self.index[x]) == self._find(self.index[y])
+
+    def components(self):
+        groupes = {}
+        for i, x in enumerate(self.items):
+            groupes.setdefault(self._find(i), []).append(x)
+        return list(groupes.values())
+
+
+# ===========================================================
+# Tas binaire indexé (diminution de clé)
+# ===========================================================
+
+class IndexedMinHeap:
+    # Chaque élément apparaît au plus une fois ; pos[item] donne sa place
+    # dans le tas, ce qui permet de diminuer sa clé en O(log n)
+    def __init__(self):
+        self.heap = []  # liste de [clé, élément]
+        self.pos = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def push_or_decrease(self, item, key):
+        # Insère item, ou diminue sa clé si key est meilleure ; True si modifié
+        i = self.pos.get(item)
+        if i is None:
+            self.heap.append([key, item])
+            self.pos[item] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+            return True
+        if key < self.heap[i][0]:
+            self.heap[i][0] = key
+            self._sift_up(i)
+            return True
+        return False
+
+    def pop(self):
+        heap = self.heap
+        self._swap(0, len(heap) - 1)
+        key, item = heap.pop()
+        del self.pos[item]
+        if heap:
+            self._sift_down(0)
+        return key, item
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.pos[heap[i][1]] = i
+        self.pos[heap[j][1]] = j
+
+    def _sift_up(self, i):
+        heap = self.heap
+        while i > 0:
+            p = (i - 1) // 2
+            if heap[i][0] < heap[p][0]:
+                self._swap(i, p)
+                i = p
+            else:
+                break
+
+    def _sift_down(self, i):
+        heap = self.heap
+        n = len(heap)
+        while True:
+            c = 2 * i + 1
+            if c >= n:
+                break
+            if c + 1 < n and heap[c + 1][0] < heap[c][0]:
+                c += 1
+            if heap[c][0] < heap[i][0]:
+                self._swap(i, c)
+                i = c
+            else:
+                break
+
+
 class Graph:
     def __init__(self, directed=False):
         self.graph = defaultdict(list)
@@ -19,6 +179,13 @@ class Graph:
     def get_nodes(self):
         return list(self.graph.keys())
 
+    def _all_nodes(self):
+        # Sommets avec ou sans arc sortant, dans l'ordre d'apparition
+        sommets = dict.fromkeys(self.graph)
+        for _, _, v in self.edges:
+            sommets.setdefault(v)
+        return list(sommets)
+
     def display(self):
         for node, neighbors in self.graph.items():
             print(f"{node} -> {neighbors}")
@@ -26,38 +193,82 @@ class Graph:
     # ----------------------
     # BFS
     # ----------------------
-    def bfs(self, start):
-        visited = set()  # Pour mémoriser les sommets déjà visités
-        queue = [start]  # File d'attente (FIFO) avec le sommet de départ
+    def bfs(self, start, with_levels=False):
         order = []  # Ordre de visite des sommets
+        levels = {}  # Niveau (nombre d'arêtes depuis start) de chaque sommet
+        parent = {}  # Arbre du parcours : sommet -> sommet qui l'a découvert
+        for node, level, father in self._bfs_walk(start):
+            order.append(node)
+            levels[node] = level
+            parent[node] = father
+        if with_levels:
+            return order, levels, parent
+        return order
 
+    def bfs_iter(self, start):
+        # Générateur : produit les sommets au fur et à mesure de leur découverte,
+        # l'appelant peut s'arrêter sans parcourir tout le graphe
+        for node, _, _ in self._bfs_walk(start):
+            yield node
+
+    def _bfs_walk(self, start):
+        visited = {start}  # Un sommet est marqué dès sa mise en file
+        queue = deque([(start, 0)])  # File FIFO : popleft en O(1)
+        yield start, 0, None
         while queue:  # Tant que la file n'est pas vide
-            node = queue.pop(0)  # Retirer le premier élément (comme une file)
-            if node not in visited:
-                visited.add(node)  # Marquer comme visité
-                order.append(node)  # Ajouter à l'ordre de parcours
-                for neighbor, _ in self.graph[node]:  # Parcourir ses voisins
-                    if neighbor not in visited:
-                        queue.append(neighbor)  # Ajouter les voisins à la file
-        return order
+            node, level = queue.popleft()
+            for neighbor, _ in self.graph.get(node, ()):  # Parcourir ses voisins
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append((neighbor, level + 1))
+                    yield neighbor, level + 1, node
 
     # ----------------------
     # DFS
     # ----------------------
-    def dfs(self, start):
-        visited = set()  # Pour mémoriser les sommets déjà visités
-        order = []  # Ordre de visite
-
-        def explore(node):
-            visited.add(node)  # Marquer comme visité
-            order.append(node)  # Enregistrer l'ordre
-            for neighbor, _ in self.graph[node]:
-                if neighbor not in visited:
-                    explore(neighbor)  # Appel récursif
-
-        explore(start)
+    def dfs(self, start, mode="pre", with_times=False):
+        # mode="pre" : ordre de découverte (comme l'ancienne version récursive)
+        # mode="post" : ordre de fin de traitement
+        # with_times=True : renvoie aussi les dates de découverte et de fin
+        order = []
+        discovery, finish = {}, {}
+        for time, (event, node) in enumerate(self._dfs_walk(start)):
+            if event == "pre":
+                discovery[node] = time
+            else:
+                finish[node] = time
+            if event == mode:
+                order.append(node)
+        if with_times:
+            return order, discovery, finish
         return order
 
+    def dfs_iter(self, start, mode="pre"):
+        # Générateur : produit les sommets au fil du parcours
+        for event, node in self._dfs_walk(start):
+            if event == mode:
+                yield node
+
+    def _dfs_walk(self, start, visited=None):
+        # Pile explicite de (sommet, itérateur sur ses voisins) : pas de récursion,
+        # donc pas de RecursionError sur les longues chaînes
+        if visited is None:
+            visited = set()  # Pour mémoriser les sommets déjà visités
+        visited.add(start)
+        yield "pre", start
+        stack = [(start, iter(self.graph.get(start, ())))]
+        while stack:
+            node, voisins = stack[-1]
+            for neighbor, _ in voisins:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    yield "pre", neighbor
+                    stack.append((neighbor, iter(self.graph.get(neighbor, ()))))
+                    break
+            else:
+                stack.pop()  # tous les voisins sont traités
+                yield "post", node
+
     # ----------------------
     # Kruskal
     # ----------------------
@@ -65,144 +276,224 @@ class Graph:
         if self.directed:
             raise ValueError("Kruskal ne s'applique qu'aux graphes non orientés !")
 
-        parent = {n: n for n in self.graph}
-
-        def find(n):
-            while parent[n] != n:
-                n = parent[n]
-            return n
+        sommets = self._all_nodes()
+        ds = DisjointSet(sommets)
+        rang = ds.index
+        # Chaque arête non orientée est stockée dans les deux sens : on n'en garde qu'un
+        aretes = [(w, u, v) for w, u, v in self.edges if rang[u] < rang[v]]
 
         mst, total = [], 0
-        for w, u, v in sorted(self.edges):  # tri automatique par le poids
-            if find(u) != find(v):
-                parent[find(v)] = find(u)
+        for w, u, v in sorted(aretes, key=itemgetter(0)):  # tri par le poids
+            if ds.union(u, v):
                 mst.append((u, v, w))
                 total += w
+                if len(mst) == len(sommets) - 1:
+                    break  # l'arbre couvrant est complet
         return mst, total
 
+    def connected_components(self):
+        # Composantes connexes (faiblement connexes si le graphe est orienté)
+        ds = DisjointSet(self._all_nodes())
+        for _, u, v in self.edges:
+            ds.union(u, v)
+        return ds.components()
+
     # ----------------------
     # Prim
     # ----------------------
-    def prim(self, start):
+    def prim(self, start, eager=False):
         if self.directed:
             raise ValueError("Prim ne peut être utilisé que sur un graphe non orienté !")
+        return self._prim_component(start, set(), eager)
 
-        visited = set([start])
-        edges = [(w, start, v) for v, w in self.graph[start]]
+    def prim_forest(self, eager=False):
+        # Forêt couvrante minimale : un arbre (arêtes, coût) par composante connexe
+        if self.directed:
+            raise ValueError("Prim ne peut être utilisé que sur un graphe non orienté !")
+        visited = set()
+        forest = []
+        for node in self._all_nodes():
+            if node not in visited:
+                forest.append(self._prim_component(node, visited, eager))
+        return forest
+
+    def _prim_component(self, start, visited, eager):
+        if eager:
+            return self._prim_eager(start, visited)
+
+        # Version paresseuse : le tas contient des arêtes, on ignore à la sortie
+        # celles dont l'extrémité est déjà dans l'arbre. O(E log E)
+        visited.add(start)
+        edges = []  # tas de (poids, compteur, u, v)
+        compteur = 0
+        for v, w in self.graph.get(start, ()):
+            edges.append((w, compteur, start, v))
+            compteur += 1
+        heapq.heapify(edges)
         mst = []
         total_cost = 0
 
         while edges:
-            # trouve l'arête de poids minimal
-            min_index = 0
-            for i in range(len(edges)):
-                if edges[i][0] < edges[min_index][0]:
-                    min_index = i
-            w, u, v = edges.pop(min_index)
-
+            w, _, u, v = heapq.heappop(edges)  # arête de poids minimal
             if v not in visited:
                 visited.add(v)
                 mst.append((u, v, w))
                 total_cost += w
-                for to, weight in self.graph[v]:
+                for to, weight in self.graph.get(v, ()):
                     if to not in visited:
-                        edges.append((weight, v, to))
+                        heapq.heappush(edges, (weight, compteur, v, to))
+                        compteur += 1
+
+        return mst, total_cost
+
+    def _prim_eager(self, start, visited):
+        # Version immédiate : un seul candidat par sommet hors de l'arbre,
+        # sa clé est diminuée quand une arête moins chère apparaît. O(E log V)
+        tas = IndexedMinHeap()
+        best = {}  # sommet -> (poids, extrémité dans l'arbre)
+        compteur = 0
+        tas.push_or_decrease(start, (0, compteur))
+        mst = []
+        total_cost = 0
+
+        while tas:
+            _, u = tas.pop()
+            visited.add(u)
+            if u in best:
+                w, father = best.pop(u)
+                mst.append((father, u, w))
+                total_cost += w
+            for to, weight in self.graph.get(u, ()):
+                if to not in visited:
+                    compteur += 1
+                    if tas.push_or_decrease(to, (weight, compteur)):
+                        best[to] = (weight, u)
 
         return mst, total_cost
 
     # ----------------------
     # Dijkstra
     # ----------------------
-    def dijkstra(self, start):
-        print(f"\n=== Algorithme de Dijkstra (depuis {start}) ===")
+    def dijkstra(self, start, target=None, with_pred=False):
         # Initialisation
         dist = {node: math.inf for node in self.graph}
         dist[start] = 0
+        pred = {start: None}  # prédécesseur de chaque sommet atteint
         visited = set()
-        while len(visited) < len(self.graph):
-            # Trouver le nœud non visité avec la plus petite distance
-            min_node = None
-            min_dist = math.inf
-            for node in self.graph:
-                if node not in visited and dist[node] < min_dist:
-                    min_dist = dist[node]
-                    min_node = node
-
-            if min_node is None:
-                break  # Tous les nœuds atteignables ont été visités
-
-            # Marquer le nœud comme visité
-            visited.add(min_node)
+        # File de priorité (distance, compteur, sommet) : le compteur départage
+        # les égalités sans jamais comparer deux sommets entre eux
+        tas = [(0, 0, start)]
+        compteur = 1
+
+        while tas:
+            d, _, node = heapq.heappop(tas)
+            if node in visited:
+                continue  # entrée périmée (suppression paresseuse)
+            visited.add(node)
+            if node == target:
+                break  # la cible est fixée : sa distance ne changera plus
 
             # Mettre à jour les distances des voisins
-            for neighbor, weight in self.graph[min_node]:
+            for neighbor, weight in self.graph.get(node, ()):
                 if neighbor not in visited:
-                    new_dist = dist[min_node] + weight
-                    if new_dist < dist[neighbor]:
+                    new_dist = d + weight
+                    if new_dist < dist.get(neighbor, math.inf):
                         dist[neighbor] = new_dist
+                        pred[neighbor] = node
+                        heapq.heappush(tas, (new_dist, compteur, neighbor))
+                        compteur += 1
 
-        # Affichage des résultats
-        for node in dist:
-            d = "∞" if dist[node] == math.inf else dist[node]
-            print(f"Distance minimale de {start} à {node} = {d}")
-
+        if with_pred:
+            return dist, pred
         return dist
 
     # ----------------------
     # Bellman-Ford
     # ----------------------
-    def bellman_ford(self, start):
-        # Initialisation : toutes les distances à l'infini
-        dist = {node: math.inf for node in self.graph}
-        # La distance du sommet de départ à lui-même est 0
+    def bellman_ford(self, start, method="spfa"):
+        # method="spfa" : file des sommets dont la distance vient de baisser
+        # method="passes" : passes complètes, arrêt dès qu'une passe ne change rien
+        # Un cycle négatif atteignable lève NegativeCycleError (avec ses sommets)
+        if method not in ("spfa", "passes"):
+            raise ValueError(f"Méthode inconnue : {method}")
+        sommets = self._all_nodes()
+        if start not in sommets:
+            sommets.append(start)
+        # Initialisation : toutes les distances à l'infini, 0 pour la source
+        dist = {s: math.inf for s in sommets}
+        pred = {s: None for s in sommets}  # dictionnaire des prédécesseurs
         dist[start] = 0
 
-        # Étape 1 : Relaxation des arêtes |V| - 1 fois
-        # (où |V| = nombre de sommets)
-        for _ in range(len(self.graph) - 1):
-            for w, u, v in self.edges:
-                # Si le chemin passant par u vers v est plus court, on met à jour
-                if dist[u] + w < dist[v]:
-                    dist[v] = dist[u] + w
-
-        # Étape 2 : Détection de cycle de poids négatif
-        # Si une relaxation est encore possible, il y a un cycle négatif
-        for w, u, v in self.edges:
-            if dist[u] + w < dist[v]:
-                print("Cycle négatif détecté !")
-                return None
-
-        # Retourne les distances minimales depuis le sommet de départ
+        if method == "passes":
+            self._bellman_ford_passes(dist, pred, len(sommets))
+        else:
+            self._bellman_ford_spfa(start, dist, pred, len(sommets))
         return dist
 
+    def _bellman_ford_passes(self, dist, pred, n):
+        # Au plus |V| - 1 passes ; une passe sans relaxation termine l'algorithme
+        for _ in range(n - 1):
+            change = False
+            for poids, origine, dest in self.edges:
+                if dist[origine] + poids < dist[dest]:
+                    dist[dest] = dist[origine] + poids
+                    pred[dest] = origine  # mise à jour du prédécesseur
+                    change = True
+            if not change:
+                return
+
+        # Encore une relaxation possible : il y a un cycle de poids négatif
+        for poids, origine, dest in self.edges:
+            if dist[origine] + poids < dist[dest]:
+                pred[dest] = origine
+                raise NegativeCycleError(_cycle_from_pred(pred, [dest] + list(pred)))
+
+    def _bellman_ford_spfa(self, start, dist, pred, n):
+        # Seuls les arcs sortant d'un sommet amélioré sont relâchés.
+        # longueur[v] = nombre d'arcs du chemin courant ; >= |V| => cycle négatif
+        longueur = {start: 0}
+        file = deque([start])
+        en_file = {start}
+        while file:
+            u = file.popleft()
+            en_file.discard(u)
+            du = dist[u]
+            for v, poids in self.graph.get(u, ()):
+                if du + poids < dist[v]:
+                    dist[v] = du + poids
+                    pred[v] = u
+                    longueur[v] = longueur[u] + 1
+                    if longueur[v] >= n:
+                        raise NegativeCycleError(_cycle_from_pred(pred, [v] + list(pred)))
+                    if v not in en_file:
+                        en_file.add(v)
+                        file.append(v)
+
     # ----------------------
     # Floyd-Warshall
     # ----------------------
     def floyd_warshall(self):
-        # Liste de tous les sommets du graphe
-        nodes = list(self.graph.keys())
-
-        # Initialisation de la matrice des distances
-        # dist[i][j] = distance minimale connue de i à j
-        dist = {i: {j: math.inf for j in nodes} for i in nodes}
-
-        # Distance nulle pour les boucles (de i à i)
-        # et initialisation des distances directes (arêtes existantes)
-        for node in nodes:
-            dist[node][node] = 0
-            for neighbor, w in self.graph[node]:
-                dist[node][neighbor] = w
-
-        # Triple boucle : programmation dynamique
-        # On teste si passer par un sommet intermédiaire k améliore le chemin i -> j
-        for k in nodes:
-            for i in nodes:
-                for j in nodes:
-                    if dist[i][j] > dist[i][k] + dist[k][j]:
-                        dist[i][j] = dist[i][k] + dist[k][j]
+        # Tous les sommets du graphe (y compris ceux sans arc sortant), numérotés 0..n-1
+        nodes = self._all_nodes()
+        index = {node: i for i, node in enumerate(nodes)}
+        n = len(nodes)
+
+        # Matrice des distances : dist[i, j] = distance minimale connue de i à j
+        # (infini par défaut, arête directe la moins chère sinon, 0 de i à i)
+        dist = np.full((n, n), np.inf)
+        if self.edges:
+            poids, origines, destinations = zip(*self.edges)
+            np.minimum.at(dist, ([index[u] for u in origines], [index[v] for v in destinations]), poids)
+        diag = np.arange(n)
+        dist[diag, diag] = np.minimum(dist[diag, diag], 0.0)
+
+        # Programmation dynamique : une étape k = une seule opération vectorisée,
+        # on teste d'un coup si passer par k améliore chaque chemin i -> j
+        for k in range(n):
+            np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
 
         # Retourne la matrice complète des plus courts chemins
-        return dist
+        return {i: dict(zip(nodes, row)) for i, row in zip(nodes, dist.tolist())}
 
     # ----------------------
     # Affichage graphique du graphe
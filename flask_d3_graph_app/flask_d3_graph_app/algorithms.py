@@ -4,296 +4,1520 @@
 # ===========================================================
 
 from typing import List, Dict, Tuple
-from collections import defaultdict
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Mapping, Sequence
+import heapq
 import math
-import networkx as nx
+import logging
+from operator import itemgetter
+import os
+import shutil
+import threading
+import numpy as np
+
+import apsp
+import dynamic
+from ch import ContractionHierarchy
+from alt import LandmarkIndex
+from jobs import fork_safe_lock
+
+log = logging.getLogger(__name__)
+
+class NegativeCycleError(ValueError):
+    # Levée quand un cycle de poids négatif est atteignable depuis la source ;
+    # cycle contient ses sommets dans l'ordre de parcours des arcs
+    def __init__(self, cycle):
+        super().__init__("Cycle négatif détecté : " + " -> ".join(map(str, cycle)))
+        self.cycle = cycle
+
+
+def _cycle_from_pred(pred, sommets):
+    # Cherche un cycle dans le graphe des prédécesseurs (chaque sommet n'a
+    # qu'un prédécesseur : on suit les pointeurs en marquant chaque remontée)
+    etat = {}
+    for depart in sommets:
+        node = depart
+        while node is not None and node not in etat:
+            etat[node] = depart
+            node = pred.get(node)
+        if node is not None and etat[node] == depart:
+            # node est sur un cycle rencontré pendant cette remontée
+            cycle = [node]
+            courant = pred[node]
+            while courant != node:
+                cycle.append(courant)
+                courant = pred[courant]
+            cycle.reverse()  # remis dans le sens des arcs
+            return cycle
+    return []
+
+
+# ===========================================================
+# Union-Find (ensembles disjoints)
+# ===========================================================
+
+class DisjointSet:
+    # Tableaux parent/taille indexés par entier : compression de chemin
+    # (par division de chemin) + union par taille, quasi O(1) par opération
+    def __init__(self, elements=()):
+        self.index = {}  # élément -> indice
+        self.items = []  # indice -> élément
+        self.parent = []
+        self.size = []
+        self.count = 0  # nombre d'ensembles
+        for x in elements:
+            self.add(x)
+
+    def add(self, x):
+        if x not in self.index:
+            self.index[x] = len(self.items)
+            self.items.append(x)
+            self.parent.append(len(self.parent))
+            self.size.append(1)
+            self.count += 1
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # raccourcit le chemin au passage
+            i = parent[i]
+        return i
+
+    def find(self, x):
+        return self.items[self._find(self.index[x])]
+
+    def union(self, x, y):
+        # Renvoie True si x et y étaient dans deux ensembles différents
+        rx, ry = self._find(self.index[x]), self._find(self.index[y])
+        if rx == ry:
+            return False
+        if self.size[rx] < self.size[ry]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx  # le plus petit arbre passe sous le plus grand
+        self.size[rx] += self.size[ry]
+        self.count -= 1
+        return True
+
+    def connected(self, x, y):
+        return self._find(self.index[x]) == self._find(self.index[y])
+
+    def components(self):
+        groupes = {}
+        for i, x in enumerate(self.items):
+            groupes.setdefault(self._find(i), []).append(x)
+        return list(groupes.values())
+
+
+# ===========================================================
+# Tas binaire indexé (diminution de clé)
+# ===========================================================
+
+class IndexedMinHeap:
+    # Chaque élément apparaît au plus une fois ; pos[item] donne sa place
+    # dans le tas, ce qui permet de diminuer sa clé en O(log n)
+    def __init__(self):
+        self.heap = []  # liste de [clé, élément]
+        self.pos = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def push_or_decrease(self, item, key):
+        # Insère item, ou diminue sa clé si key est meilleure ; True si modifié
+        i = self.pos.get(item)
+        if i is None:
+            self.heap.append([key, item])
+            self.pos[item] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+            return True
+        if key < self.heap[i][0]:
+            self.heap[i][0] = key
+            self._sift_up(i)
+            return True
+        return False
+
+    def pop(self):
+        heap = self.heap
+        self._swap(0, len(heap) - 1)
+        key, item = heap.pop()
+        del self.pos[item]
+        if heap:
+            self._sift_down(0)
+        return key, item
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.pos[heap[i][1]] = i
+        self.pos[heap[j][1]] = j
+
+    def _sift_up(self, i):
+        heap = self.heap
+        while i > 0:
+            p = (i - 1) // 2
+            if heap[i][0] < heap[p][0]:
+                self._swap(i, p)
+                i = p
+            else:
+                break
+
+    def _sift_down(self, i):
+        heap = self.heap
+        n = len(heap)
+        while True:
+            c = 2 * i + 1
+            if c >= n:
+                break
+            if c + 1 < n and heap[c + 1][0] < heap[c][0]:
+                c += 1
+            if heap[c][0] < heap[i][0]:
+                self._swap(i, c)
+                i = c
+            else:
+                break
+
 
 # ===========================================================
 # Classe Graph avec tes algorithmes
 # ===========================================================
 
 class Graph:
-    def __init__(self, directed=False):
+    def __init__(self, directed=False, name=None):
         self.graph = defaultdict(list)
         self.edges = []
         self.directed = directed
+        self.name = name
+        self.version = 0  # incrémentée par mark_graph_modified
+        self.coords = {}  # sommet -> (lat, lon), pour l'heuristique de A*
+        self._reverse = None  # adjacence inversée, construite à la demande
+        self._nodes = set()  # tous les sommets (None : à refaire), pour in / number_of_nodes
+        self._nodes_vus = 0  # len(self.graph) lors de la dernière mise à jour de _nodes
 
     def add_edge(self, u, v, w=1):
         self.graph[u].append((v, w))
         self.edges.append((w, u, v))
+        self._reverse = None
+        if self._nodes is not None:
+            self._nodes.update((u, v))
         if not self.directed:
             self.graph[v].append((u, w))
             self.edges.append((w, v, u))
 
+    # Les trois méthodes suivantes remplacent les listes d'adjacence au lieu de
+    # les modifier sur place : une lecture en cours ne voit pas d'état intermédiaire
+    def add_edges(self, arcs):
+        # arcs : [(u, v, w)] ; comme add_edge pour chacun, en une seule fois
+        ajouts = defaultdict(list)
+        nouveaux = []
+        for u, v, w in arcs:
+            ajouts[u].append((v, w))
+            nouveaux.append((w, u, v))
+            if not self.directed:
+                ajouts[v].append((u, w))
+                nouveaux.append((w, v, u))
+        for u, voisins in ajouts.items():
+            self.graph[u] = self.graph.get(u, []) + voisins
+        self.edges = self.edges + nouveaux
+        self._reverse = None
+        if self._nodes is not None:
+            self._nodes.update(x for _, u, v in nouveaux for x in (u, v))
+
+    def remove_edges(self, paires):
+        # Retire tous les arcs u -> v de chaque paire (et v -> u si non orienté)
+        cibles = set(paires) if self.directed else {a for u, v in paires for a in ((u, v), (v, u))}
+        for u in {u for u, _ in cibles}:
+            if u in self.graph:
+                self.graph[u] = [(x, w) for x, w in self.graph[u] if (u, x) not in cibles]
+        self.edges = [e for e in self.edges if (e[1], e[2]) not in cibles]
+        self._reverse = None
+        self._nodes = None  # un sommet sans arc sortant a pu perdre son dernier arc entrant
+
+    def set_weights(self, poids):
+        # poids : {(u, v): w} ; nouveau poids de tous les arcs u -> v (et v -> u si non orienté)
+        if not self.directed:
+            symetrique = {}
+            for (u, v), w in poids.items():  # la dernière mise à jour d'une arête l'emporte
+                symetrique[(u, v)] = symetrique[(v, u)] = w
+            poids = symetrique
+        for u in {u for u, _ in poids}:
+            if u in self.graph:
+                self.graph[u] = [(x, poids.get((u, x), w)) for x, w in self.graph[u]]
+        self.edges = [(poids.get((u, v), w), u, v) for w, u, v in self.edges]
+        self._reverse = None
+
     def get_nodes(self):
         return list(self.graph.keys())
 
+    def __contains__(self, node):
+        return node in self.graph or node in self._node_set()
+
+    def number_of_nodes(self):
+        return len(self._node_set())
+
+    def _node_set(self):
+        # Tenu à jour par add_edge / add_edges ; refait en entier (O(n + m))
+        # seulement après remove_edges. Les sommets créés directement dans
+        # graph (graph[u] sur le defaultdict) sont repris à la volée.
+        if self._nodes is None:
+            self._nodes = set(self._all_nodes())
+            self._nodes_vus = len(self.graph)
+        elif self._nodes_vus != len(self.graph):
+            self._nodes.update(self.graph)
+            self._nodes_vus = len(self.graph)
+        return self._nodes
+
+    def is_directed(self):
+        return self.directed
+
+    def _all_nodes(self):
+        # Sommets avec ou sans arc sortant, dans l'ordre d'apparition
+        sommets = dict.fromkeys(self.graph)
+        for _, _, v in self.edges:
+            sommets.setdefault(v)
+        return list(sommets)
+
     # ----------------------
     # BFS
     # ----------------------
-    def bfs(self, start):
-        visited = set()
-        queue = [start]
-        order = []
-        while queue:
-            node = queue.pop(0)
-            if node not in visited:
-                visited.add(node)
-                order.append(node)
-                for neighbor, _ in self.graph[node]:
-                    if neighbor not in visited:
-                        queue.append(neighbor)
+    def bfs(self, start, with_levels=False):
+        order = []  # Ordre de visite des sommets
+        levels = {}  # Niveau (nombre d'arêtes depuis start) de chaque sommet
+        parent = {}  # Arbre du parcours : sommet -> sommet qui l'a découvert
+        for node, level, father in self._bfs_walk(start):
+            order.append(node)
+            levels[node] = level
+            parent[node] = father
+        if with_levels:
+            return order, levels, parent
         return order
 
+    def bfs_iter(self, start):
+        # Générateur : produit les sommets au fur et à mesure de leur découverte,
+        # l'appelant peut s'arrêter sans parcourir tout le graphe
+        for node, _, _ in self._bfs_walk(start):
+            yield node
+
+    def _bfs_walk(self, start):
+        visited = {start}  # Un sommet est marqué dès sa mise en file
+        queue = deque([(start, 0)])  # File FIFO : popleft en O(1)
+        yield start, 0, None
+        while queue:  # Tant que la file n'est pas vide
+            node, level = queue.popleft()
+            for neighbor, _ in self.graph.get(node, ()):  # Parcourir ses voisins
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append((neighbor, level + 1))
+                    yield neighbor, level + 1, node
+
     # ----------------------
     # DFS
     # ----------------------
-    def dfs(self, start):
-        visited = set()
+    def dfs(self, start, mode="pre", with_times=False):
+        # mode="pre" : ordre de découverte (comme l'ancienne version récursive)
+        # mode="post" : ordre de fin de traitement
+        # with_times=True : renvoie aussi les dates de découverte et de fin
         order = []
+        discovery, finish = {}, {}
+        for time, (event, node) in enumerate(self._dfs_walk(start)):
+            if event == "pre":
+                discovery[node] = time
+            else:
+                finish[node] = time
+            if event == mode:
+                order.append(node)
+        if with_times:
+            return order, discovery, finish
+        return order
 
-        def explore(node):
-            visited.add(node)
-            order.append(node)
-            for neighbor, _ in self.graph[node]:
+    def dfs_iter(self, start, mode="pre"):
+        # Générateur : produit les sommets au fil du parcours
+        for event, node in self._dfs_walk(start):
+            if event == mode:
+                yield node
+
+    def _dfs_walk(self, start, visited=None):
+        # Pile explicite de (sommet, itérateur sur ses voisins) : pas de récursion,
+        # donc pas de RecursionError sur les longues chaînes
+        if visited is None:
+            visited = set()  # Pour mémoriser les sommets déjà visités
+        visited.add(start)
+        yield "pre", start
+        stack = [(start, iter(self.graph.get(start, ())))]
+        while stack:
+            node, voisins = stack[-1]
+            for neighbor, _ in voisins:
                 if neighbor not in visited:
-                    explore(neighbor)
+                    visited.add(neighbor)
+                    yield "pre", neighbor
+                    stack.append((neighbor, iter(self.graph.get(neighbor, ()))))
+                    break
+            else:
+                stack.pop()  # tous les voisins sont traités
+                yield "post", node
 
-        explore(start)
+    # ----------------------
+    # Tri topologique
+    # ----------------------
+    def topological_sort(self):
+        if not self.directed:
+            raise ValueError("Le tri topologique ne s'applique qu'aux graphes orientés !")
+        visited = set()
+        post = []
+        for node in self._all_nodes():
+            if node not in visited:
+                post.extend(n for event, n in self._dfs_walk(node, visited) if event == "post")
+        order = post[::-1]  # ordre postfixe inversé
+
+        position = {n: i for i, n in enumerate(order)}
+        for _, u, v in self.edges:
+            if position[u] >= position[v]:
+                raise ValueError("Le graphe contient un cycle : pas d'ordre topologique !")
         return order
 
+    # ----------------------
+    # Composantes fortement connexes (Kosaraju)
+    # ----------------------
+    def strongly_connected_components(self):
+        # 1) ordre postfixe sur le graphe ; 2) parcours du graphe inversé
+        # dans l'ordre postfixe décroissant : chaque arbre est une composante
+        visited = set()
+        post = []
+        for node in self._all_nodes():
+            if node not in visited:
+                post.extend(n for event, n in self._dfs_walk(node, visited) if event == "post")
+
+        reverse = Graph(directed=True)
+        for w, u, v in self.edges:
+            reverse.add_edge(v, u, w)
+
+        visited = set()
+        components = []
+        for node in reversed(post):
+            if node not in visited:
+                components.append([n for event, n in reverse._dfs_walk(node, visited) if event == "pre"])
+        return components
+
     # ----------------------
     # Kruskal
     # ----------------------
     def kruskal(self):
         if self.directed:
             raise ValueError("Kruskal ne s'applique qu'aux graphes non orientés !")
-        parent = {n: n for n in self.graph}
-
-        def find(n):
-            while parent[n] != n:
-                n = parent[n]
-            return n
-
-        acpm, total = [], 0
-        for w, u, v in sorted(self.edges):
-            if find(u) != find(v):
-                parent[find(v)] = find(u)
-                acpm.append((u, v, w))
+
+        sommets = self._all_nodes()
+        ds = DisjointSet(sommets)
+        rang = ds.index
+        # Chaque arête non orientée est stockée dans les deux sens : on n'en garde qu'un
+        aretes = [(w, u, v) for w, u, v in self.edges if rang[u] < rang[v]]
+
+        mst, total = [], 0
+        for w, u, v in sorted(aretes, key=itemgetter(0)):  # tri par le poids
+            if ds.union(u, v):
+                mst.append((u, v, w))
                 total += w
-        return acpm, total
+                if len(mst) == len(sommets) - 1:
+                    break  # l'arbre couvrant est complet
+        return mst, total
+
+    def connected_components(self):
+        # Composantes connexes (faiblement connexes si le graphe est orienté)
+        ds = DisjointSet(self._all_nodes())
+        for _, u, v in self.edges:
+            ds.union(u, v)
+        return ds.components()
 
     # ----------------------
     # Prim
     # ----------------------
-    def prim(self, start):
+    def prim(self, start, eager=False):
         if self.directed:
             raise ValueError("Prim ne peut être utilisé que sur un graphe non orienté !")
-        sommets_visites = set([start])
-        aretes = [(w, start, v) for v, w in self.graph[start]]
-        acpm = []
-        cout_total = 0
-        while aretes:
-            min_index = 0
-            for i in range(len(aretes)):
-                if aretes[i][0] < aretes[min_index][0]:
-                    min_index = i
-            w, u, v = aretes.pop(min_index)
-            if v not in sommets_visites:
-                sommets_visites.add(v)
-                acpm.append((u, v, w))
-                cout_total += w
-                for to, weight in self.graph[v]:
-                    if to not in sommets_visites:
-                        aretes.append((weight, v, to))
-        return acpm, cout_total
+        return self._prim_component(start, set(), eager)
+
+    def prim_forest(self, eager=False):
+        # Forêt couvrante minimale : un arbre (arêtes, coût) par composante connexe
+        if self.directed:
+            raise ValueError("Prim ne peut être utilisé que sur un graphe non orienté !")
+        visited = set()
+        forest = []
+        for node in self._all_nodes():
+            if node not in visited:
+                forest.append(self._prim_component(node, visited, eager))
+        return forest
+
+    def _prim_component(self, start, visited, eager):
+        if eager:
+            return self._prim_eager(start, visited)
+
+        # Version paresseuse : le tas contient des arêtes, on ignore à la sortie
+        # celles dont l'extrémité est déjà dans l'arbre. O(E log E)
+        visited.add(start)
+        edges = []  # tas de (poids, compteur, u, v)
+        compteur = 0
+        for v, w in self.graph.get(start, ()):
+            edges.append((w, compteur, start, v))
+            compteur += 1
+        heapq.heapify(edges)
+        mst = []
+        total_cost = 0
+
+        while edges:
+            w, _, u, v = heapq.heappop(edges)  # arête de poids minimal
+            if v not in visited:
+                visited.add(v)
+                mst.append((u, v, w))
+                total_cost += w
+                for to, weight in self.graph.get(v, ()):
+                    if to not in visited:
+                        heapq.heappush(edges, (weight, compteur, v, to))
+                        compteur += 1
+
+        return mst, total_cost
+
+    def _prim_eager(self, start, visited):
+        # Version immédiate : un seul candidat par sommet hors de l'arbre,
+        # sa clé est diminuée quand une arête moins chère apparaît. O(E log V)
+        tas = IndexedMinHeap()
+        best = {}  # sommet -> (poids, extrémité dans l'arbre)
+        compteur = 0
+        tas.push_or_decrease(start, (0, compteur))
+        mst = []
+        total_cost = 0
+
+        while tas:
+            _, u = tas.pop()
+            visited.add(u)
+            if u in best:
+                w, father = best.pop(u)
+                mst.append((father, u, w))
+                total_cost += w
+            for to, weight in self.graph.get(u, ()):
+                if to not in visited:
+                    compteur += 1
+                    if tas.push_or_decrease(to, (weight, compteur)):
+                        best[to] = (weight, u)
+
+        return mst, total_cost
 
     # ----------------------
     # Dijkstra
     # ----------------------
-    def dijkstra(self, start):
+    def dijkstra(self, start, target=None, with_pred=False):
+        # Initialisation
         dist = {node: math.inf for node in self.graph}
         dist[start] = 0
+        pred = {start: None}  # prédécesseur de chaque sommet atteint
         visited = set()
-        while len(visited) < len(self.graph):
-            min_node = None
-            min_dist = math.inf
-            for node in self.graph:
-                if node not in visited and dist[node] < min_dist:
-                    min_dist = dist[node]
-                    min_node = node
-            if min_node is None:
-                break
-            visited.add(min_node)
-            for neighbor, weight in self.graph[min_node]:
+        # File de priorité (distance, compteur, sommet) : le compteur départage
+        # les égalités sans jamais comparer deux sommets entre eux
+        tas = [(0, 0, start)]
+        compteur = 1
+
+        while tas:
+            d, _, node = heapq.heappop(tas)
+            if node in visited:
+                continue  # entrée périmée (suppression paresseuse)
+            visited.add(node)
+            if node == target:
+                break  # la cible est fixée : sa distance ne changera plus
+
+            # Mettre à jour les distances des voisins
+            for neighbor, weight in self.graph.get(node, ()):
                 if neighbor not in visited:
-                    new_dist = dist[min_node] + weight
-                    if new_dist < dist[neighbor]:
+                    new_dist = d + weight
+                    if new_dist < dist.get(neighbor, math.inf):
                         dist[neighbor] = new_dist
+                        pred[neighbor] = node
+                        heapq.heappush(tas, (new_dist, compteur, neighbor))
+                        compteur += 1
+
+        if with_pred:
+            return dist, pred
         return dist
 
     # ----------------------
-    # Bellman-Ford
+    # Requêtes point à point : Dijkstra bidirectionnel et A*
     # ----------------------
+    def _reverse_graph(self):
+        # Arcs entrants de chaque sommet (identiques aux sortants si non orienté)
+        if not self.directed:
+            return self.graph
+        if self._reverse is None:
+            reverse = defaultdict(list)
+            for w, u, v in self.edges:
+                reverse[v].append((u, w))
+            self._reverse = reverse
+        return self._reverse
+
+    def bidirectional_dijkstra(self, start, target):
+        # Deux recherches simultanées (depuis start et, sur les arcs inversés,
+        # depuis target) ; arrêt quand la somme des deux têtes de file dépasse
+        # le meilleur chemin déjà trouvé. Renvoie (chemin, coût).
+        if start == target:
+            return [start], 0
+        graphes = (self.graph, self._reverse_graph())
+        dist = ({start: 0}, {target: 0})
+        pred = ({start: None}, {target: None})
+        visited = (set(), set())
+        tas = ([(0, 0, start)], [(0, 0, target)])
+        compteur = 1
+        meilleur, milieu = math.inf, None
+
+        while tas[0] and tas[1]:
+            if tas[0][0][0] + tas[1][0][0] >= meilleur:
+                break
+            cote = 0 if tas[0][0][0] <= tas[1][0][0] else 1  # file la moins avancée
+            d, _, node = heapq.heappop(tas[cote])
+            if node in visited[cote]:
+                continue
+            visited[cote].add(node)
+            autre = 1 - cote
+            for neighbor, weight in graphes[cote].get(node, ()):
+                new_dist = d + weight
+                if new_dist < dist[cote].get(neighbor, math.inf):
+                    dist[cote][neighbor] = new_dist
+                    pred[cote][neighbor] = node
+                    heapq.heappush(tas[cote], (new_dist, compteur, neighbor))
+                    compteur += 1
+                if neighbor in dist[autre] and new_dist + dist[autre][neighbor] < meilleur:
+                    # chemin complet start -> node -> neighbor -> target
+                    meilleur = dist[cote][neighbor] + dist[autre][neighbor]
+                    milieu = neighbor
+
+        if milieu is None:
+            return [], math.inf
+        chemin = []
+        node = milieu
+        while node is not None:  # moitié avant, remontée jusqu'à start
+            chemin.append(node)
+            node = pred[0][node]
+        chemin.reverse()
+        node = pred[1][milieu]
+        while node is not None:  # moitié arrière, descente jusqu'à target
+            chemin.append(node)
+            node = pred[1][node]
+        return chemin, meilleur
+
+    def astar(self, start, target, heuristic):
+        # heuristic(node) : minorant du coût node -> target (admissible).
+        # Un sommet peut être réouvert si l'heuristique n'est pas monotone.
+        # Renvoie (chemin, coût).
+        dist = {start: 0}
+        pred = {start: None}
+        tas = [(heuristic(start), 0, 0, start)]
+        compteur = 1
+        while tas:
+            _, d, _, node = heapq.heappop(tas)
+            if d > dist[node]:
+                continue  # entrée périmée
+            if node == target:
+                chemin = []
+                while node is not None:
+                    chemin.append(node)
+                    node = pred[node]
+                return chemin[::-1], d
+            for neighbor, weight in self.graph.get(node, ()):
+                new_dist = d + weight
+                if new_dist < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_dist
+                    pred[neighbor] = node
+                    heapq.heappush(tas, (new_dist + heuristic(neighbor), new_dist, compteur, neighbor))
+                    compteur += 1
+        return [], math.inf
+
     # ----------------------
     # Bellman-Ford avec prédécesseurs
     # ----------------------
-    def bellman_ford(self, start):
-        sommets = set(self.graph.keys())
-        for _, u, v in self.edges:
-            sommets.add(u)
-            sommets.add(v)
-
+    def bellman_ford(self, start, method="spfa"):
+        # method="spfa" : file des sommets dont la distance vient de baisser
+        # method="passes" : passes complètes, arrêt dès qu'une passe ne change rien
+        # method="numpy" : passes vectorisées sur les tableaux d'arcs
+        # Un cycle négatif atteignable lève NegativeCycleError (avec ses sommets)
+        if method not in ("spfa", "passes", "numpy"):
+            raise ValueError(f"Méthode inconnue : {method}")
+        if method == "numpy":
+            return self._bellman_ford_numpy(start)
+        sommets = self._all_nodes()
+        if start not in sommets:
+            sommets.append(start)
+        # Initialisation : toutes les distances à l'infini, 0 pour la source
         dist = {s: math.inf for s in sommets}
         pred = {s: None for s in sommets}  # dictionnaire des prédécesseurs
         dist[start] = 0
 
-        # |V|-1 passes de relaxation
-        for _ in range(len(sommets) - 1):
+        if method == "passes":
+            self._bellman_ford_passes(dist, pred, len(sommets))
+        else:
+            self._bellman_ford_spfa(start, dist, pred, len(sommets))
+        return dist, pred
+
+    def _bellman_ford_passes(self, dist, pred, n):
+        # Au plus |V| - 1 passes ; une passe sans relaxation termine l'algorithme
+        for _ in range(n - 1):
+            change = False
             for poids, origine, dest in self.edges:
-                if dist[origine ] + poids < dist[dest]:
+                if dist[origine] + poids < dist[dest]:
                     dist[dest] = dist[origine] + poids
                     pred[dest] = origine  # mise à jour du prédécesseur
+                    change = True
+            if not change:
+                return
 
-        # Détection de cycle de poids négatif
+        # Encore une relaxation possible : il y a un cycle de poids négatif
         for poids, origine, dest in self.edges:
             if dist[origine] + poids < dist[dest]:
-                return None  # convention : None si cycle négatif
+                pred[dest] = origine
+                raise NegativeCycleError(_cycle_from_pred(pred, [dest] + list(pred)))
 
-        # Retourne maintenant distances + prédécesseurs
-        return dist, pred
+    def _bellman_ford_spfa(self, start, dist, pred, n):
+        # Seuls les arcs sortant d'un sommet amélioré sont relâchés.
+        # longueur[v] = nombre d'arcs du chemin courant ; >= |V| => cycle négatif
+        longueur = {start: 0}
+        file = deque([start])
+        en_file = {start}
+        while file:
+            u = file.popleft()
+            en_file.discard(u)
+            du = dist[u]
+            for v, poids in self.graph.get(u, ()):
+                if du + poids < dist[v]:
+                    dist[v] = du + poids
+                    pred[v] = u
+                    longueur[v] = longueur[u] + 1
+                    if longueur[v] >= n:
+                        raise NegativeCycleError(_cycle_from_pred(pred, [v] + list(pred)))
+                    if v not in en_file:
+                        en_file.add(v)
+                        file.append(v)
+
+    def _bellman_ford_numpy(self, start):
+        # Chaque passe relâche tous les arcs d'un coup sur les tableaux NumPy
+        sommets, origines, destinations, poids = self._arc_arrays()
+        if start not in sommets:
+            sommets.append(start)
+        n = len(sommets)
+        s = sommets.index(start)
+        dist = np.full(n, np.inf)
+        dist[s] = 0.0
+        pred = np.full(n, -1, dtype=np.int64)
+
+        for _ in range(n):
+            candidat = dist[origines] + poids
+            nouveau = dist.copy()
+            np.minimum.at(nouveau, destinations, candidat)
+            ameliore = nouveau < dist
+            if not ameliore.any():
+                break  # plus aucune relaxation possible
+            # un arc qui réalise le nouveau minimum devient le prédécesseur
+            gagnant = ameliore[destinations] & (candidat == nouveau[destinations])
+            pred[destinations[gagnant]] = origines[gagnant]
+            dist = nouveau
+        else:
+            # encore des relaxations après |V| passes : cycle négatif, que la
+            # version SPFA sait extraire
+            return self.bellman_ford(start, method="spfa")
+
+        dist_dict = dict(zip(sommets, dist.tolist()))
+        pred_dict = {sommets[i]: (None if p < 0 else sommets[p]) for i, p in enumerate(pred.tolist())}
+        return dist_dict, pred_dict
 
     # ----------------------
     # Floyd-Warshall
     # ----------------------
-    def floyd_warshall(self):
-        # Liste des sommets du graphe
+    def _arc_arrays(self):
+        # Sommets (y compris ceux sans arc sortant) + arcs sous forme de tableaux NumPy
         sommets = list(self.graph.keys())
+        index = {s: i for i, s in enumerate(sommets)}
+        origines, destinations, poids = [], [], []
+        for u, neighs in self.graph.items():
+            for v, w in neighs:
+                if v not in index:
+                    index[v] = len(sommets)
+                    sommets.append(v)
+                origines.append(index[u])
+                destinations.append(index[v])
+                poids.append(w)
+        return (sommets,
+                np.array(origines, dtype=np.int64),
+                np.array(destinations, dtype=np.int64),
+                np.array(poids, dtype=np.float64))
 
-        # Matrice des distances : infini par défaut entre toutes les paires (i, j)
-        dist = {i: {j: math.inf for j in sommets} for i in sommets}
-
-        # Distance nulle sur la diagonale et initialisation avec les arêtes directes
-        for sommet in sommets:
-            dist[sommet][sommet] = 0  # coût nul pour aller de i à i
-            for voisin, poids in self.graph[sommet]:
-                dist[sommet][voisin] = poids  # coût de l’arête directe (sommet -> voisin)
+    def floyd_warshall(self, as_matrix=False, strategy="auto", workers=None):
+        # strategy : "dense", "blocked", "dijkstra" ou "auto" (choix selon la
+        # taille et la densité du graphe, voir apsp.choose_strategy)
+        sommets, origines, destinations, poids = self._arc_arrays()
+        dist, suivant = apsp.all_pairs(len(sommets), origines, destinations, poids,
+                                       strategy=strategy, workers=workers)
 
-        # Triple boucle : on tente d'améliorer i -> j en passant par un sommet 'inter'
-        for inter in sommets:
-            for i in sommets:
-                for j in sommets:
-                    # Si i -> inter -> j est plus court que i -> j actuel, on met à jour
-                    if dist[i][j] > dist[i][inter] + dist[inter][j]:
-                        dist[i][j] = dist[i][inter] + dist[inter][j]
+        if as_matrix:
+            # Un coefficient diagonal négatif signale un cycle de poids négatif
+            return sommets, dist, suivant
 
         # Matrice finale des plus courts chemins entre toutes les paires (inf si inatteignable)
-        return dist
+        return {
+            i: dict(zip(sommets, row))
+            for i, row in zip(sommets, dist.tolist())
+        }
+
+
+# ===========================================================
+# Représentation compacte (CSR) du graphe
+# ===========================================================
+# Les sommets sont numérotés 0..n-1 et les arcs rangés dans trois tableaux
+# contigus : offsets[i]:offsets[i+1] délimite les arcs sortants du sommet i
+# dans targets (identifiants des voisins) et weights (poids).
+# Environ 12 octets par arc au lieu de plusieurs tuples Python par arête.
+
+class _AdjacenceCSR(Mapping):
+    # Vue en lecture seule qui imite Graph.graph : sommet -> [(voisin, poids)]
+    def __init__(self, cg):
+        self._cg = cg
+
+    def __getitem__(self, node):
+        i = self._cg.index.get(node)
+        if i is None:
+            return []  # comme le defaultdict de Graph, sans l'agrandir
+        return list(self._cg.neighbors(i))
+
+    def get(self, node, default=None):
+        if node not in self._cg.index:
+            return default
+        return self[node]
+
+    def __contains__(self, node):
+        return node in self._cg.index
+
+    def __iter__(self):
+        return iter(self._cg.names)
+
+    def __len__(self):
+        return len(self._cg.names)
+
+
+class _AretesCSR(Sequence):
+    # Vue en lecture seule qui imite Graph.edges : [(poids, origine, destination)]
+    def __init__(self, cg):
+        self._cg = cg
+
+    def __len__(self):
+        return len(self._cg.targets)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        cg = self._cg
+        u = bisect_right(cg.offsets, k) - 1
+        return cg.weights[k], cg.names[u], cg.names[cg.targets[k]]
+
+    def __iter__(self):
+        cg = self._cg
+        names, offsets, targets, weights = cg.names, cg.offsets, cg.targets, cg.weights
+        for u in range(len(names)):
+            for k in range(offsets[u], offsets[u + 1]):
+                yield weights[k], names[u], names[targets[k]]
 
 
+def _tri_stable(cles, n):
+    # argsort stable de cles (entiers dans 0..n-1) : tri par base sur des
+    # chiffres de 16 bits, linéaire, bien plus rapide que le tri fusion NumPy
+    if n > 1 << 32:
+        return np.argsort(cles, kind="stable")
+    ordre = np.argsort((cles & 0xFFFF).astype(np.uint16), kind="stable")
+    if n > 1 << 16:
+        ordre = ordre[np.argsort((cles[ordre] >> 16).astype(np.uint16), kind="stable")]
+    return ordre
+
+
+class CompactGraph(Graph):
+    # Graphe figé : mêmes algorithmes que Graph, stockage en tableaux
+    def __init__(self, names, offsets, targets, weights, directed=False, name=None, index=None):
+        # offsets/targets/weights : array ou memoryview typée (instantané mmap)
+        self.name = name
+        self.version = 0
+        self.names = names                                  # id -> nom
+        if index is None:
+            index = dict(zip(names, range(len(names))))
+        self.index = index                                  # nom -> id
+        self.offsets = offsets                              # array('q'), n + 1 cases
+        self.targets = targets                              # array('i'), un id par arc
+        self.weights = weights                              # array('d'), un poids par arc
+        self.directed = directed
+        self.indexes = {}  # index précalculés livrés avec le graphe (snapshot.py)
+        self.coords = {}
+        self.graph = _AdjacenceCSR(self)
+        self.edges = _AretesCSR(self)
+        self._reverse = None
+
+    def add_edge(self, u, v, w=1):
+        raise ValueError("CompactGraph est figé : construire un Graph puis le convertir")
+
+    def add_edges(self, arcs):
+        raise ValueError("CompactGraph est figé : construire un Graph puis le convertir")
+
+    def remove_edges(self, paires):
+        raise ValueError("CompactGraph est figé : seuls les poids peuvent changer")
+
+    def set_weights(self, poids):
+        # Poids modifiés sur place ; ceux d'un instantané mmap (lecture seule)
+        # sont d'abord recopiés en mémoire
+        if isinstance(self.weights, memoryview) and self.weights.readonly:
+            weights = array("d")
+            weights.frombytes(self.weights.cast("B"))
+            self.weights = weights
+        for (u, v), w in poids.items():
+            for a, b in [(u, v)] if self.directed else [(u, v), (v, u)]:
+                i, j = self.index[a], self.index[b]
+                for k in range(self.offsets[i], self.offsets[i + 1]):
+                    if self.targets[k] == j:
+                        self.weights[k] = w
+        self._reverse = None
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def number_of_nodes(self):
+        return len(self.names)
+
+    def _all_nodes(self):
+        return list(self.names)
+
+    def neighbors(self, i):
+        # Voisins du sommet d'identifiant i, sous forme (nom, poids)
+        names, targets, weights = self.names, self.targets, self.weights
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            yield names[targets[k]], weights[k]
+
+    def _arc_arrays(self):
+        # Vue NumPy directe sur les buffers, sans copie des destinations ni des poids
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        origines = np.repeat(np.arange(len(self.names)), np.diff(offsets))
+        destinations = np.frombuffer(self.targets, dtype=np.int32)
+        poids = np.frombuffer(self.weights, dtype=np.float64)
+        return list(self.names), origines, destinations, poids
+
+    def node_id(self, name):
+        return self.index[name]
+
+    def node_name(self, i):
+        return self.names[i]
+
+    @classmethod
+    def from_graph(cls, g):
+        # Conversion en bloc : g.graph contient déjà les deux sens si non orienté
+        arcs = ((u, v, w) for u, neighs in g.graph.items() for v, w in neighs)
+        return cls._build(arcs, g.directed, symmetric=False, nodes=g.graph.keys())
+
+    @classmethod
+    def from_edges(cls, edges, directed=False):
+        # edges : itérable de (u, v, w) ; chaque arête non orientée donne deux arcs
+        return cls._build(edges, directed, symmetric=not directed)
+
+    @classmethod
+    def from_arrays(cls, names, origines, destinations, poids, directed=False, name=None):
+        # Construction vectorisée depuis des tableaux NumPy d'identifiants
+        # (0..len(names)-1) : aucun tuple Python par arête. Non orienté :
+        # chaque arête donne les deux arcs.
+        if not directed:
+            origines, destinations = (np.concatenate((origines, destinations)),
+                                      np.concatenate((destinations, origines)))
+            poids = np.concatenate((poids, poids))
+        n = len(names)
+        ordre = _tri_stable(origines, n)
+        bornes = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origines, minlength=n), out=bornes[1:])
+        offsets, targets, weights = array("q"), array("i"), array("d")
+        offsets.frombytes(bornes.tobytes())
+        targets.frombytes(destinations[ordre].astype(np.int32).tobytes())
+        weights.frombytes(np.asarray(poids, dtype=np.float64)[ordre].tobytes())
+        return cls(list(names), offsets, targets, weights, directed, name)
+
+    @classmethod
+    def _build(cls, arcs, directed, symmetric, nodes=()):
+        names, index = [], {}
+        sources, targets, weights = array("i"), array("i"), array("d")
+
+        def intern(node):
+            i = index.get(node)
+            if i is None:
+                i = index[node] = len(names)
+                names.append(node)
+            return i
+
+        for node in nodes:
+            intern(node)
+        for u, v, w in arcs:
+            iu, iv = intern(u), intern(v)
+            sources.append(iu)
+            targets.append(iv)
+            weights.append(w)
+            if symmetric:
+                sources.append(iv)
+                targets.append(iu)
+                weights.append(w)
+
+        # Tri par dénombrement des arcs selon leur origine (stable : l'ordre
+        # des voisins est celui d'insertion, donc BFS/DFS restent identiques)
+        n, m = len(names), len(sources)
+        offsets = array("q", bytes(8 * (n + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        position = array("q", offsets[:n])
+        csr_targets = array("i", bytes(4 * m))
+        csr_weights = array("d", bytes(8 * m))
+        for k in range(m):
+            p = position[sources[k]]
+            csr_targets[p] = targets[k]
+            csr_weights[p] = weights[k]
+            position[sources[k]] = p + 1
+        return cls(names, offsets, csr_targets, csr_weights, directed)
+
 
 # ===========================================================
 # Wrappers pour le frontend Flask/D3
 # ===========================================================
 
-def _nx_to_user_graph(G: nx.Graph) -> Graph:
-    directed = isinstance(G, nx.DiGraph)
-    UG = Graph(directed=directed)
+# ----------------------
+# Adaptateur networkx (facultatif)
+# ----------------------
+# L'application garde ses graphes au format natif ; networkx ne sert plus
+# qu'à importer ou exporter un graphe et n'est importé qu'à ce moment-là.
+
+def from_networkx(G) -> Graph:
+    # Graphe networkx -> Graph (attribut d'arête "weight", attributs de sommet lat/lon)
+    UG = Graph(directed=G.is_directed(), name=G.graph.get("name"))
     for u, v, d in G.edges(data=True):
-        w = float(d.get("weight", 1.0))
-        UG.add_edge(str(u), str(v), w)
+        UG.add_edge(str(u), str(v), d.get("weight", 1))
+    for n, d in G.nodes(data=True):
+        if "lat" in d and "lon" in d:
+            UG.coords[str(n)] = (float(d["lat"]), float(d["lon"]))
     return UG
 
-def _user_to_nx(UG: Graph) -> nx.Graph:
-    H = nx.DiGraph() if UG.directed else nx.Graph()
-    for u, neighs in UG.graph.items():
-        for v, w in neighs:
-            H.add_edge(u, v, weight=float(w))
+
+def to_networkx(G: Graph):
+    # Graph (ou CompactGraph) -> nx.Graph / nx.DiGraph ; exige networkx
+    import networkx as nx
+    H = nx.DiGraph(name=G.name) if G.directed else nx.Graph(name=G.name)
+    H.add_nodes_from(G._all_nodes())
+    H.add_weighted_edges_from((u, v, w) for w, u, v in G.edges)
+    for n, (lat, lon) in G.coords.items():
+        H.nodes[n].update(lat=lat, lon=lon)
     return H
 
+# ----------------------
+# Cache des graphes convertis
+# ----------------------
+# Les graphes de app.GRAPHS changent rarement : on garde les index dérivés
+# (et la conversion d'un graphe networkx passé directement) tant que la
+# version du graphe ne bouge pas. Toute modification doit appeler
+# mark_graph_modified(G).
+
+GRAPH_CACHE_SIZE = 8  # nombre maximal de graphes convertis gardés en mémoire
+
+_graph_cache = OrderedDict()
+_graph_cache_lock = fork_safe_lock()  # voir jobs.py : tenu pendant les fork
+
+
+# app.GRAPHS contient des Graph/CompactGraph natifs, utilisés tels quels ;
+# un graphe networkx reste accepté et passe par from_networkx.
+
+def graph_name(G) -> str:
+    if isinstance(G, Graph):
+        return G.name
+    return G.graph.get("name")
+
 
-def _reconstruct_path_from_dist(UG: Graph, dist: Dict[str, float], source: str, target: str) -> List[str]:
-    if source not in dist or target not in dist or math.isinf(dist[target]):
+def graph_version(G) -> int:
+    if isinstance(G, Graph):
+        return G.version
+    return G.graph.get("version", 0)
+
+
+def mark_graph_modified(G) -> int:
+    # Incrémente la version : les conversions en cache deviennent obsolètes
+    if isinstance(G, Graph):
+        G.version += 1
+        G._reverse = None
+        return G.version
+    G.graph["version"] = graph_version(G) + 1
+    return G.graph["version"]
+
+
+def _cache_entry(G) -> dict:
+    key = graph_name(G) or id(G)
+    version = graph_version(G)
+    with _graph_cache_lock:
+        entry = _graph_cache.get(key)
+        if entry is not None and entry["source"] is G and entry["version"] == version:
+            _graph_cache.move_to_end(key)
+            return entry
+
+    UG = G if isinstance(G, Graph) else from_networkx(G)
+    entry = {"source": G, "version": version, "graph": UG, "derived": {}}
+    with _graph_cache_lock:
+        _graph_cache[key] = entry
+        _graph_cache.move_to_end(key)
+        while len(_graph_cache) > GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)  # éviction du moins récemment utilisé
+    return entry
+
+
+def _user_graph(G: Graph) -> Graph:
+    return _cache_entry(G)["graph"]
+
+
+def _derived_index(G: Graph, name: str, build):
+    # Index calculé une fois par version du graphe (ex. CompactGraph)
+    derived = _cache_entry(G)["derived"]
+    if name not in derived:
+        derived[name] = build(_user_graph(G))
+    return derived[name]
+
+
+def graph_links(G) -> Tuple[List[str], List[Tuple[str, str, float]]]:
+    # Sommets et arêtes pour l'affichage ; une arête non orientée (stockée
+    # comme deux arcs) n'apparaît qu'une fois
+    if not isinstance(G, Graph):
+        G = _user_graph(G)
+    if G.directed:
+        return [str(n) for n in G._all_nodes()], [(str(u), str(v), float(w)) for w, u, v in G.edges]
+    en_attente = defaultdict(int)  # arcs dont on attend l'arc inverse
+    links = []
+    for w, u, v in G.edges:
+        cle = (min(u, v), max(u, v), w)
+        if en_attente[cle]:
+            en_attente[cle] -= 1
+        else:
+            en_attente[cle] += 1
+            links.append((str(u), str(v), float(w)))
+    return [str(n) for n in G._all_nodes()], links
+
+
+def _path_from_pred(pred: Dict[str, str], source: str, target: str) -> List[str]:
+    # Remonte la chaîne des prédécesseurs depuis la cible : O(longueur du chemin)
+    if target not in pred:
         return []
-    current = target
-    path = [current]
-    seen = set([current])
-    for _ in range(len(UG.graph) + 5):
-        if current == source:
-            return list(reversed(path))
-        found_prev = None
-        for u, neighs in UG.graph.items():
-            for v, w in neighs:
-                if v == current:
-                    if u in dist and not math.isinf(dist[u]) and abs(dist[u] + w - dist[v]) < 1e-9:
-                        if (found_prev is None) or (dist[u] < dist[found_prev]):
-                            found_prev = u
-        if found_prev is None or found_prev in seen:
-            break
-        current = found_prev
-        path.append(current)
-        seen.add(current)
-    return []
+    path = [target]
+    while path[-1] != source:
+        prev = pred[path[-1]]
+        if prev is None:
+            return []
+        path.append(prev)
+    path.reverse()
+    return path
 
 
 # ===========================================================
 # Fonctions appelées par l'interface web
 # ===========================================================
 
-def bfs(G: nx.Graph, source: str) -> List[str]:
-    UG = _nx_to_user_graph(G)
+def bfs(G: Graph, source: str) -> List[str]:
+    UG = _user_graph(G)
     return UG.bfs(source)
 
-def dfs(G: nx.Graph, source: str) -> List[str]:
-    UG = _nx_to_user_graph(G)
+def dfs(G: Graph, source: str) -> List[str]:
+    UG = _user_graph(G)
     return UG.dfs(source)
 
-def dijkstra(G: nx.Graph, source: str, target: str) -> Tuple[List[str], float]:
-    UG = _nx_to_user_graph(G)
-    # 1) calcule les distances avec ton Dijkstra maison
-    dist = UG.dijkstra(source)
+def _haversine(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    # Distance à vol d'oiseau (km) entre deux points (lat, lon) en degrés
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def _coordinate_index(G: Graph) -> Tuple[Dict[str, Tuple[float, float]], float]:
+    # Coordonnées (Graph.coords) + facteur d'échelle :
+    # les poids ne sont pas forcément en km, on prend le plus petit rapport
+    # poids / distance à vol d'oiseau pour que l'heuristique reste un minorant.
+    # Ce rapport ne borne que les arcs dont les deux extrémités sont placées :
+    # dès qu'un arc touche un sommet sans coordonnées, il pourrait servir de
+    # raccourci et le facteur vaut 0 (A* se ramène alors à Dijkstra).
+    def build(UG):
+        coords = UG.coords
+        facteur = math.inf
+        for w, u, v in UG.edges:
+            if u not in coords or v not in coords:
+                facteur = 0.0
+                break
+            km = _haversine(coords[u], coords[v])
+            if km > 0:
+                facteur = min(facteur, max(w, 0) / km)
+        return coords, (0.0 if math.isinf(facteur) else facteur)
+    return _derived_index(G, "coordinates", build)
+
+
+def _fingerprint(G: Graph, topology_only: bool = False) -> str:
+    # Empreinte du contenu (sommets, arcs, poids) ou de la topologie seule,
+    # une fois par version : elle nomme les fichiers de apsp.STORE_DIR
+    def build(UG):
+        sommets, origines, destinations, poids = UG._arc_arrays()
+        return apsp.graph_fingerprint([str(s) for s in sommets], origines, destinations,
+                                      np.zeros(0) if topology_only else poids)
+    return _derived_index(G, "topology_fingerprint" if topology_only else "fingerprint", build)
+
+
+def _graph_stats(G: Graph) -> Tuple[int, float]:
+    # Nombre de sommets et plus petit poids d'arc (inf sans arc), une fois par version
+    def build(UG):
+        sommets, _, _, poids = UG._arc_arrays()
+        return len(sommets), (float(poids.min()) if len(poids) else math.inf)
+    return _derived_index(G, "stats", build)
+
+
+def _remove_store_path(path):
+    # Supprime un répertoire de matrices ou un fichier d'index de STORE_DIR
+    # (les lecteurs qui l'ont déjà ouvert par mmap gardent leur copie)
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _ch_path(G: Graph) -> str:
+    return os.path.join(apsp.STORE_DIR, f"ch-{graph_name(G) or 'graph'}-{_fingerprint(G)}.npz")
+
+
+def _landmarks_path(G: Graph) -> str:
+    return os.path.join(apsp.STORE_DIR, f"alt-{graph_name(G) or 'graph'}-{_fingerprint(G, True)}.npz")
+
+
+def _embedded_index(UG, nom, poids_modifies=False):
+    # Tableaux d'un index livré dans l'instantané du graphe, s'il y en a un
+    # et que le graphe n'a pas été modifié depuis son chargement.
+    # poids_modifies=True : accepté aussi après des mises à jour de poids (les
+    # seules modifications possibles d'un CompactGraph, topologie inchangée),
+    # pour un index qui sait se mettre à jour (ALT)
+    if not isinstance(UG, CompactGraph) or (UG.version and not poids_modifies):
+        return None
+    return UG.indexes.get(nom)
+
+
+def contraction_hierarchy(G: Graph, wait: bool = True):
+    # Prétraitement CH, sauvegardé sur disque à côté des matrices all-pairs
+    # et rechargé tel quel tant que le contenu du graphe ne change pas.
+    # wait=False : si la hiérarchie de cette version n'est ni en mémoire, ni
+    # dans l'instantané, ni sur disque, elle est construite dans un thread et
+    # None est renvoyé en attendant (ValueError tout de suite si des poids
+    # sont négatifs). Après une modification du graphe, aucune requête
+    # n'attend ainsi la reconstruction.
+    version = graph_version(G)
+
+    def build(UG):
+        sommets, origines, destinations, poids = UG._arc_arrays()
+        noms = [str(s) for s in sommets]
+        embarque = _embedded_index(UG, "ch")
+        if embarque is not None:
+            return ContractionHierarchy(noms, **embarque)
+        path = _ch_path(G)
+        if os.path.exists(path):
+            return ContractionHierarchy.load(path)
+        hierarchy = ContractionHierarchy.build(noms, origines, destinations, poids)
+        os.makedirs(apsp.STORE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        hierarchy.save(tmp)
+        os.replace(tmp, path)
+        if graph_version(G) != version:  # modifié pendant la construction : fichier déjà périmé
+            _remove_store_path(path)
+        return hierarchy
+
+    derived = _cache_entry(G)["derived"]
+    if wait or "contraction_hierarchy" in derived:
+        return _derived_index(G, "contraction_hierarchy", build)
+    if _embedded_index(_user_graph(G), "ch") is not None or os.path.exists(_ch_path(G)):
+        return _derived_index(G, "contraction_hierarchy", build)  # simple lecture
+    if _graph_stats(G)[1] < 0:
+        raise ValueError("Les hiérarchies de contraction exigent des poids positifs !")
+    with _graph_cache_lock:
+        lancer = not derived.get("ch_building")
+        derived["ch_building"] = True
+    if lancer:
+        def construire():
+            if graph_version(G) != version:
+                return  # déjà une autre version : elle aura sa propre construction
+            try:
+                _derived_index(G, "contraction_hierarchy", build)
+            except Exception as e:  # graphe modifié pendant la lecture, disque plein...
+                log.warning("Hiérarchie de contraction de %s non construite : %s", graph_name(G), e)
+                derived.pop("ch_building", None)
+        threading.Thread(target=construire, daemon=True).start()
+    return None
+
+
+def landmark_index(G: Graph) -> LandmarkIndex:
+    # Index ALT sur disque, identifié par la topologie seule (sommets + arcs) :
+    # si seuls des poids ont changé, on repart du fichier existant et on ne
+    # recalcule que les distances des repères concernés
+    def build(UG):
+        sommets, origines, destinations, poids = UG._arc_arrays()
+        noms = [str(s) for s in sommets]
+        path = _landmarks_path(G)
+        # point de départ : le fichier (poids les plus récents), sinon l'index
+        # de l'instantané, même après des mises à jour de poids
+        disque = os.path.exists(path)
+        embarque = None if disque else _embedded_index(UG, "alt", poids_modifies=True)
+        if disque or embarque is not None:
+            index = LandmarkIndex.load(path) if disque else LandmarkIndex(noms, **embarque)
+            if np.array_equal(index.poids, poids):
+                return index
+            if not disque:  # vues en lecture seule sur l'instantané : copiées avant la mise à jour
+                index = LandmarkIndex(noms, **{champ: np.array(t) for champ, t in embarque.items()})
+            index.update(origines, destinations, poids)
+        else:
+            index = LandmarkIndex.build(noms, origines, destinations, poids)
+        os.makedirs(apsp.STORE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        index.save(tmp)
+        os.replace(tmp, path)
+        return index
+    return _derived_index(G, "landmarks", build)
+
+
+def dijkstra(G: Graph, source: str, target: str, engine: str = "dijkstra") -> Tuple[List[str], float]:
+    # engine : "dijkstra", "bidirectional", "astar" (heuristique géographique),
+    # "alt" (A* guidé par des points de repère) ou "ch" (hiérarchies de contraction)
+    if engine == "ch":
+        hierarchy = contraction_hierarchy(G, wait=False)
+        if hierarchy is not None:
+            path, cost = hierarchy.query(source, target)
+            return path, float(cost)
+        engine = "bidirectional"  # hiérarchie en construction : même réponse, sans prétraitement
+    UG = _user_graph(G)
+    if engine == "bidirectional":
+        path, cost = UG.bidirectional_dijkstra(source, target)
+        return path, float(cost)
+    if engine == "astar":
+        coords, facteur = _coordinate_index(G)
+        but = coords.get(target)
+
+        def heuristic(node):
+            # 0 (toujours admissible) si un des deux sommets n'a pas de coordonnées
+            if but is None or node not in coords:
+                return 0.0
+            return facteur * _haversine(coords[node], but)
+
+        path, cost = UG.astar(source, target, heuristic)
+        return path, float(cost)
+    if engine == "alt":
+        path, cost = UG.astar(source, target, landmark_index(G).heuristic(target))
+        return path, float(cost)
+    if engine != "dijkstra":
+        raise ValueError(f"Moteur inconnu : {engine}")
+
+    # arbre complet de la source s'il est en cache (réparé après les
+    # modifications) ou si la source revient souvent ; sinon distances +
+    # prédécesseurs avec arrêt dès que la cible est fixée
+    arbre = _cached_tree(G, source)
+    if arbre is None and _frequent_source(G, source):
+        arbre = _dijkstra_tree(G, source)
+    if arbre is not None:
+        dist, pred = arbre
+    else:
+        dist, pred = UG.dijkstra(source, target, with_pred=True)
 
     # si source/target invalides ou unreachable
     if not dist or target not in dist or math.isinf(dist[target]):
         return [], float("inf")
 
-    # 2) essaie la reconstruction sur la base des distances
-    path = _reconstruct_path_from_dist(UG, dist, source, target)
+    path = _path_from_pred(pred, source, target)
+    return path, float(dist[target])
+
 
-    # 3) SECURITÉ/FALLBACK : si la reconstruction échoue, on prend un chemin sûr
-    if not path:
-        H = _user_to_nx(UG)
-        try:
-            path = nx.shortest_path(H, source=source, target=target, weight="weight")
-        except Exception:
-            path = []
+def _arc_index(G: Graph):
+    # Tableaux d'arcs + table nom -> identifiant, une fois par version du graphe
+    def build(UG):
+        sommets, origines, destinations, poids = UG._arc_arrays()
+        noms = [str(s) for s in sommets]
+        return noms, {nom: i for i, nom in enumerate(noms)}, origines, destinations, poids
+    return _derived_index(G, "arc_index", build)
 
-    return path, float(dist[target])
 
+def batch_shortest_paths(G: Graph, queries: List[Tuple[str, str]], workers=None) -> List[Tuple[List[str], float]]:
+    # Plusieurs couples (source, cible) : un seul Dijkstra par source distincte,
+    # résultats renvoyés dans l'ordre des requêtes
+    noms, index, origines, destinations, poids = _arc_index(G)
+    groupes = defaultdict(list)  # source -> positions des requêtes
+    for k, (source, _) in enumerate(queries):
+        groupes[source].append(k)
+    sources = [s for s in groupes if s in index]
+    demandes = [(index[s], [index.get(queries[k][1], index[s]) for k in groupes[s]]) for s in sources]
+    reponses = apsp.batch_queries(len(noms), origines, destinations, poids, demandes, workers=workers)
+
+    resultats = [([], float("inf"))] * len(queries)
+    for s, reponse in zip(sources, reponses):
+        for k, (cout, chemin) in zip(groupes[s], reponse):
+            if queries[k][1] in index and not math.isinf(cout):
+                resultats[k] = ([noms[i] for i in chemin], float(cout))
+    return resultats
 
-def kruskal(G: nx.Graph) -> Tuple[List[Tuple[str, str, float]], float]:
-    UG = _nx_to_user_graph(G)
+
+def distance_matrix(G: Graph, sources: List[str], targets: List[str], workers=None) -> List[List[float]]:
+    # Matrice plusieurs-à-plusieurs : une ligne par source, inf si inatteignable
+    noms, index, origines, destinations, poids = _arc_index(G)
+    cibles = [index.get(t, -1) for t in targets]
+    connues = [index[s] for s in sources if s in index]
+    lignes = iter(apsp.batch_queries(
+        len(noms), origines, destinations, poids,
+        [(s, [c for c in cibles if c >= 0]) for s in connues],
+        with_paths=False, workers=workers,
+    ))
+    matrice = []
+    for s in sources:
+        if s not in index:
+            matrice.append([math.inf] * len(targets))
+            continue
+        valeurs = iter(next(lignes))
+        matrice.append([float(next(valeurs)) if c >= 0 else math.inf for c in cibles])
+    return matrice
+
+
+def kruskal(G: Graph) -> Tuple[List[Tuple[str, str, float]], float]:
+    UG = _user_graph(G)
     mst, total = UG.kruskal()
     edges = [(str(u), str(v), float(w)) for (u, v, w) in mst]
     return edges, float(total)
 
-def prim(G: nx.Graph, start: str) -> Tuple[List[Tuple[str, str, float]], float]:
-    UG = _nx_to_user_graph(G)
+def connected_components(G: Graph) -> List[List[str]]:
+    UG = _user_graph(G)
+    return UG.connected_components()
+
+def prim(G: Graph, start: str) -> Tuple[List[Tuple[str, str, float]], float]:
+    UG = _user_graph(G)
     mst, total = UG.prim(start)
     edges = [(str(u), str(v), float(w)) for (u, v, w) in mst]
     return edges, float(total)
 
-def bellman_ford(G: nx.Graph, source: str):
-    UG = _nx_to_user_graph(G)
-    result = UG.bellman_ford(source)
-    if result is None:
-        return {"__negative_cycle__": 1.0}
+# ----------------------
+# Arbres de plus courts chemins gardés d'une version à l'autre
+# ----------------------
+# Un arbre (dist, pred) calculé pour une source survit aux modifications du
+# graphe : apply_changes le répare au lieu de l'oublier (voir dynamic.py).
+# Les arbres viennent de Bellman-Ford (ici, ou dans un processus fils de
+# jobs.py : voir adopt_tree_table) et des requêtes Dijkstra : une requête
+# garde son arrêt anticipé, seule une source interrogée SSSP_TREE_AFTER fois
+# fait calculer (une fois) l'arbre complet, s'il tient dans le budget.
+
+SSSP_CACHE_SIZE = 32  # nombre maximal d'arbres gardés, tous graphes confondus
+SSSP_CACHE_NODES = 1_000_000  # sommets au total dans ces arbres (mémoire)
+SSSP_TREE_MAX_NODES = SSSP_CACHE_NODES // 4  # arbre plus grand : pas gardé
+SSSP_TREE_AFTER = 3  # requêtes Dijkstra depuis une source avant de garder son arbre
+
+_sssp_trees = OrderedDict()  # (graphe, source) -> {"source", "version", "dist", "pred"}
+_sssp_queries = OrderedDict()  # (graphe, source) -> requêtes Dijkstra sans arbre en cache
+_sssp_lock = fork_safe_lock()
+
+
+def _cached_tree(G, source):
+    key = (graph_name(G) or id(G), source)
+    with _sssp_lock:
+        entry = _sssp_trees.get(key)
+        if entry is None or entry["source"] is not G or entry["version"] != graph_version(G):
+            return None
+        _sssp_trees.move_to_end(key)
+        return entry["dist"], entry["pred"]
+
+
+def _frequent_source(G, source):
+    # Compte une requête Dijkstra depuis source ; vrai à la SSSP_TREE_AFTER-ième
+    key = (graph_name(G) or id(G), source)
+    with _sssp_lock:
+        compte = _sssp_queries.pop(key, 0) + 1
+        if compte >= SSSP_TREE_AFTER:
+            return True
+        _sssp_queries[key] = compte
+        while len(_sssp_queries) > 8 * SSSP_CACHE_SIZE:
+            _sssp_queries.popitem(last=False)
+    return False
+
+
+def _store_tree(G, source, version, dist, pred):
+    # Garde l'arbre s'il est de la version courante et tient dans le budget ;
+    # les moins récemment utilisés sont oubliés d'abord
+    if len(dist) > SSSP_TREE_MAX_NODES:
+        return
+    key = (graph_name(G) or id(G), source)
+    with _sssp_lock:
+        if graph_version(G) != version:
+            return
+        _sssp_trees[key] = {"source": G, "version": version, "dist": dist, "pred": pred}
+        _sssp_trees.move_to_end(key)
+        total = sum(len(e["dist"]) for e in _sssp_trees.values())
+        while len(_sssp_trees) > SSSP_CACHE_SIZE or total > SSSP_CACHE_NODES:
+            _, e = _sssp_trees.popitem(last=False)
+            total -= len(e["dist"])
+
+
+def tree_ready(G: Graph, source: str) -> bool:
+    # Vrai si l'arbre de plus courts chemins de source est en cache pour cette version
+    return _cached_tree(G, source) is not None
+
 
-    dist, pred = result
+def shortest_path_tree(G: Graph, source: str):
+    # (dist, pred) depuis source par Bellman-Ford (poids négatifs admis) ;
+    # lève NegativeCycleError. Les dictionnaires renvoyés ne doivent pas être modifiés.
+    arbre = _cached_tree(G, source)
+    if arbre is not None:
+        return arbre
+    version = graph_version(G)
+    dist, pred = _user_graph(G).bellman_ford(source)
+    _store_tree(G, source, version, dist, pred)
+    return dist, pred
+
+
+def _dijkstra_tree(G, source):
+    # Arbre complet par Dijkstra, gardé pour les requêtes suivantes depuis la
+    # même source ; None (Dijkstra avec arrêt anticipé, sans cache) si des poids
+    # sont négatifs ou si l'arbre ne tiendrait pas dans le budget
+    n, poids_min = _graph_stats(G)
+    if poids_min < 0 or n > SSSP_TREE_MAX_NODES:
+        return None
+    UG = _user_graph(G)
+    version = graph_version(G)
+    dist, pred = UG.dijkstra(source, with_pred=True)
+    for node in UG._all_nodes():  # même forme que Bellman-Ford : tous les sommets
+        dist.setdefault(node, math.inf)
+        pred.setdefault(node, None)
+    _store_tree(G, source, version, dist, pred)
+    return dist, pred
+
+
+def adopt_tree_table(G: Graph, source: str, version: int, table) -> None:
+    # Arbre calculé par bellman_ford dans un processus fils (jobs.py) :
+    # reconstruit depuis sa table pour être gardé, et réparé, ici aussi
+    if len(table) > SSSP_TREE_MAX_NODES or graph_version(G) != version:
+        return
+    noms = {str(node): node for node in _user_graph(G)._all_nodes()}
+    dist, pred = {}, {}
+    for row in table:
+        node = noms[row["node"]]
+        dist[node] = math.inf if row["distance"] is None else row["distance"]
+        pred[node] = None if row["predecessor"] is None else noms[row["predecessor"]]
+    _store_tree(G, source, version, dist, pred)
+
+
+def bellman_ford(G: Graph, source: str):
+    try:
+        dist, pred = shortest_path_tree(G, source)
+    except NegativeCycleError as e:
+        return {"__negative_cycle__": 1.0, "cycle": [str(n) for n in e.cycle]}
 
     # Construit un tableau de lignes pour le frontend
     table_rows = []
-    for node in sorted(UG.graph.keys()):
+    for node in sorted(dist):
         table_rows.append({
             "node": str(node),
             "distance": None if math.isinf(dist[node]) else float(dist[node]),
@@ -302,14 +1526,173 @@ def bellman_ford(G: nx.Graph, source: str):
 
     return {"table": table_rows}
 
-def floyd_warshall_all_pairs(G: nx.Graph):
-    UG = _nx_to_user_graph(G)
-    dist = UG.floyd_warshall()
+def _all_pairs_directory(G: Graph) -> str:
+    return os.path.join(apsp.STORE_DIR, f"{graph_name(G) or 'graph'}-{_fingerprint(G)}")
+
+
+def all_pairs_ready(G: Graph) -> bool:
+    # Vrai si les matrices all-pairs de cette version du graphe sont déjà sur disque
+    return os.path.exists(os.path.join(_all_pairs_directory(G), "nodes.json"))
+
+
+def all_pairs_store(G: Graph, strategy: str = "auto") -> apsp.DistanceStore:
+    # Matrices all-pairs sur disque, calculées une fois par contenu de graphe
+    # (toutes les stratégies donnent les mêmes distances : le stockage est partagé)
+    def build(UG):
+        sommets, origines, destinations, poids = UG._arc_arrays()
+        noms = [str(s) for s in sommets]
+        return apsp.build_store(_all_pairs_directory(G), noms, origines, destinations, poids, strategy=strategy)
+    return _derived_index(G, "apsp_store", build)
+
+
+def floyd_warshall_all_pairs(G: Graph, strategy: str = "auto"):
+    # strategy="johnson" : repondération + Dijkstra répétés (graphes creux)
+    store = all_pairs_store(G, strategy)
+    if store.negative_cycle:
+        return {"__negative_cycle__": 1.0}
     return {
-        str(i): {
-            str(j): (None if math.isinf(d) else float(d))
-            for j, d in row.items()
+        i: {
+            j: (None if math.isinf(d) else d)
+            for j, d in zip(store.nodes, store.row(i).tolist())
         }
-        for i, row in dist.items()
+        for i in store.nodes
     }
 
+
+# ===========================================================
+# Modifications du graphe (fermetures, trafic)
+# ===========================================================
+# Un lot de changements donne une seule nouvelle version ; les arbres en
+# cache et les matrices all-pairs de la version précédente sont réparés
+# (dynamic.py) au lieu d'être recalculés.
+
+CHANGE_OPS = ("add", "remove", "update")
+
+
+def _arc_weight(UG, u, v, etat):
+    # Poids effectif (le plus léger) de u -> v ; etat : paires déjà touchées par le lot
+    if (u, v) in etat:
+        return etat[(u, v)]
+    return min((w for x, w in UG.graph.get(u, ()) if x == v), default=math.inf)
+
+
+def _has_all_pairs_store(G):
+    # Matrices de cette version sur disque ? Un simple listage évite de calculer
+    # l'empreinte du graphe (O(m)) quand aucune matrice n'existe pour lui
+    prefixe = f"{graph_name(G) or 'graph'}-"
+    try:
+        repertoires = os.listdir(apsp.STORE_DIR)
+    except OSError:
+        return False
+    return any(r.startswith(prefixe) for r in repertoires) and all_pairs_ready(G)
+
+
+def apply_changes(G: Graph, changes) -> dict:
+    # changes : [(op, u, v, w)] avec op dans CHANGE_OPS (w ignoré pour "remove").
+    # Tout le lot est vérifié avant d'être appliqué : ValueError sans rien
+    # modifier si une opération est invalide. Renvoie un résumé.
+    if not isinstance(G, Graph):
+        raise ValueError("Seuls les graphes natifs (Graph) sont modifiables")
+    if isinstance(G, CompactGraph) and any(op != "update" for op, _, _, _ in changes):
+        raise ValueError("CompactGraph est figé : seuls les poids peuvent changer")
+
+    # 1. Vérification, en simulant le lot : poids effectif de chaque paire touchée
+    etat, anciens = {}, {}
+    for op, u, v, w in changes:
+        if op not in CHANGE_OPS:
+            raise ValueError(f"Opération inconnue : {op}")
+        if op != "remove" and (not isinstance(w, (int, float)) or isinstance(w, bool) or not math.isfinite(w)):
+            raise ValueError(f"Poids invalide pour {u} -> {v} : {w!r}")
+        paires = [(u, v)] if G.directed else [(u, v), (v, u)]
+        actuel = _arc_weight(G, u, v, etat)
+        if op != "add" and math.isinf(actuel):
+            raise ValueError(f"Arête inconnue : {u} -> {v}")
+        for a, b in paires:
+            anciens.setdefault((a, b), _arc_weight(G, a, b, {}))
+            etat[(a, b)] = math.inf if op == "remove" else (min(actuel, w) if op == "add" else w)
+
+    # 2. Application, par séries d'opérations identiques consécutives
+    ancien_store = all_pairs_store(G) if _has_all_pairs_store(G) else None
+    # fichiers de STORE_DIR connus pour cette version (empreinte déjà calculée)
+    derived = _cache_entry(G)["derived"]
+    fichiers = {}
+    if "fingerprint" in derived:
+        fichiers[_all_pairs_directory] = _all_pairs_directory(G)
+        fichiers[_ch_path] = _ch_path(G)
+    if "topology_fingerprint" in derived:
+        fichiers[_landmarks_path] = _landmarks_path(G)
+    # Version intermédiaire pendant l'application : un calcul qui lit le graphe
+    # pendant le lot n'est gardé (arbres, résultats) que si la version n'a pas
+    # changé entre son début et sa fin, donc jamais sous l'ancienne ni la nouvelle
+    ancienne = graph_version(G)
+    mark_graph_modified(G)
+    i = 0
+    while i < len(changes):
+        op = changes[i][0]
+        j = i
+        while j < len(changes) and changes[j][0] == op:
+            j += 1
+        serie = changes[i:j]
+        if op == "add":
+            G.add_edges([(u, v, w) for _, u, v, w in serie])
+        elif op == "remove":
+            G.remove_edges([(u, v) for _, u, v, _ in serie])
+        else:
+            G.set_weights({(u, v): w for _, u, v, w in serie})
+        i = j
+    version = mark_graph_modified(G)
+    arcs = [(u, v, anciens[(u, v)], w) for (u, v), w in etat.items() if w != anciens[(u, v)]]
+
+    # 3. Réparation des arbres de ce graphe
+    repares = abandonnes = 0
+    with _sssp_lock:
+        arbres = [(k, e) for k, e in _sssp_trees.items() if e["source"] is G]
+    for key, e in arbres:
+        if e["version"] != ancienne:  # gardé pendant le lot : rien à réparer
+            with _sssp_lock:
+                _sssp_trees.pop(key, None)
+            continue
+        # réparé sur une copie : une requête en cours garde l'ancien arbre intact
+        dist, pred = dict(e["dist"]), dict(e["pred"])
+        ok = dynamic.repair_tree(G.graph, G._reverse_graph(), dist, pred, key[1], arcs) is not None
+        if ok:
+            _store_tree(G, key[1], version, dist, pred)
+        else:
+            with _sssp_lock:
+                _sssp_trees.pop(key, None)
+        repares += ok
+        abandonnes += not ok
+
+    # 4. Réparation des matrices all-pairs, si elles existaient
+    all_pairs = None
+    if ancien_store is not None and not ancien_store.negative_cycle:
+        noms, index, origines, destinations, poids = _arc_index(G)
+        all_pairs = "dropped"
+        if noms == ancien_store.nodes:
+            store = dynamic.repair_all_pairs(
+                ancien_store, _all_pairs_directory(G),
+                [(index[str(u)], index[str(v)], a, w) for u, v, a, w in arcs],
+                origines, destinations, poids,
+            )
+            if store is not None:
+                _cache_entry(G)["derived"]["apsp_store"] = store
+                all_pairs = "repaired"
+
+    # 5. Matrices et index CH / ALT de la version précédente : supprimés s'ils
+    #    ne servent plus (contenu changé), sinon STORE_DIR grossit à chaque lot.
+    #    L'index ALT ne dépend que de la topologie : il reste pour une simple
+    #    mise à jour de poids, et sera mis à jour depuis ce fichier.
+    for chemin, ancien in fichiers.items():
+        if chemin(G) != ancien:
+            _remove_store_path(ancien)
+
+    return {
+        "version": version,
+        "changed_arcs": len(arcs),
+        "arcs": [{"source": str(u), "target": str(v),
+                  "old": None if math.isinf(a) else a, "new": None if math.isinf(w) else w}
+                 for u, v, a, w in arcs],
+        "trees_repaired": repares,
+        "trees_dropped": abandonnes,
+        "all_pairs": all_pairs,
+    }
@@ -0,0 +1,218 @@
+# alt.py
+# ===========================================================
+# ALT : A*, Landmarks (points de repère), inégalité triangulaire
+# ===========================================================
+# Prétraitement léger : on choisit k points de repère L et on stocke, pour
+# chaque sommet v, d(L, v) (en avant) et d(v, L) (en arrière).
+# Par l'inégalité triangulaire, pour tout couple (v, t) :
+#   d(v, t) >= d(L, t) - d(L, v)   et   d(v, t) >= d(v, L) - d(t, L)
+# ce qui donne un minorant admissible pour A*, sans coordonnées.
+
+import numpy as np
+
+from apsp import csr_arrays, dijkstra_tree
+
+LANDMARKS = 8        # nombre de points de repère par défaut
+METHODS = ("farthest", "avoid")
+
+
+class LandmarkIndex:
+    def __init__(self, names, landmarks, forward, backward, poids):
+        # forward[i, v] = d(L_i, v) ; backward[i, v] = d(v, L_i)
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.forward = np.asarray(forward, dtype=np.float64)
+        self.backward = np.asarray(backward, dtype=np.float64)
+        self.poids = np.asarray(poids, dtype=np.float64)  # poids ayant servi au calcul
+        self._par_sommet()
+
+    def _par_sommet(self):
+        # Une liste de k distances par sommet : lecture rapide pendant A*
+        self._fwd = self.forward.T.tolist()
+        self._bwd = self.backward.T.tolist()
+
+    # ----------------------
+    # Prétraitement
+    # ----------------------
+    @classmethod
+    def build(cls, names, origines, destinations, poids, k=LANDMARKS, method="farthest"):
+        if method not in METHODS:
+            raise ValueError(f"Méthode inconnue : {method}")
+        if len(poids) and poids.min() < 0:
+            raise ValueError("ALT exige des poids positifs !")
+        n = len(names)
+        k = min(k, n)
+        avant = _Graphes(n, origines, destinations, poids)
+        arriere = avant.inverse()
+        forward = np.empty((k, n))
+        backward = np.empty((k, n))
+        landmarks = []
+        choisir = cls._farthest if method == "farthest" else cls._avoid
+        for i in range(k):
+            L = choisir(avant, landmarks, forward[:i], backward[:i], n)
+            if L is None:
+                break
+            landmarks.append(L)
+            forward[i] = avant.distances(L)
+            backward[i] = arriere.distances(L)
+        m = len(landmarks)
+        return cls(names, landmarks, forward[:m], backward[:m], poids)
+
+    @staticmethod
+    def _farthest(avant, landmarks, forward, backward, n):
+        # Sommet le plus éloigné des repères déjà choisis ; un sommet hors
+        # d'atteinte (autre composante) est pris en priorité
+        if not landmarks:
+            if n == 0:
+                return None
+            dist = np.array(avant.distances(0))
+            finies = np.where(np.isinf(dist), -1.0, dist)
+            return int(finies.argmax())
+        ecart = np.minimum(forward, backward).min(axis=0)
+        ecart[landmarks] = -1.0
+        L = int(ecart.argmax())
+        return None if ecart[L] <= 0 else L
+
+    @staticmethod
+    def _avoid(avant, landmarks, forward, backward, n, seed=0):
+        # Heuristique « avoid » (Goldberg & Werneck) : dans l'arbre des plus
+        # courts chemins d'une racine r, on pondère chaque sommet par l'erreur
+        # du minorant actuel d(r, v) - lb(r, v), puis on descend vers le
+        # sous-arbre le plus lourd qui ne contient pas déjà de repère
+        restants = np.setdiff1d(np.arange(n), landmarks)
+        if len(restants) == 0:
+            return None
+        r = int(np.random.default_rng(seed + len(landmarks)).choice(restants))
+        dist, pred = avant.arbre(r)
+        dist = np.array(dist)
+        atteints = np.flatnonzero(~np.isinf(dist))
+        if landmarks:
+            with np.errstate(invalid="ignore"):
+                lb = np.fmax(forward[:, atteints] - forward[:, [r]],
+                             backward[:, [r]] - backward[:, atteints]).max(axis=0)
+            poids = dist[atteints] - np.clip(np.nan_to_num(lb, nan=0.0), 0, None)
+        else:
+            poids = dist[atteints]
+        taille = np.zeros(n)
+        taille[atteints] = poids
+        bloque = np.zeros(n, dtype=bool)
+        bloque[landmarks] = True
+        enfants = [[] for _ in range(n)]
+        for v in atteints.tolist():
+            if pred[v] >= 0:
+                enfants[pred[v]].append(v)
+        ordre = [r]
+        for v in ordre:  # parcours en largeur de l'arbre
+            ordre.extend(enfants[v])
+        # Accumulation des tailles des feuilles vers la racine
+        for v in reversed(ordre):
+            p = pred[v]
+            if p >= 0:
+                taille[p] += taille[v]
+                bloque[p] |= bloque[v]
+        taille[bloque] = 0.0
+        v = r
+        while enfants[v]:
+            suivant = max(enfants[v], key=lambda c: taille[c])
+            if taille[suivant] <= 0:
+                break
+            v = suivant
+        return None if v in landmarks else v
+
+    # ----------------------
+    # Reconstruction incrémentale
+    # ----------------------
+    def update(self, origines, destinations, poids):
+        # Même topologie, poids modifiés : on garde les repères et on ne
+        # recalcule que les distances touchées par un arc changé. Un arc
+        # u -> v qui baisse compte s'il raccourcit d(L, v) ; un arc qui monte
+        # compte s'il était serré (sur un plus court chemin).
+        # Renvoie le nombre de lignes recalculées.
+        if len(poids) and poids.min() < 0:
+            raise ValueError("ALT exige des poids positifs !")
+        change = np.flatnonzero(self.poids != poids)
+        if len(change) == 0:
+            return 0
+        u, v = origines[change], destinations[change]
+        ancien, nouveau = self.poids[change], poids[change]
+        n = len(self.names)
+        avant = _Graphes(n, origines, destinations, poids)
+        arriere = avant.inverse()
+        recalculs = 0
+        for i, L in enumerate(self.landmarks.tolist()):
+            f, b = self.forward[i], self.backward[i]
+            if self._touche(f[u], f[v], ancien, nouveau):
+                self.forward[i] = avant.distances(L)
+                recalculs += 1
+            if self._touche(b[v], b[u], ancien, nouveau):
+                self.backward[i] = arriere.distances(L)
+                recalculs += 1
+        self.poids = np.array(poids, dtype=np.float64)
+        self._par_sommet()
+        return recalculs
+
+    @staticmethod
+    def _touche(du, dv, ancien, nouveau):
+        with np.errstate(invalid="ignore"):
+            baisse = (nouveau < ancien) & (du + nouveau < dv)
+            serre = (nouveau > ancien) & np.isfinite(du) & np.isclose(du + ancien, dv)
+        return bool((baisse | serre).any())
+
+    # ----------------------
+    # Sauvegarde
+    # ----------------------
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, names=np.array(self.names, dtype=str), landmarks=self.landmarks,
+                     forward=self.forward, backward=self.backward, poids=self.poids)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["names"].tolist(), data["landmarks"], data["forward"],
+                       data["backward"], data["poids"])
+
+    # ----------------------
+    # Minorant pour A*
+    # ----------------------
+    def heuristic(self, target):
+        # Renvoie h(node) : minorant de d(node, target) ; 0 si inconnu
+        t = self.index.get(target)
+        if t is None or not self.landmarks.size:
+            return lambda node: 0.0
+        ft, bt = self._fwd[t], self._bwd[t]
+        index, fwd, bwd = self.index, self._fwd, self._bwd
+
+        def h(node):
+            i = index.get(node)
+            if i is None:
+                return 0.0
+            meilleur = 0.0
+            for a, b in zip(ft, fwd[i]):
+                if a - b > meilleur:  # inf - inf = nan : comparaison fausse, ignorée
+                    meilleur = a - b
+            for a, b in zip(bwd[i], bt):
+                if a - b > meilleur:
+                    meilleur = a - b
+            return meilleur
+        return h
+
+
+class _Graphes:
+    # Représentation CSR (listes Python) pour les Dijkstra du prétraitement
+    def __init__(self, n, origines, destinations, poids):
+        self.n = n
+        self.args = (origines, destinations, poids)
+        offsets, targets, weights = csr_arrays(n, origines, destinations, poids)
+        self.offsets, self.targets, self.weights = offsets.tolist(), targets.tolist(), weights.tolist()
+
+    def inverse(self):
+        origines, destinations, poids = self.args
+        return _Graphes(self.n, destinations, origines, poids)
+
+    def arbre(self, source):
+        return dijkstra_tree(self.offsets, self.targets, self.weights, source, self.n)
+
+    def distances(self, source):
+        return self.arbre(source)[0]
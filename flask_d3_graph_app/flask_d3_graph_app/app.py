@@ -1,13 +1,48 @@
+import gzip
+import hashlib
+import json
+import math
 import os
-from flask import Flask, jsonify, request, render_template
-import networkx as nx
-from algorithms import bfs, dfs, dijkstra, kruskal, prim, bellman_ford, floyd_warshall_all_pairs
+import threading
+from flask import Flask, Response, jsonify, request, render_template
+from algorithms import Graph, bfs, dfs, dijkstra, kruskal, prim, bellman_ford, floyd_warshall_all_pairs, graph_version, all_pairs_store
+from algorithms import batch_shortest_paths, distance_matrix, all_pairs_ready, graph_name, graph_links
+from algorithms import apply_changes, CHANGE_OPS, adopt_tree_table, tree_ready
+from cache import ResultCache
+from jobs import JobManager, FINISHED, fork_safe_lock
+from loaders import register_graphs
+
+try:
+    import brotli  # facultatif : /api/graph est aussi servi en br s'il est installé
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
+# Cache des résultats de /api/run (taille et durée de vie réglables)
+RESULTS = ResultCache(
+    maxsize=int(os.environ.get("RESULT_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", 300)),
+)
+
+# Calculs longs : exécutés dans des processus fils (voir jobs.py), au plus
+# JOB_WORKERS à la fois, chacun arrêté au bout de JOB_TIMEOUT secondes
+JOBS = JobManager(
+    max_workers=int(os.environ.get("JOB_WORKERS", 0)) or None,
+    default_timeout=float(os.environ.get("JOB_TIMEOUT", 300)),
+)
+
+# /api/run bascule en tâche asynchrone pour ces algorithmes au-delà de
+# ASYNC_MIN_NODES sommets ; les petites requêtes restent synchrones
+ASYNC_ALGOS = {"floyd", "johnson", "bellman"}
+ASYNC_MIN_NODES = int(os.environ.get("ASYNC_MIN_NODES", 500))
+
+# Taille maximale d'un lot /api/batch (requêtes, ou cases de la matrice)
+BATCH_MAX = int(os.environ.get("BATCH_MAX", 100_000))
+
 # ---------- Déclaration de 2 graphes ----------
 def make_fr_routes():
-    G = nx.Graph()
+    G = Graph(name="fr_routes")
     edges = [
         ("Rennes", "Nantes", 45), ("Rennes", "Caen", 75),
         ("Rennes", "Paris", 110), ("Rennes", "Bordeaux", 130),
@@ -20,83 +55,221 @@ def make_fr_routes():
         ("Lyon", "Grenoble", 40), ("Lyon", "Nancy", 90),
         ("Nancy", "Grenoble", 80),
     ]
+    # coordonnées (lat, lon) des villes : heuristique de A*
+    coords = {
+        "Rennes": (48.1173, -1.6778), "Nantes": (47.2184, -1.5536),
+        "Caen": (49.1829, -0.3707), "Paris": (48.8566, 2.3522),
+        "Bordeaux": (44.8378, -0.5792), "Lille": (50.6292, 3.0573),
+        "Dijon": (47.3220, 5.0415), "Lyon": (45.7640, 4.8357),
+        "Grenoble": (45.1885, 5.7245), "Nancy": (48.6921, 6.1844),
+    }
     for u, v, w in edges:
-        G.add_edge(u, v, weight=w)
+        G.add_edge(u, v, w)
+    G.coords.update(coords)
     return G, "Paris"  # source fixée pour ce graphe
 
 def make_neg_demo():
     # petit graphe orienté pour Bellman-Ford
-    G = nx.DiGraph()
+    G = Graph(directed=True, name="demo_small")
     edges = [
         ("A","B",4), ("A","C",2), ("B","C",-1), ("B","D",2),
         ("C","D",3), ("C","E",-2), ("E","D",1)
     ]
     for u, v, w in edges:
-        G.add_edge(u, v, weight=w)
+        G.add_edge(u, v, w)
     return G, "A"      # source fixée ici
 
 GRAPHS = {
-    "fr_routes": {
-        "graph": make_fr_routes()[0],
-        "default_source": make_fr_routes()[1]
-    },
-    "demo_small": {
-        "graph": make_neg_demo()[0],
-        "default_source": make_neg_demo()[1]
-    },
+    nom: {"graph": graphe, "default_source": source}
+    for nom, (graphe, source) in (("fr_routes", make_fr_routes()), ("demo_small", make_neg_demo()))
 }
 
+# Graphes chargés depuis des fichiers : un <nom>.json par graphe dans GRAPHS_DIR
+# (voir loaders.register_graphs)
+GRAPHS_DIR = os.environ.get("GRAPHS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphs"))
+GRAPHS.update(register_graphs(GRAPHS_DIR))
+
 
 def get_graph(name: str):
-    return GRAPHS.get(name) or GRAPHS["fr_routes"]
+    return (GRAPHS.get(name) if isinstance(name, str) else None) or GRAPHS["fr_routes"]
+
+
+# ---------- Charges utiles de /api/graph ----------
+# Sérialisées une fois par graphe, version et présentation, compressées
+# d'avance et servies avec un ETag fort : un navigateur à jour reçoit 304.
+#   "objects" : {"nodes": [{"id"}], "links": [{"source", "target", "weight"}]}
+#   "columns" : {"nodes": [id], "links": {"source": [i], "target": [i], "weight": [w]}}
+#               (indices dans nodes : bien plus compact sur un gros graphe)
+GRAPH_LAYOUTS = ("objects", "columns")
+_PAYLOADS = {}  # (nom, présentation) -> charge utile de la dernière version
+_payloads_lock = threading.Lock()
+
+
+def _graph_payload(name, pack, layout):
+    G = pack["graph"]
+    version = graph_version(G)
+    with _payloads_lock:
+        payload = _PAYLOADS.get((name, layout))
+    if payload is not None and payload["source"] is G and payload["version"] == version:
+        return payload
+
+    noms, aretes = graph_links(G)
+    data = {"name": name, "defaultSource": pack["default_source"], "directed": G.is_directed(), "version": version}
+    if layout == "columns":
+        index = {n: i for i, n in enumerate(noms)}
+        data["nodes"] = noms
+        data["links"] = {
+            "source": [index[u] for u, _, _ in aretes],
+            "target": [index[v] for _, v, _ in aretes],
+            "weight": [w for _, _, w in aretes],
+        }
+    else:
+        data["nodes"] = [{"id": n} for n in noms]
+        data["links"] = [{"source": u, "target": v, "weight": w} for u, v, w in aretes]
+    corps = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    bodies = {"identity": corps, "gzip": gzip.compress(corps, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(corps)
+    payload = {"source": G, "version": version, "etag": hashlib.sha256(corps).hexdigest()[:32], "bodies": bodies}
+    with _payloads_lock:
+        _PAYLOADS[(name, layout)] = payload
+    return payload
 
 # ---------- Routes ----------
 @app.route("/")
 def index():
     return render_template("index.html")
 
+@app.get("/api/graphs")
+def api_graphs():
+    # Graphes disponibles (intégrés + chargés depuis GRAPHS_DIR)
+    return jsonify([
+        {"name": name, "nodes": pack["graph"].number_of_nodes(), "directed": pack["graph"].is_directed(),
+         "version": graph_version(pack["graph"])}
+        for name, pack in GRAPHS.items()
+    ])
+
+
 @app.get("/api/graph")
 def api_graph():
     name = request.args.get("name", "fr_routes")  # <-- récupère ?name= depuis l’URL
-    print(">>> Graphe demandé :", name)
+    if name not in GRAPHS:
+        name = "fr_routes"
+    layout = request.args.get("format", "objects")
+    if layout not in GRAPH_LAYOUTS:
+        return jsonify({"error": f"format inconnu : {layout} ({', '.join(GRAPH_LAYOUTS)})"}), 400
+    payload = _graph_payload(name, GRAPHS[name], layout)
 
-    pack = get_graph(name)                       # <-- récupère le bon graphe selon ce nom
-    G = pack["graph"]
-    print("Graph directed ?", G.is_directed())
+    # Une représentation par encodage, donc un ETag fort par encodage
+    encodage = next((e for e in ("br", "gzip") if e in payload["bodies"] and e in request.accept_encodings),
+                    "identity")
+    etag = payload["etag"] if encodage == "identity" else f"{payload['etag']}-{encodage}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(payload["bodies"][encodage], mimetype="application/json")
+        if encodage != "identity":
+            response.headers["Content-Encoding"] = encodage
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"  # toujours revalider : le graphe peut changer
+    return response
 
-    nodes = [{"id": str(n)} for n in G.nodes()]
-    links = [
-        {"source": str(u), "target": str(v), "weight": float(d.get("weight", 1.0))}
-        for u, v, d in G.edges(data=True)
-    ]
 
-    return jsonify({
-        "name": name,
-        "defaultSource": pack["default_source"],
-        "nodes": nodes,
-        "links": links,
-        "directed": G.is_directed()
-    })
+# ---------- Modifications d'un graphe ----------
+# POST /api/graphs/<nom>/changes
+#   {"changes": [{"op": "update", "source": u, "target": v, "weight": w},
+#                {"op": "add", "source": u, "target": v, "weight": w},
+#                {"op": "remove", "source": u, "target": v}],
+#    "version": n}   facultatif : 409 si le graphe n'est plus à cette version
+# Le lot est appliqué en entier ou pas du tout, et donne une seule nouvelle
+# version ; les arbres et matrices déjà calculés sont réparés (dynamic.py).
+_changes_lock = fork_safe_lock()  # un fils de jobs.py ne copie jamais un graphe à moitié modifié
 
 
-@app.post("/api/run")
-def api_run():
+@app.post("/api/graphs/<name>/changes")
+def api_graph_changes(name):
+    if name not in GRAPHS:
+        return jsonify({"error": f"Graphe inconnu : {name}"}), 404
     data = request.get_json(force=True)
-    name = data.get("graph", "fr_routes")
-    pack = get_graph(name)
-    G = pack["graph"]
+    try:
+        changes = [(c["op"], c["source"], c["target"], c.get("weight")) for c in data["changes"]]
+        if not all(isinstance(x, str) for op, u, v, _ in changes for x in (op, u, v)):
+            raise TypeError
+    except (KeyError, TypeError):
+        return jsonify({"error": "changes : liste de {op, source, target[, weight]} attendue",
+                        "ops": list(CHANGE_OPS)}), 400
+    for op, u, v, w in changes:
+        if op != "remove" and (isinstance(w, bool) or not isinstance(w, (int, float))):
+            return jsonify({"error": f"Poids invalide pour {u} -> {v} : {w!r}"}), 400
+    G = GRAPHS[name]["graph"]
+    with _changes_lock:
+        ancienne = graph_version(G)
+        attendue = data.get("version")
+        if attendue is not None and attendue != ancienne:
+            return jsonify({"error": "Le graphe a changé entre-temps", "version": ancienne}), 409
+        try:
+            summary = apply_changes(G, changes)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        RESULTS.carry_over(name, ancienne, summary["version"], _survivor(changes, summary["arcs"]))
+    return jsonify({"name": name, **summary})
 
-    # ✅ PRENDRE la source envoyée par l’UI si présente, sinon la valeur par défaut
-    source = data.get("source") or pack["default_source"]
 
-    # ✅ Validation : la source doit exister dans le graphe
-    if source not in G:
-        return jsonify({"error": f"Source inconnue: {source}"}), 400
+def _survivor(changes, arcs):
+    # Résultats en cache de l'ancienne version encore exacts après le lot :
+    #   - bfs / dfs : seulement des mises à jour de poids (topologie et ordre
+    #     des voisins inchangés) ;
+    #   - plus courts chemins, arbres couvrants : si aucun poids n'a baissé
+    #     (ni arc ajouté), un chemin ou un arbre dont aucun arc n'a changé
+    #     reste optimal ;
+    #   - bellman, floyd, johnson : recalculés à la demande depuis les arbres
+    #     et matrices réparés par apply_changes.
+    poids_seuls = all(op == "update" for op, _, _, _ in changes)
+    baisse = any(a["new"] is not None and (a["old"] is None or a["new"] < a["old"]) for a in arcs)
+    touches = {(a["source"], a["target"]) for a in arcs}
 
-    target = data.get("target")
-    algo = data.get("algo")
-    result = {}
+    def keep(key, result):
+        algo = key[2]
+        if algo in ("bfs", "dfs"):
+            return poids_seuls
+        if baisse:
+            return False
+        if algo in POINT_TO_POINT:
+            path = result["path"]
+            return not any(arc in touches for arc in zip(path, path[1:]))
+        if algo in ("kruskal", "prim"):
+            return not any((e["source"], e["target"]) in touches or (e["target"], e["source"]) in touches
+                           for e in result["tree_edges"])
+        return False
+    return keep
+
+
+# Algorithmes dont le résultat ne dépend pas de la source choisie :
+# une seule entrée de cache est partagée par toutes les sources
+SOURCE_INDEPENDENT = {"kruskal", "floyd", "johnson"}
+
+# Requêtes point à point (cible obligatoire) et moteur de calcul associé
+POINT_TO_POINT = {"dijkstra": "dijkstra", "bidijkstra": "bidirectional", "astar": "astar", "alt": "alt", "ch": "ch"}
+
+
+def _result_key(G, algo, source, target):
+    return (
+        graph_name(G),
+        graph_version(G),
+        algo,
+        None if algo in SOURCE_INDEPENDENT else source,
+        target if algo in POINT_TO_POINT else None,
+    )
+
+
+def _path_result(path, cost):
+    edges_on_path = [{"source": path[i], "target": path[i+1]} for i in range(len(path)-1)] if len(path) > 1 else []
+    return {"path": path, "cost": cost, "edges_to_highlight": edges_on_path, "nodes_to_highlight": path}
 
+
+def _run_algorithm(G, algo, source, target):
+    # Renvoie (résultat, None) ou (None, (corps JSON d'erreur, code HTTP))
     if algo == "bfs":
         order = bfs(G, source)
         result = {"order": order, "nodes_to_highlight": order}
@@ -105,14 +278,12 @@ def api_run():
         order = dfs(G, source)
         result = {"order": order, "nodes_to_highlight": order}
 
-    elif algo == "dijkstra":
-        if not target:
-            return jsonify({"error": "Cible manquante"}), 400
-        if target not in G:
-            return jsonify({"error": f"Cible inconnue: {target}"}), 400
-        path, cost = dijkstra(G, source, target)
-        edges_on_path = [{"source": path[i], "target": path[i+1]} for i in range(len(path)-1)] if len(path) > 1 else []
-        result = {"path": path, "cost": cost, "edges_to_highlight": edges_on_path, "nodes_to_highlight": path}
+    elif algo in POINT_TO_POINT:
+        try:
+            path, cost = dijkstra(G, source, target, POINT_TO_POINT[algo])
+        except ValueError as e:  # prétraitement impossible (ex. poids négatifs)
+            return None, ({"error": str(e)}, 400)
+        result = _path_result(path, cost)
 
     elif algo == "kruskal":
         mst_edges, total = kruskal(G)
@@ -124,24 +295,384 @@ def api_run():
         edges_fmt = [{"source": u, "target": v} for u, v, _ in mst_edges]
         result = {"tree_edges": edges_fmt, "total": total, "edges_to_highlight": edges_fmt}
 
-
     elif algo == "bellman":
         table = bellman_ford(G, source)  # ⚡ renvoie {"table": [...]}
         if isinstance(table, dict) and "__negative_cycle__" in table:
-            return jsonify({"error": "Cycle négatif détecté"}), 400
+            return None, ({"error": "Cycle négatif détecté", "cycle": table["cycle"]}, 400)
         result = {
             "table": table["table"],  # envoie directement le tableau
             "nodes_to_highlight": [source]  # met en évidence la source
         }
 
-    elif algo == "floyd":
-        dist = floyd_warshall_all_pairs(G)
+    elif algo in ("floyd", "johnson"):
+        dist = floyd_warshall_all_pairs(G, "johnson" if algo == "johnson" else "auto")
+        if "__negative_cycle__" in dist:
+            return None, ({"error": "Cycle négatif détecté"}, 400)
         result = {"distances": dist}
 
     else:
-        return jsonify({"error": "Unknown algorithm"}), 400
+        return None, ({"error": "Unknown algorithm"}, 400)
+
+    return result, None
+
+
+def _floyd_rows(store, start, stop):
+    # Une ligne de la matrice all-pairs, alignée sur store.nodes (None = infini)
+    for i in range(start, stop):
+        yield {
+            "source": store.nodes[i],
+            "distances": [None if math.isinf(d) else d for d in store.dist[i].tolist()],
+        }
+
+
+def _row_arg(data, key):
+    # Entier positif ou nul (ou None s'il est absent) ; ValueError sinon
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{key} : entier positif ou nul attendu")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{key} : entier positif ou nul attendu") from None
+    if value < 0:
+        raise ValueError(f"{key} : entier positif ou nul attendu")
+    return value
+
+
+def _floyd_response(G, algo, data, row_start, row_count):
+    # Floyd-Warshall ligne par ligne, lues dans la matrice sur disque :
+    #   stream=true          -> NDJSON (en-tête {"nodes"} puis une ligne par source)
+    #   row_start/row_count  -> page JSON de lignes, avec l'indice de la suivante
+    store = all_pairs_store(G, "johnson" if algo == "johnson" else "auto")
+    if store.negative_cycle:
+        return jsonify({"error": "Cycle négatif détecté"}), 400
+    n = len(store.nodes)
+    start = min(row_start or 0, n)
+    stop = n if row_count is None else min(start + row_count, n)
+
+    if data.get("stream"):
+        def generate():
+            yield json.dumps({"nodes": store.nodes, "row_start": start, "row_stop": stop}) + "\n"
+            for row in _floyd_rows(store, start, stop):
+                yield json.dumps(row) + "\n"
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    return jsonify({
+        "nodes": store.nodes,
+        "rows": list(_floyd_rows(store, start, stop)),
+        "row_start": start,
+        "next_row": stop if stop < n else None,
+    })
+
+
+def _parse_run(data):
+    # Renvoie (G, algo, source, target, None) ou (..., réponse d'erreur)
+    name = data.get("graph", "fr_routes")
+    pack = get_graph(name)
+    G = pack["graph"]
+
+    # ✅ PRENDRE la source envoyée par l’UI si présente, sinon la valeur par défaut
+    source = data.get("source") or pack["default_source"]
+    target = data.get("target")
+    algo = data.get("algo")
+
+    # ✅ Validation : la source doit exister dans le graphe
+    if source not in G:
+        return G, algo, source, target, (jsonify({"error": f"Source inconnue: {source}"}), 400)
+
+    if algo in POINT_TO_POINT:
+        if not target:
+            return G, algo, source, target, (jsonify({"error": "Cible manquante"}), 400)
+        if target not in G:
+            return G, algo, source, target, (jsonify({"error": f"Cible inconnue: {target}"}), 400)
+    return G, algo, source, target, None
+
+
+def _job_algorithm(G, algo, source, target):
+    # Exécuté dans le processus fils : résultat, ou corps d'erreur {"error": ...}
+    result, error = _run_algorithm(G, algo, source, target)
+    return error[0] if error else result
+
+
+def _job_all_pairs(G, algo):
+    # Exécuté dans le processus fils : les matrices restent sur disque
+    store = all_pairs_store(G, "johnson" if algo == "johnson" else "auto")
+    return {"ready": True, "negative_cycle": store.negative_cycle}
+
+
+def _submit_algorithm(G, algo, source, target, timeout=None):
+    key = _result_key(G, algo, source, target)
+
+    def on_done(job):
+        if "error" not in job.result:
+            RESULTS.put(key, job.result)
+            if algo == "bellman":  # arbre calculé dans le fils : gardé ici pour être réparé
+                adopt_tree_table(G, source, key[1], job.result["table"])
+
+    return JOBS.submit(_job_algorithm, G, algo, source, target, timeout=timeout, on_done=on_done, key=key)
+
+
+def _job_response(job, code=200):
+    response = jsonify(job.to_dict())
+    response.status_code = code
+    if code == 202:
+        response.headers["Location"] = f"/api/jobs/{job.id}"
+    return response
+
+
+@app.post("/api/run")
+def api_run():
+    data = request.get_json(force=True)
+    G, algo, source, target, error = _parse_run(data)
+    if error:
+        return error
+    heavy = algo in ASYNC_ALGOS and G.number_of_nodes() >= ASYNC_MIN_NODES
+    if algo == "bellman" and heavy and tree_ready(G, source):
+        heavy = False  # arbre déjà en cache (réparé après une modification) : réponse immédiate
+
+    if algo in ("floyd", "johnson") and ("stream" in data or "row_start" in data or "row_count" in data):
+        try:
+            row_start, row_count = _row_arg(data, "row_start"), _row_arg(data, "row_count")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if heavy and not all_pairs_ready(G):
+            # matrices pas encore calculées : 202, le client relance une fois la tâche finie
+            job = JOBS.submit(_job_all_pairs, G, algo, key=("all_pairs", graph_name(G), graph_version(G)))
+            return _job_response(job, 202)
+        return _floyd_response(G, algo, data, row_start, row_count)
+
+    key = _result_key(G, algo, source, target)
+    result = RESULTS.get(key)
+    status = "HIT"
+    if result is None:
+        if heavy:
+            return _job_response(_submit_algorithm(G, algo, source, target), 202)
+        status = "MISS"
+        result, error = _run_algorithm(G, algo, source, target)
+        if error:
+            body, code = error
+            return jsonify(body), code
+        if graph_version(G) == key[1]:  # graphe modifié pendant le calcul : résultat pas gardé
+            RESULTS.put(key, result)
+
+    response = jsonify(result)
+    response.headers["X-Cache"] = status
+    response.headers["Cache-Control"] = f"private, max-age={int(RESULTS.ttl)}"
+    return response
+
+
+# ---------- Tâches asynchrones ----------
+# POST   /api/jobs            corps de /api/run (+ "timeout" en s) -> 202 + id
+# GET    /api/jobs/<id>       état (+ résultat) ; ?wait=s attend la fin au plus s secondes
+# GET    /api/jobs/<id>/stream  NDJSON : une ligne par changement d'état, jusqu'à la fin
+# DELETE /api/jobs/<id>       annulation (le processus de calcul est tué)
+def _seconds_arg(value, key):
+    # Durée en secondes : nombre fini positif ou nul ; ValueError sinon
+    if isinstance(value, bool):
+        raise ValueError(f"{key} : durée en secondes attendue")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} : durée en secondes attendue") from None
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"{key} : durée en secondes attendue")
+    return value
+
+
+@app.post("/api/jobs")
+def api_jobs_submit():
+    data = request.get_json(force=True)
+    G, algo, source, target, error = _parse_run(data)
+    if error:
+        return error
+    timeout = data.get("timeout")
+    if timeout is not None:
+        try:
+            timeout = _seconds_arg(timeout, "timeout")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if timeout == 0:
+            return jsonify({"error": "timeout : durée strictement positive attendue"}), 400
+        timeout = min(timeout, JOBS.default_timeout)
+    return _job_response(_submit_algorithm(G, algo, source, target, timeout), 202)
+
+
+@app.get("/api/jobs/<job_id>")
+def api_jobs_get(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue"}), 404
+    try:
+        wait = min(_seconds_arg(request.args.get("wait", 0), "wait"), 30.0)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if wait > 0:
+        job.done.wait(wait)
+    return _job_response(job)
+
+
+@app.get("/api/jobs/<job_id>/stream")
+def api_jobs_stream(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue"}), 404
+
+    def generate():
+        dernier = None
+        while True:
+            job.done.wait(0.5)
+            if job.status in FINISHED:
+                yield json.dumps(job.to_dict()) + "\n"
+                return
+            if job.status != dernier:
+                dernier = job.status
+                yield json.dumps({"id": job.id, "status": job.status}) + "\n"
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.delete("/api/jobs/<job_id>")
+def api_jobs_cancel(job_id):
+    job = JOBS.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue"}), 404
+    return _job_response(job)
+
+
+@app.get("/api/distances")
+def api_distances():
+    # Lecture ciblée dans la matrice all-pairs sur disque :
+    #   ?name=...&source=A            -> ligne complète depuis A
+    #   ?name=...&source=A&source=B&target=C&target=D -> sous-matrice
+    # Sur un gros graphe, des matrices pas encore calculées le sont dans une
+    # tâche (202, comme /api/run) : le client relance une fois la tâche finie
+    pack = get_graph(request.args.get("name", "fr_routes"))
+    G = pack["graph"]
+    sources = request.args.getlist("source") or [pack["default_source"]]
+    if G.number_of_nodes() >= ASYNC_MIN_NODES and not all_pairs_ready(G):
+        job = JOBS.submit(_job_all_pairs, G, "floyd", key=("all_pairs", graph_name(G), graph_version(G)))
+        return _job_response(job, 202)
+    store = all_pairs_store(G)
+    if store.negative_cycle:
+        return jsonify({"error": "Cycle négatif détecté"}), 400
+
+    targets = request.args.getlist("target") or store.nodes
+    inconnus = [n for n in sources + targets if n not in store.index]
+    if inconnus:
+        return jsonify({"error": f"Sommet inconnu: {inconnus[0]}"}), 400
+
+    rows = store.submatrix(sources, targets).tolist()
+    return jsonify({
+        "sources": sources,
+        "targets": targets,
+        "distances": [[None if math.isinf(d) else d for d in row] for row in rows],
+    })
+
+
+def _names_arg(data, key):
+    # Liste de noms de sommets (chaînes) ; ValueError sinon
+    value = data.get(key)
+    if not isinstance(value, list) or not all(isinstance(n, str) for n in value):
+        raise ValueError(f"{key} : liste de noms de sommets attendue")
+    return value
+
+
+def _query_arg(q):
+    # Requête de /api/batch : objet dont algo / source / target sont des chaînes (ou absents)
+    if not isinstance(q, dict) or not all(isinstance(q.get(k), (str, type(None))) for k in ("algo", "source", "target")):
+        raise ValueError("queries : liste de {algo, source, target} attendue")
+    return q
+
+
+@app.post("/api/batch")
+def api_batch():
+    # Deux formes de corps JSON :
+    #   {"graph": ..., "queries": [{"algo": ..., "source": ..., "target": ...}, ...]}
+    #       -> {"results": [...]} dans l'ordre des requêtes ; les requêtes "dijkstra"
+    #          de même source partagent un seul parcours, lancés en parallèle
+    #   {"graph": ..., "sources": [...], "targets": [...]}
+    #       -> matrice des distances sources x cibles (None : inatteignable)
+    data = request.get_json(force=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "objet JSON attendu"}), 400
+    pack = get_graph(data.get("graph", "fr_routes"))
+    G = pack["graph"]
+
+    if "sources" in data:
+        try:
+            sources = _names_arg(data, "sources")
+            targets = _names_arg(data, "targets") if data.get("targets") is not None else sources
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if len(sources) * len(targets) > BATCH_MAX:
+            return jsonify({"error": f"Matrice trop grande (max {BATCH_MAX} cases)"}), 400
+        inconnus = [n for n in sources + targets if n not in G]
+        if inconnus:
+            return jsonify({"error": f"Sommet inconnu: {inconnus[0]}"}), 400
+        try:
+            matrice = distance_matrix(G, sources, targets)
+        except ValueError as e:  # cycle négatif
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "sources": sources,
+            "targets": targets,
+            "distances": [[None if math.isinf(d) else d for d in row] for row in matrice],
+        })
+
+    queries = data.get("queries") or []
+    try:
+        if not isinstance(queries, list):
+            raise ValueError("queries : liste de {algo, source, target} attendue")
+        queries = [_query_arg(q) for q in queries]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if len(queries) > BATCH_MAX:
+        return jsonify({"error": f"Trop de requêtes (max {BATCH_MAX})"}), 400
+
+    results = [None] * len(queries)
+    groupees = []  # (position, clé de cache, source, cible) des Dijkstra à regrouper
+    for k, q in enumerate(queries):
+        algo = q.get("algo", "dijkstra")
+        source = q.get("source") or pack["default_source"]
+        target = q.get("target")
+        if source not in G:
+            results[k] = {"error": f"Source inconnue: {source}"}
+            continue
+        if algo in POINT_TO_POINT and target not in G:
+            results[k] = {"error": f"Cible inconnue: {target}" if target else "Cible manquante"}
+            continue
+        key = _result_key(G, algo, source, target)
+        cached = RESULTS.get(key)
+        if cached is not None:
+            results[k] = cached
+        elif algo == "dijkstra":
+            groupees.append((k, key, source, target))
+        else:
+            result, error = _run_algorithm(G, algo, source, target)
+            results[k] = error[0] if error else result
+            if not error and graph_version(G) == key[1]:
+                RESULTS.put(key, result)
+
+    if groupees:
+        try:
+            chemins = batch_shortest_paths(G, [(s, t) for _, _, s, t in groupees])
+        except ValueError as e:  # cycle négatif
+            chemins = [e] * len(groupees)
+        for (k, key, _, _), reponse in zip(groupees, chemins):
+            if isinstance(reponse, ValueError):
+                results[k] = {"error": str(reponse)}
+                continue
+            results[k] = _path_result(*reponse)
+            if graph_version(G) == key[1]:
+                RESULTS.put(key, results[k])
+
+    return jsonify({"results": results})
+
 
-    return jsonify(result)
+@app.get("/api/cache")
+def api_cache():
+    return jsonify(RESULTS.stats())
 
 
 if __name__ == "__main__":
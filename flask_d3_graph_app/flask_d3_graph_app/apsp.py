@@ -0,0 +1,392 @@
+# apsp.py
+# ===========================================================
+# Plus courts chemins entre toutes les paires (all-pairs)
+# ===========================================================
+# Trois moteurs travaillant sur des matrices NumPy (dist, suivant) :
+#   - "dense"    : Floyd-Warshall vectorisé, une diffusion NumPy par étape k
+#   - "blocked"  : Floyd-Warshall par tuiles de BLOCK_SIZE sommets (tient en cache)
+#   - "dijkstra" : un Dijkstra par source, réparti sur un pool de processus qui
+#                  écrivent leurs lignes dans une matrice mappée en mémoire
+#   - "johnson"  : Bellman-Ford depuis une source virtuelle pour repondérer les
+#                  arcs (poids >= 0), puis les mêmes Dijkstra répétés
+# suivant[i, j] = sommet qui suit i sur le meilleur chemin i -> j (-1 : aucun).
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import heapq
+import json
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+BLOCK_SIZE = 256          # côté d'une tuile : 256 x 256 float64 = 512 Ko
+DENSE_MAX_NODES = 1024    # en dessous, la version vectorisée simple suffit
+SPARSE_DENSITY = 0.05     # arcs / n² sous lequel on préfère les Dijkstra répétés
+DIJKSTRA_CHUNK = 64       # nombre de sources traitées par tâche du pool
+
+STRATEGIES = ("auto", "dense", "blocked", "dijkstra", "johnson")
+
+
+def initial_matrices(n, origines, destinations, poids):
+    # Arête directe la moins chère, 0 sur la diagonale, inf ailleurs
+    dist = np.full((n, n), np.inf)
+    np.minimum.at(dist, (origines, destinations), poids)
+    diag = np.arange(n)
+    dist[diag, diag] = np.minimum(dist[diag, diag], 0.0)
+    suivant = np.where(np.isfinite(dist), np.arange(n)[None, :], -1)
+    return dist, suivant
+
+
+def choose_strategy(n, nb_arcs, min_weight):
+    if n <= DENSE_MAX_NODES:
+        return "dense"
+    # Graphe creux : Dijkstra répétés, précédés de la repondération de Johnson
+    # s'il y a des poids négatifs
+    if nb_arcs < SPARSE_DENSITY * n * n:
+        return "johnson" if min_weight < 0 else "dijkstra"
+    # Les blocs exigent des poids strictement positifs
+    return "blocked" if min_weight > 0 else "dense"
+
+
+def all_pairs(n, origines, destinations, poids, strategy="auto", workers=None, directory=None):
+    # Avec directory, les matrices sont écrites dans directory/dist.npy et
+    # directory/next.npy puis renvoyées mappées en mémoire (lecture seule)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue : {strategy} (attendu : {', '.join(STRATEGIES)})")
+    min_weight = float(poids.min()) if len(poids) else 0.0
+    if strategy == "auto":
+        strategy = choose_strategy(n, len(poids), min_weight)
+    if strategy == "dijkstra":
+        if min_weight < 0:
+            raise ValueError("Dijkstra ne supporte pas les poids négatifs !")
+        return dijkstra_all_pairs(n, origines, destinations, poids, workers=workers, directory=directory)
+    if strategy == "johnson":
+        potentiels = johnson_potentials(n, origines, destinations, poids)
+        if potentiels is not None:
+            # w'(u, v) = w + h(u) - h(v) >= 0 ; arrondi flottant ramené à 0
+            repondere = np.maximum(poids + potentiels[origines] - potentiels[destinations], 0.0)
+            return dijkstra_all_pairs(n, origines, destinations, repondere, workers=workers,
+                                      directory=directory, potentiels=potentiels)
+        strategy = "dense"  # cycle négatif : Floyd-Warshall le signale sur la diagonale
+    if strategy == "blocked" and min_weight <= 0:
+        # Un cycle de poids nul peut boucler la matrice des successeurs
+        raise ValueError("Floyd-Warshall par blocs exige des poids strictement positifs !")
+
+    dist, suivant = initial_matrices(n, origines, destinations, poids)
+    if strategy == "dense":
+        dense_floyd_warshall(dist, suivant)
+    else:
+        blocked_floyd_warshall(dist, suivant)
+    if directory is not None:
+        np.save(os.path.join(directory, "dist.npy"), dist)
+        np.save(os.path.join(directory, "next.npy"), suivant)
+        return (np.load(os.path.join(directory, "dist.npy"), mmap_mode="r"),
+                np.load(os.path.join(directory, "next.npy"), mmap_mode="r"))
+    return dist, suivant
+
+
+def path_from_next(sommets, suivant, i, j):
+    # Chemin i -> j reconstruit à partir de la matrice des successeurs
+    if suivant[i, j] < 0:
+        return []
+    path = [sommets[i]]
+    while i != j:
+        i = int(suivant[i, j])
+        path.append(sommets[i])
+    return path
+
+
+# ----------------------
+# Floyd-Warshall vectorisé
+# ----------------------
+def dense_floyd_warshall(dist, suivant):
+    _relax_block(dist, suivant, slice(None), slice(None), range(dist.shape[0]))
+
+
+def _relax_block(dist, suivant, rows, cols, inters):
+    # Pour chaque intermédiaire k (dans l'ordre), tente rows -> k -> cols.
+    # Les tranches sont des vues : la mise à jour se fait en place.
+    d_bloc = dist[rows, cols]
+    s_bloc = suivant[rows, cols]
+    for k in inters:
+        via = dist[rows, k][:, None] + dist[k, cols][None, :]
+        mieux = via < d_bloc
+        np.copyto(d_bloc, via, where=mieux)
+        np.copyto(s_bloc, np.broadcast_to(suivant[rows, k][:, None], s_bloc.shape), where=mieux)
+
+
+# ----------------------
+# Floyd-Warshall par blocs
+# ----------------------
+def blocked_floyd_warshall(dist, suivant, block_size=BLOCK_SIZE):
+    n = dist.shape[0]
+    blocs = [slice(b, min(b + block_size, n)) for b in range(0, n, block_size)]
+    for kb in blocs:
+        inters = range(kb.start, kb.stop)
+        # Phase 1 : bloc diagonal
+        _relax_block(dist, suivant, kb, kb, inters)
+        # Phase 2 : ligne et colonne du bloc diagonal
+        for b in blocs:
+            if b is not kb:
+                _relax_block(dist, suivant, kb, b, inters)
+                _relax_block(dist, suivant, b, kb, inters)
+        # Phase 3 : tous les autres blocs, qui ne dépendent que des phases 1 et 2
+        for bi in blocs:
+            if bi is kb:
+                continue
+            for bj in blocs:
+                if bj is not kb:
+                    _relax_block(dist, suivant, bi, bj, inters)
+
+
+# ----------------------
+# Dijkstra répétés sur un pool de processus
+# ----------------------
+def csr_arrays(n, origines, destinations, poids):
+    # Regroupe les arcs par origine (tri stable) : offsets, destinations, poids
+    ordre = np.argsort(origines, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origines, minlength=n), out=offsets[1:])
+    return offsets, destinations[ordre], poids[ordre]
+
+
+def dijkstra_row(offsets, targets, weights, source, n):
+    # Dijkstra par tas sur des identifiants entiers : (distances, premier saut)
+    dist = [math.inf] * n
+    premier = [-1] * n
+    dist[source] = 0.0
+    premier[source] = source
+    tas = [(0.0, source)]
+    while tas:
+        d, u = heapq.heappop(tas)
+        if d > dist[u]:
+            continue  # entrée périmée
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                premier[v] = v if u == source else premier[u]
+                heapq.heappush(tas, (nd, v))
+    return dist, premier
+
+
+def johnson_potentials(n, origines, destinations, poids):
+    # Bellman-Ford vectorisé depuis une source virtuelle reliée à tous les
+    # sommets par un arc de poids 0 : h(v) = distance depuis cette source.
+    # Renvoie None si un cycle négatif empêche la repondération.
+    h = np.zeros(n)
+    for _ in range(n + 1):
+        nouveau = h.copy()
+        np.minimum.at(nouveau, destinations, h[origines] + poids)
+        if not (nouveau < h).any():
+            return h
+        h = nouveau
+    return None
+
+
+_worker = {}
+
+
+def _init_worker(offsets, targets, weights, dist_path, next_path, potentiels):
+    # Exécuté une fois par processus : le graphe est transmis une seule fois
+    _worker.update(
+        offsets=offsets.tolist(), targets=targets.tolist(), weights=weights.tolist(),
+        dist_path=dist_path, next_path=next_path, potentiels=potentiels,
+    )
+
+
+def _dijkstra_chunk(sources):
+    w = _worker
+    n = len(w["offsets"]) - 1
+    dist = np.load(w["dist_path"], mmap_mode="r+")
+    suivant = np.load(w["next_path"], mmap_mode="r+")
+    h = w["potentiels"]
+    for s in sources:
+        dist[s], suivant[s] = dijkstra_row(w["offsets"], w["targets"], w["weights"], s, n)
+        if h is not None:
+            dist[s] += h - h[s]  # d(s, v) = d'(s, v) - h(s) + h(v)
+    dist.flush()
+    suivant.flush()
+    return len(sources)
+
+
+def dijkstra_all_pairs(n, origines, destinations, poids, workers=None, directory=None, potentiels=None):
+    # Sans directory, les matrices sont ramenées en mémoire et les fichiers supprimés ;
+    # sinon elles restent sur disque (dist.npy / next.npy) et sont renvoyées mappées.
+    # potentiels : poids repondérés par Johnson, corrigés ligne par ligne.
+    offsets, targets, weights = csr_arrays(n, origines, destinations, poids)
+    temporaire = directory is None
+    if temporaire:
+        directory = tempfile.mkdtemp(prefix="apsp-")
+    dist_path = os.path.join(directory, "dist.npy")
+    next_path = os.path.join(directory, "next.npy")
+    try:
+        np.lib.format.open_memmap(dist_path, mode="w+", dtype=np.float64, shape=(n, n)).flush()
+        np.lib.format.open_memmap(next_path, mode="w+", dtype=np.int64, shape=(n, n)).flush()
+
+        chunks = [range(s, min(s + DIJKSTRA_CHUNK, n)) for s in range(0, n, DIJKSTRA_CHUNK)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(offsets, targets, weights, dist_path, next_path, potentiels),
+        ) as pool:
+            for _ in pool.map(_dijkstra_chunk, chunks):
+                pass
+
+        if temporaire:
+            return np.load(dist_path), np.load(next_path)
+        return np.load(dist_path, mmap_mode="r"), np.load(next_path, mmap_mode="r")
+    finally:
+        if temporaire:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# ----------------------
+# Requêtes groupées (plusieurs sources, cibles choisies)
+# ----------------------
+# Une source = un Dijkstra complet qui répond à toutes ses cibles ; au-delà
+# de BATCH_PARALLEL_MIN sources, les recherches sont réparties sur un pool.
+
+BATCH_PARALLEL_MIN = 16   # nombre de sources à partir duquel on lance un pool
+
+
+def dijkstra_tree(offsets, targets, weights, source, n):
+    # Dijkstra par tas sur des identifiants entiers : (distances, prédécesseurs)
+    dist = [math.inf] * n
+    pred = [-1] * n
+    dist[source] = 0.0
+    tas = [(0.0, source)]
+    while tas:
+        d, u = heapq.heappop(tas)
+        if d > dist[u]:
+            continue  # entrée périmée
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(tas, (nd, v))
+    return dist, pred
+
+
+def _tree_path(pred, source, cible):
+    if cible != source and pred[cible] < 0:
+        return []
+    chemin = [cible]
+    while chemin[-1] != source:
+        chemin.append(pred[chemin[-1]])
+    chemin.reverse()
+    return chemin
+
+
+def _batch_group(csr, source, cibles, with_paths):
+    offsets, targets, weights, potentiels = csr
+    dist, pred = dijkstra_tree(offsets, targets, weights, source, len(offsets) - 1)
+    if potentiels is not None:  # distances repondérées par Johnson
+        dist = [d - potentiels[source] + potentiels[t] for t, d in enumerate(dist)]
+    if not with_paths:
+        return [dist[t] for t in cibles]
+    return [(dist[t], _tree_path(pred, source, t)) for t in cibles]
+
+
+def _init_batch_worker(csr):
+    _worker.update(csr=csr)
+
+
+def _batch_task(task):
+    return _batch_group(_worker["csr"], *task)
+
+
+def batch_queries(n, origines, destinations, poids, groupes, with_paths=True, workers=None):
+    # groupes : [(source, [cibles])] en identifiants entiers. Renvoie, dans le
+    # même ordre, une liste par groupe : distances, ou (distance, chemin) si
+    # with_paths. Les poids négatifs passent par la repondération de Johnson.
+    potentiels = None
+    if len(poids) and poids.min() < 0:
+        potentiels = johnson_potentials(n, origines, destinations, poids)
+        if potentiels is None:
+            raise ValueError("Cycle négatif détecté")
+        # même repondération que all_pairs, arrondi flottant ramené à 0
+        poids = np.maximum(poids + potentiels[origines] - potentiels[destinations], 0.0)
+    offsets, targets, weights = csr_arrays(n, origines, destinations, poids)
+    csr = (offsets.tolist(), targets.tolist(), weights.tolist(),
+           None if potentiels is None else potentiels.tolist())
+    taches = [(s, cibles, with_paths) for s, cibles in groupes]
+    if len(taches) < BATCH_PARALLEL_MIN or workers == 1:
+        return [_batch_group(csr, *t) for t in taches]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(csr,)) as pool:
+        taille = max(1, len(taches) // (4 * (workers or os.cpu_count() or 1)))
+        return list(pool.map(_batch_task, taches, chunksize=taille))
+
+
+# ----------------------
+# Stockage sur disque des résultats all-pairs
+# ----------------------
+# Un répertoire par graphe : dist.npy, next.npy (matrices .npy mappées en
+# mémoire) + nodes.json (table des sommets). Lire une distance ou une ligne
+# ne charge que les pages concernées, jamais la matrice entière.
+
+STORE_DIR = os.environ.get("APSP_DIR", os.path.join(tempfile.gettempdir(), "projet-graphe-apsp"))
+
+
+def graph_fingerprint(sommets, origines, destinations, poids):
+    # Empreinte du contenu du graphe : un graphe modifié obtient un autre répertoire
+    h = hashlib.sha1()
+    h.update(json.dumps(sommets).encode())
+    for tableau in (origines, destinations, poids):
+        h.update(np.ascontiguousarray(tableau).tobytes())
+    return h.hexdigest()[:16]
+
+
+class DistanceStore:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "nodes.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.nodes = meta["nodes"]
+        self.index = {name: i for i, name in enumerate(self.nodes)}
+        self.negative_cycle = meta["negative_cycle"]
+        self.dist = np.load(os.path.join(directory, "dist.npy"), mmap_mode="r")
+        self.next = np.load(os.path.join(directory, "next.npy"), mmap_mode="r")
+
+    def distance(self, u, v):
+        return float(self.dist[self.index[u], self.index[v]])
+
+    def row(self, u):
+        return self.dist[self.index[u]]  # vue sur le fichier, sans copie
+
+    def submatrix(self, rows, cols):
+        return self.dist[np.ix_([self.index[u] for u in rows], [self.index[v] for v in cols])]
+
+    def path(self, u, v):
+        return path_from_next(self.nodes, self.next, self.index[u], self.index[v])
+
+
+def build_store(directory, sommets, origines, destinations, poids, strategy="auto", workers=None):
+    # Réutilise un stockage existant ; sinon calcule dans un répertoire temporaire
+    # voisin puis le renomme, pour qu'un lecteur ne voie jamais de fichier partiel
+    if os.path.exists(os.path.join(directory, "nodes.json")):
+        return DistanceStore(directory)
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        dist, suivant = all_pairs(len(sommets), origines, destinations, poids,
+                                  strategy=strategy, workers=workers, directory=tmp)
+        negative_cycle = bool(np.any(np.diagonal(dist) < 0))
+        del dist, suivant  # ferme les fichiers mappés avant le renommage
+        with open(os.path.join(tmp, "nodes.json"), "w", encoding="utf-8") as f:
+            json.dump({"nodes": sommets, "negative_cycle": negative_cycle}, f)
+        os.replace(tmp, directory)
+    except OSError:
+        if not os.path.exists(os.path.join(directory, "nodes.json")):
+            raise
+        # un autre processus a construit le même stockage en parallèle
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return DistanceStore(directory)
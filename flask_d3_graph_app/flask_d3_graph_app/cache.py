@@ -0,0 +1,68 @@
+# cache.py
+# ===========================================================
+# Cache des résultats d'algorithmes (LRU + durée de vie)
+# ===========================================================
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class ResultCache:
+    def __init__(self, maxsize=256, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl              # durée de vie d'une entrée, en secondes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # clé -> (date d'expiration, résultat)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]  # entrée expirée
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)  # le moins récemment utilisé
+
+    def invalidate(self, graph_name):
+        # Supprime toutes les entrées d'un graphe (clés de la forme (nom, ...))
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == graph_name]:
+                del self._entries[key]
+
+    def carry_over(self, graph_name, old_version, new_version, keep):
+        # Après une modification du graphe : les entrées de old_version pour
+        # lesquelles keep(clé, résultat) est vrai passent à new_version (même
+        # échéance), les autres versions antérieures sont supprimées.
+        # Clés de la forme (nom, version, ...).
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == graph_name and k[1] != new_version]:
+                expire, value = self._entries.pop(key)
+                if key[1] == old_version and keep(key, value):
+                    self._entries[(graph_name, new_version) + key[2:]] = (expire, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
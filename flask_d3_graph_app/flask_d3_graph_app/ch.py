@@ -0,0 +1,205 @@
+# ch.py
+# ===========================================================
+# Contraction Hierarchies (hiérarchies de contraction)
+# ===========================================================
+# Prétraitement : les sommets sont contractés un par un, du moins important
+# au plus important. Contracter v ajoute un raccourci u -> w (coût u->v->w)
+# chaque fois qu'aucun autre chemin (« témoin ») n'est aussi court.
+# Requête : deux Dijkstra qui ne montent que vers des sommets de rang plus
+# élevé, puis dépliage des raccourcis pour retrouver le vrai chemin.
+
+import heapq
+import math
+
+import numpy as np
+
+WITNESS_LIMIT = 500  # sommets fixés au maximum par recherche de témoin
+
+
+class ContractionHierarchy:
+    def __init__(self, names, rank, src, dst, cost, middle):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.rank = rank
+        self.src, self.dst, self.cost, self.middle = src, dst, cost, middle
+
+        # Graphes montants : en avant depuis la source, en arrière depuis la cible
+        n = len(self.names)
+        self.up = [[] for _ in range(n)]
+        self.down = [[] for _ in range(n)]
+        self.milieu = {}  # (u, v) -> sommet contourné par le raccourci (-1 : arc réel)
+        for u, v, c, m in zip(src.tolist(), dst.tolist(), cost.tolist(), middle.tolist()):
+            self.milieu[(u, v)] = m
+            if rank[u] < rank[v]:
+                self.up[u].append((v, c))
+            else:
+                self.down[v].append((u, c))
+
+    # ----------------------
+    # Prétraitement
+    # ----------------------
+    @classmethod
+    def build(cls, names, origines, destinations, poids, witness_limit=WITNESS_LIMIT):
+        n = len(names)
+        out = [dict() for _ in range(n)]  # arcs sortants restants (sommets non contractés)
+        inn = [dict() for _ in range(n)]  # arcs entrants restants
+        for u, v, w in zip(origines.tolist(), destinations.tolist(), poids.tolist()):
+            if w < 0:
+                raise ValueError("Les hiérarchies de contraction exigent des poids positifs !")
+            if u != v and w < out[u].get(v, math.inf):
+                out[u][v] = w
+                inn[v][u] = w
+        aretes = {(u, v): (w, -1) for u in range(n) for v, w in out[u].items()}
+
+        def witness(u, skip, limit, cibles):
+            # Dijkstra local depuis u sans passer par skip, borné par limit
+            dist = {u: 0}
+            tas = [(0, u)]
+            restantes = set(cibles)
+            fixes = 0
+            while tas and restantes:
+                d, x = heapq.heappop(tas)
+                if d > dist[x]:
+                    continue
+                if d > limit or fixes >= witness_limit:
+                    break
+                restantes.discard(x)
+                fixes += 1
+                for y, w in out[x].items():
+                    if y != skip and d + w < dist.get(y, math.inf):
+                        dist[y] = d + w
+                        heapq.heappush(tas, (d + w, y))
+            return dist
+
+        def shortcuts(v):
+            # Raccourcis nécessaires si v était contracté maintenant
+            resultat = []
+            for u, wu in inn[v].items():
+                cibles = {x: wu + wx for x, wx in out[v].items() if x != u}
+                if not cibles:
+                    continue
+                dist = witness(u, v, max(cibles.values()), cibles)
+                resultat.extend((u, x, c) for x, c in cibles.items() if dist.get(x, math.inf) > c)
+            return resultat
+
+        voisins_contractes = [0] * n
+
+        def priorite(v, raccourcis):
+            # Différence d'arêtes + voisins déjà contractés (répartit la contraction)
+            return len(raccourcis) - len(inn[v]) - len(out[v]) + voisins_contractes[v]
+
+        tas = [(priorite(v, shortcuts(v)), v) for v in range(n)]
+        heapq.heapify(tas)
+        rank = np.zeros(n, dtype=np.int64)
+        niveau = 0
+        while tas:
+            _, v = heapq.heappop(tas)
+            raccourcis = shortcuts(v)
+            p = priorite(v, raccourcis)  # mise à jour paresseuse de la priorité
+            if tas and p > tas[0][0]:
+                heapq.heappush(tas, (p, v))
+                continue
+
+            for u, x, c in raccourcis:
+                if c < out[u].get(x, math.inf):
+                    out[u][x] = c
+                    inn[x][u] = c
+                    aretes[(u, x)] = (c, v)
+            for u in inn[v]:
+                del out[u][v]
+                voisins_contractes[u] += 1
+            for x in out[v]:
+                del inn[x][v]
+                voisins_contractes[x] += 1
+            out[v], inn[v] = {}, {}
+            rank[v] = niveau
+            niveau += 1
+
+        cles = list(aretes)
+        return cls(
+            names, rank,
+            np.array([u for u, _ in cles], dtype=np.int64),
+            np.array([v for _, v in cles], dtype=np.int64),
+            np.array([aretes[k][0] for k in cles], dtype=np.float64),
+            np.array([aretes[k][1] for k in cles], dtype=np.int64),
+        )
+
+    # ----------------------
+    # Sauvegarde du prétraitement
+    # ----------------------
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, names=np.array(self.names, dtype=str), rank=self.rank,
+                     src=self.src, dst=self.dst, cost=self.cost, middle=self.middle)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["names"].tolist(), data["rank"], data["src"], data["dst"],
+                       data["cost"], data["middle"])
+
+    # ----------------------
+    # Requête
+    # ----------------------
+    def query(self, source, target):
+        # Renvoie (chemin, coût) ; ([], inf) si target est inatteignable
+        if source not in self.index or target not in self.index:
+            return [], math.inf
+        s, t = self.index[source], self.index[target]
+        graphes = (self.up, self.down)
+        dist = ({s: 0}, {t: 0})
+        pred = ({s: None}, {t: None})
+        tas = ([(0, s)], [(0, t)])
+        meilleur, milieu = (0, s) if s == t else (math.inf, None)
+
+        while tas[0] or tas[1]:
+            # file dont la tête est la plus petite ; une file dont la tête
+            # dépasse le meilleur coût connu ne peut plus l'améliorer
+            cote = 0 if not tas[1] or (tas[0] and tas[0][0][0] <= tas[1][0][0]) else 1
+            d, x = heapq.heappop(tas[cote])
+            if d >= meilleur:
+                tas[cote].clear()
+                continue
+            if d > dist[cote][x]:
+                continue
+            autre = dist[1 - cote].get(x)
+            if autre is not None and d + autre < meilleur:
+                meilleur, milieu = d + autre, x
+            for y, c in graphes[cote][x]:
+                if d + c < dist[cote].get(y, math.inf):
+                    dist[cote][y] = d + c
+                    pred[cote][y] = x
+                    heapq.heappush(tas[cote], (d + c, y))
+
+        if milieu is None:
+            return [], math.inf
+
+        montee = []  # sommets de s jusqu'au sommet de rencontre
+        x = milieu
+        while x is not None:
+            montee.append(x)
+            x = pred[0][x]
+        montee.reverse()
+        x = pred[1][milieu]
+        while x is not None:  # puis du sommet de rencontre jusqu'à t
+            montee.append(x)
+            x = pred[1][x]
+
+        chemin = [montee[0]]
+        for a, b in zip(montee, montee[1:]):
+            chemin.extend(self._unpack(a, b))
+        return [self.names[i] for i in chemin], meilleur
+
+    def _unpack(self, a, b):
+        # Remplace le raccourci a -> b par les arcs réels (sans répéter a)
+        pile = [(a, b)]
+        resultat = []
+        while pile:
+            u, v = pile.pop()
+            m = self.milieu[(u, v)]
+            if m < 0:
+                resultat.append(v)
+            else:
+                pile.append((m, v))  # traité après (u, m) : ordre conservé
+                pile.append((u, m))
+        return resultat
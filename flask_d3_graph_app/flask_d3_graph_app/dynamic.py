@@ -0,0 +1,196 @@
+# dynamic.py
+# ===========================================================
+# Réparation incrémentale des plus courts chemins
+# ===========================================================
+# Après une modification du graphe, on repart des résultats de la version
+# précédente au lieu de tout recalculer. Une modification est vue comme le
+# changement du poids d'un arc u -> v (le plus léger s'il y en a plusieurs) :
+# inf -> w pour un ajout, w -> inf pour une suppression.
+#   - arbre d'une source (Ramalingam-Reps) : une hausse ne touche que le
+#     sous-arbre sous l'arc, une baisse se propage depuis v ;
+#   - matrices all-pairs : une hausse ne touche que les lignes (sources)
+#     dont un plus court chemin emprunte l'arc, recalculées par Dijkstra ;
+#     une baisse met à jour les lignes et colonnes qu'elle raccourcit.
+
+from collections import defaultdict
+import heapq
+import json
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from apsp import DistanceStore, csr_arrays, dijkstra_row
+
+# Au-delà de cette part de lignes à refaire, un recalcul complet (vectorisé)
+# des matrices revient moins cher que les Dijkstra ligne par ligne
+REPAIR_MAX_ROWS = 0.5
+
+
+# ----------------------
+# Arbre de plus courts chemins d'une source
+# ----------------------
+def repair_tree(graph, reverse, dist, pred, source, arcs):
+    # graph / reverse : arcs sortants / entrants (sommet -> [(voisin, poids)])
+    # dist / pred : arbre de la version précédente, réparé sur place
+    # arcs : [(u, v, ancien poids, nouveau poids)]
+    # Renvoie le nombre de sommets dont la distance a été revue, ou None si
+    # un cycle négatif est apparu (dist / pred sont alors inutilisables).
+    for u, v, _, _ in arcs:  # sommets créés par un ajout
+        for x in (u, v):
+            if x not in dist:
+                dist[x], pred[x] = math.inf, None
+
+    # 1. Hausses sur des arcs de l'arbre : tout le sous-arbre sous v est à refaire
+    racines = [v for u, v, ancien, nouveau in arcs if nouveau > ancien and v != source and pred.get(v) == u]
+    touches = set()
+    if racines:
+        enfants = defaultdict(list)
+        for x, p in pred.items():
+            if p is not None:
+                enfants[p].append(x)
+        pile = list(racines)
+        while pile:
+            x = pile.pop()
+            if x not in touches:
+                touches.add(x)
+                pile.extend(enfants[x])
+    for x in touches:
+        dist[x], pred[x] = math.inf, None
+
+    # 2. Points de départ : sommets touchés rattachés par leurs voisins intacts,
+    #    extrémités des arcs qui baissent
+    tas = []
+    compteur = 0
+    for x in touches:
+        for y, w in reverse.get(x, ()):
+            if y not in touches and dist.get(y, math.inf) + w < dist[x]:
+                dist[x], pred[x] = dist[y] + w, y
+        if dist[x] < math.inf:
+            tas.append((dist[x], compteur, x))
+            compteur += 1
+    for u, v, ancien, nouveau in arcs:
+        if nouveau < ancien and dist[u] + nouveau < dist[v]:
+            dist[v], pred[v] = dist[u] + nouveau, u
+            tas.append((dist[v], compteur, v))
+            compteur += 1
+    heapq.heapify(tas)
+
+    # 3. Propagation par correction d'étiquettes (poids négatifs admis) ;
+    #    un sommet amélioré plus de n fois trahit un cycle négatif
+    ameliorations = defaultdict(int)
+    limite = len(dist)
+    revus = set(touches)
+    while tas:
+        d, _, x = heapq.heappop(tas)
+        if d > dist[x]:
+            continue
+        revus.add(x)
+        for y, w in graph.get(x, ()):
+            if d + w < dist.get(y, math.inf):
+                if y == source:
+                    return None  # chemin source -> source de coût négatif
+                ameliorations[y] += 1
+                if ameliorations[y] > limite:
+                    return None
+                dist[y], pred[y] = d + w, x
+                heapq.heappush(tas, (d + w, compteur, y))
+                compteur += 1
+    return len(revus)
+
+
+# ----------------------
+# Matrices all-pairs
+# ----------------------
+def repair_all_pairs(store, directory, arcs, origines, destinations, poids):
+    # store : DistanceStore de la version précédente (mêmes sommets)
+    # arcs : [(i, j, ancien, nouveau)] en indices de store.nodes
+    # origines / destinations / poids : arcs de la nouvelle version
+    # Écrit les matrices réparées dans directory et renvoie le DistanceStore,
+    # ou None si la réparation ciblée est impossible (hausse avec des poids
+    # négatifs : les lignes ne peuvent pas être refaites par Dijkstra) ou
+    # touche plus de REPAIR_MAX_ROWS des lignes.
+    if os.path.exists(os.path.join(directory, "nodes.json")):
+        return DistanceStore(directory)
+    n = len(store.nodes)
+    hausses = [a for a in arcs if a[3] > a[2]]
+    baisses = [a for a in arcs if a[3] < a[2]]
+
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        for fichier in ("dist.npy", "next.npy"):
+            shutil.copyfile(os.path.join(store.directory, fichier), os.path.join(tmp, fichier))
+        dist = np.load(os.path.join(tmp, "dist.npy"), mmap_mode="r+")
+        suivant = np.load(os.path.join(tmp, "next.npy"), mmap_mode="r+")
+
+        # Hausses : lignes r dont le plus court chemin vers j passe par i -> j.
+        # Elles sont recalculées sur le graphe intermédiaire (hausses appliquées,
+        # baisses pas encore) pour que les baisses partent d'une matrice exacte.
+        lignes = set()
+        for i, j, ancien, _ in hausses:
+            colonne = dist[:, i]
+            with np.errstate(invalid="ignore"):
+                serre = np.isfinite(colonne) & np.isclose(colonne + ancien, dist[:, j])
+            lignes.update(np.flatnonzero(serre).tolist())
+        if len(lignes) > REPAIR_MAX_ROWS * n:
+            return None
+        if lignes:
+            o, d, p = _graphe_intermediaire(n, origines, destinations, poids, baisses)
+            if len(p) and p.min() < 0:
+                return None
+            offsets, targets, weights = (t.tolist() for t in csr_arrays(n, o, d, p))
+            for r in sorted(lignes):
+                ligne, premier = dijkstra_row(offsets, targets, weights, r, n)
+                dist[r] = ligne
+                suivant[r] = premier
+
+        # Baisses, une à une : seules les lignes r telles que r -> i -> j bat
+        # r -> j et les colonnes c telles que i -> j -> c bat i -> c peuvent changer
+        for i, j, _, nouveau in baisses:
+            colonne_i = np.array(dist[:, i])
+            ligne_j = np.array(dist[j])
+            with np.errstate(invalid="ignore"):
+                lignes = np.flatnonzero(colonne_i + nouveau < dist[:, j])
+                colonnes = np.flatnonzero(nouveau + ligne_j < dist[i])
+            if not len(lignes) or not len(colonnes):
+                continue
+            saut = np.array(suivant[:, i])
+            saut[i] = j
+            bloc = np.ix_(lignes, colonnes)
+            via = colonne_i[lignes, None] + nouveau + ligne_j[None, colonnes]
+            mieux = via < dist[bloc]
+            dist[bloc] = np.where(mieux, via, dist[bloc])
+            suivant[bloc] = np.where(mieux, saut[lignes, None], suivant[bloc])
+
+        negative_cycle = bool(np.any(np.diagonal(dist) < 0))
+        dist.flush()
+        suivant.flush()
+        del dist, suivant  # ferme les fichiers mappés avant le renommage
+        with open(os.path.join(tmp, "nodes.json"), "w", encoding="utf-8") as f:
+            json.dump({"nodes": store.nodes, "negative_cycle": negative_cycle}, f)
+        os.replace(tmp, directory)
+    except OSError:
+        if not os.path.exists(os.path.join(directory, "nodes.json")):
+            raise
+        # un autre processus a écrit la même version en parallèle
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return DistanceStore(directory)
+
+
+def _graphe_intermediaire(n, origines, destinations, poids, baisses):
+    # Arcs de la nouvelle version où chaque paire qui baisse garde son ancien poids
+    if not baisses:
+        return origines, destinations, poids
+    codes = np.asarray(origines, dtype=np.int64) * n + destinations
+    garde = ~np.isin(codes, [i * n + j for i, j, _, _ in baisses])
+    anciens = [(i, j, a) for i, j, a, _ in baisses if a < math.inf]
+    return (
+        np.concatenate((origines[garde], np.array([i for i, _, _ in anciens], dtype=np.int64))),
+        np.concatenate((destinations[garde], np.array([j for _, j, _ in anciens], dtype=np.int64))),
+        np.concatenate((poids[garde], np.array([a for _, _, a in anciens], dtype=np.float64))),
+    )
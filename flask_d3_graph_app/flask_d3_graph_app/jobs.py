@@ -0,0 +1,179 @@
+# jobs.py
+# ===========================================================
+# Tâches longues exécutées hors du processus Flask
+# ===========================================================
+# Chaque tâche tourne dans un processus fils créé par fork : il hérite des
+# graphes déjà chargés (copie à l'écriture, rien n'est sérialisé à l'aller),
+# peut être tué à tout moment (annulation, limite de temps) et ne bloque
+# aucun thread qui sert des requêtes. Au plus max_workers fils tournent en
+# même temps ; les tâches suivantes attendent leur tour.
+#
+# Le fork a lieu pendant que d'autres threads servent des requêtes : seul le
+# thread qui forke existe dans le fils, et un verrou que tenait un autre
+# thread y reste pris pour toujours. Tout verrou de module qu'une tâche peut
+# prendre (caches de algorithms.py, verrou des modifications de graphe) doit
+# donc être créé par fork_safe_lock() : il est alors tenu pendant le fork,
+# qui ne copie jamais une section critique à moitié faite. Le fils ne doit
+# pas utiliser le JobManager (son verrou est pris pendant le fork).
+
+from collections import OrderedDict
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+import uuid
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED, TIMEOUT = (
+    "pending", "running", "done", "failed", "cancelled", "timeout"
+)
+FINISHED = {DONE, FAILED, CANCELLED, TIMEOUT}
+
+
+def fork_safe_lock():
+    # threading.Lock pris avant chaque fork et relâché après, des deux côtés
+    # (comme le fait logging pour ses propres verrous)
+    lock = threading.Lock()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(before=lock.acquire, after_in_parent=lock.release, after_in_child=lock.release)
+    return lock
+
+
+def _child(conn, func, args):
+    if hasattr(os, "setsid"):
+        os.setsid()  # groupe de processus propre : un kill arrête aussi les pools de la tâche
+    try:
+        conn.send((DONE, func(*args)))
+    except Exception as e:
+        conn.send((FAILED, str(e)))
+    finally:
+        conn.close()
+
+
+def _kill(proc):
+    if not proc.is_alive():
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, OSError):  # pas de groupe (Windows, ou setsid pas encore fait)
+        proc.kill()
+
+
+class Job:
+    def __init__(self, job_id, timeout, key=None):
+        self.id = job_id
+        self.key = key
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.timeout = timeout
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.process = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        out = {"id": self.id, "status": self.status, "created": self.created,
+               "started": self.started, "finished": self.finished, "timeout": self.timeout}
+        if self.status == DONE:
+            out["result"] = self.result
+        elif self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class JobManager:
+    def __init__(self, max_workers=None, default_timeout=300.0, history=100):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.default_timeout = default_timeout  # None : pas de limite
+        self.history = history  # tâches terminées gardées pour être relues
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        methode = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        self._ctx = mp.get_context(methode)
+
+    def submit(self, func, *args, timeout=None, on_done=None, key=None):
+        # func(*args) est exécuté dans un fils ; on_done(job) est appelé dans
+        # le processus Flask quand la tâche réussit. Renvoie le Job aussitôt.
+        # Une tâche de même key encore en cours est renvoyée au lieu d'être relancée.
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and job.status not in FINISHED:
+                        return job
+            job = Job(uuid.uuid4().hex, timeout or self.default_timeout, key)
+            self._jobs[job.id] = job
+            self._prune()
+        threading.Thread(target=self._run, args=(job, func, args, on_done), daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            if job.status in FINISHED:
+                return job
+            job.status = CANCELLED
+            job.error = "Tâche annulée"
+            proc = job.process
+        if proc is not None:
+            _kill(proc)  # le thread de surveillance voit la fin du fils
+        else:
+            self._finish(job)  # pas encore démarrée : elle ne le sera jamais
+        return job
+
+    def _run(self, job, func, args, on_done):
+        with self._slots:
+            with self._lock:
+                if job.status == CANCELLED:
+                    return
+                lecture, ecriture = self._ctx.Pipe(duplex=False)
+                proc = self._ctx.Process(target=_child, args=(ecriture, func, args))
+                proc.start()
+                job.process = proc
+                job.status = RUNNING
+                job.started = time.time()
+            ecriture.close()
+
+            try:
+                if lecture.poll(job.timeout):
+                    status, value = lecture.recv()
+                else:
+                    status, value = TIMEOUT, f"Limite de temps dépassée ({job.timeout:g} s)"
+            except (EOFError, OSError):
+                status, value = FAILED, "Processus de calcul interrompu"
+            finally:
+                _kill(proc)
+                proc.join()
+                lecture.close()
+
+        with self._lock:
+            if job.status == CANCELLED:
+                status = CANCELLED
+            else:
+                job.status = status
+                if status == DONE:
+                    job.result = value
+                else:
+                    job.error = value
+        if status == DONE and on_done is not None:
+            on_done(job)
+        self._finish(job)
+
+    def _finish(self, job):
+        job.finished = time.time()
+        job.process = None
+        job.done.set()
+
+    def _prune(self):
+        # Oublie les plus anciennes tâches terminées au-delà de history
+        termines = [j for j in self._jobs.values() if j.status in FINISHED]
+        for job in termines[:max(0, len(termines) - self.history)]:
+            del self._jobs[job.id]
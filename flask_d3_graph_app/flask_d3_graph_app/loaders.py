@@ -0,0 +1,425 @@
+# loaders.py
+# ===========================================================
+# Chargement de gros graphes depuis des fichiers d'arêtes
+# ===========================================================
+# Le fichier est lu par blocs d'octets ; chaque bloc est converti d'un coup
+# en tableaux NumPy (np.fromstring pour les identifiants numériques), sans
+# tuple Python par arête, puis l'ensemble devient un CompactGraph.
+# Formats :
+#   "csv" / "tsv" : u,v[,poids] par ligne (en-tête facultatif) ; un champ
+#                   entièrement entre guillemets doubles est accepté et les
+#                   guillemets retirés, tout autre guillemet (séparateur ou
+#                   guillemet échappé dans un champ) est refusé
+#   "edgelist"    : u v [poids] séparés par des blancs (listes issues d'OSM, ...)
+#   "dimacs"      : .gr du 9e challenge DIMACS (c commentaire, p sp n m, a u v w)
+#   "graphml"     : lu en flux avec iterparse (attribut d'arête "weight")
+#   "snapshot"    : instantané binaire (.cgs, voir snapshot.py), ouvert par mmap
+# Les colonnes au-delà de la troisième sont ignorées ; poids absent = 1.
+
+import json
+import logging
+import os
+import re
+import warnings
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from algorithms import CompactGraph
+from snapshot import load_snapshot, save_snapshot
+
+CHUNK_BYTES = 32 * 1024 * 1024  # taille des blocs lus
+FORMATS = {
+    ".csv": "csv", ".tsv": "tsv", ".txt": "edgelist", ".edges": "edgelist",
+    ".el": "edgelist", ".gr": "dimacs", ".graphml": "graphml", ".cgs": "snapshot",
+}
+
+log = logging.getLogger(__name__)
+
+_LIGNES_VIDES = re.compile(rb"^[ \t\r]*\n", re.M)
+_LIGNES_VIDES_TETE = re.compile(rb"(?:[ \t\r]*\n)*")
+_LIGNES_DIMACS = re.compile(rb"^[cp][^\n]*\n", re.M)
+
+
+class GraphFormatError(ValueError):
+    # Fichier invalide : line donne le numéro de la ligne fautive quand il est connu
+    def __init__(self, path, message, line=None):
+        where = f"{path}:{line}" if line is not None else str(path)
+        super().__init__(f"{where} : {message}")
+        self.path = path
+        self.line = line
+
+
+def _blocs(f, chunk_bytes):
+    # Blocs terminés par une fin de ligne : (texte, octets lus jusqu'ici)
+    reste = b""
+    lus = 0
+    while True:
+        bloc = f.read(chunk_bytes)
+        if not bloc:
+            break
+        lus += len(bloc)
+        bloc = reste + bloc
+        coupe = bloc.rfind(b"\n") + 1
+        reste = bloc[coupe:]
+        if coupe:
+            yield bloc[:coupe], lus
+    if reste.strip():
+        yield reste + b"\n", lus
+
+
+def _est_nombre(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+_GUILLEMET_SEPARATEUR = "guillemet non pris en charge dans un champ (séparateur entre guillemets ?)"
+_NOMS_COLONNES = {b"source", b"target", b"from", b"to", b"u", b"v", b"src", b"dst", b"tail", b"head"}
+
+
+def _est_entete(champs):
+    # Poids non numérique (« source,target,weight ») ou noms de colonnes usuels
+    champs = [_sans_guillemets(c.strip()) or c.strip() for c in champs]
+    if len(champs) > 2 and not _est_nombre(champs[2]):
+        return True
+    return {c.lower() for c in champs[:2]} <= _NOMS_COLONNES
+
+
+def _sans_guillemets(champ):
+    # "Paris" -> Paris ; None si le champ contient un autre guillemet
+    if len(champ) >= 2 and champ[:1] == champ[-1:] == b'"':
+        champ = champ[1:-1]
+    return None if b'"' in champ else champ
+
+
+def _ligne_non_vide(texte, k):
+    # Indice, dans texte, de sa k-ième ligne non vide (numérotées à partir de 0)
+    for i, ligne in enumerate(texte.split(b"\n")):
+        if ligne.strip():
+            if k == 0:
+                return i
+            k -= 1
+    return None
+
+
+def _ligne_fautive(texte, ncols, numerique):
+    # Recherche lente, seulement en cas d'erreur : indice de la première ligne invalide
+    for k, ligne in enumerate(texte.split(b"\n")):
+        champs = ligne.split()
+        if not champs:
+            continue
+        if len(champs) < ncols or (numerique and not all(_est_nombre(c) for c in champs)):
+            return k
+    return None
+
+
+class _Lecteur:
+    # Accumule les blocs déjà convertis et tient le compte des lignes
+    def __init__(self, path, progress):
+        self.path = path
+        self.progress = progress
+        self.total = os.path.getsize(path)
+        self.ligne = 0  # lignes déjà consommées (pour les messages d'erreur)
+        self.origines, self.destinations, self.poids = [], [], []
+        self.aretes = 0
+
+    def ajoute(self, u, v, w, lus, texte=None):
+        # texte : bloc d'origine, pour situer une ligne quand il a des lignes vides
+        if not np.isfinite(w).all():
+            k = int(np.flatnonzero(~np.isfinite(w))[0])
+            k = k if texte is None else _ligne_non_vide(texte, k)
+            raise GraphFormatError(self.path, "poids non fini", self.ligne + k + 1)
+        self.origines.append(u)
+        self.destinations.append(v)
+        self.poids.append(w)
+        self.aretes += len(u)
+        if self.progress is not None:
+            self.progress(lus, self.total, self.aretes)
+
+    def tableaux(self, dtype):
+        if not self.origines:
+            return np.zeros(0, dtype), np.zeros(0, dtype), np.zeros(0)
+        return (np.concatenate(self.origines), np.concatenate(self.destinations),
+                np.concatenate(self.poids))
+
+
+def _fromstring(texte, dtype):
+    # None si le bloc n'a pas pu être lu jusqu'au bout dans ce type
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)  # lecture incomplète
+        try:
+            return np.fromstring(texte, dtype=dtype, sep=" ")
+        except (DeprecationWarning, ValueError):
+            return None
+
+
+def _numeriques(lecteur, texte, ncols, lus, prefixe=b""):
+    # Bloc d'identifiants numériques : un seul np.fromstring pour tout le bloc,
+    # en entiers d'abord (environ trois fois plus rapide), sinon en flottants
+    if prefixe:
+        texte = texte.translate(None, prefixe)
+    fins = texte.count(b"\n")
+    if not texte or texte.isspace():
+        lecteur.ligne += fins
+        return
+    valeurs = _fromstring(texte, np.int64)
+    if valeurs is None:
+        valeurs = _fromstring(texte, np.float64)
+    lignes = fins
+    if valeurs is not None and valeurs.size != lignes * ncols:
+        lignes -= len(_LIGNES_VIDES.findall(texte))  # lignes vides : rares, comptées à part
+    if valeurs is None or valeurs.size != lignes * ncols:
+        k = _ligne_fautive(texte, ncols, numerique=True)
+        line = None if k is None else lecteur.ligne + k + 1
+        raise GraphFormatError(lecteur.path, f"{ncols} colonnes numériques attendues", line)
+    valeurs = valeurs.reshape(lignes, ncols)
+    poids = valeurs[:, 2].astype(np.float64) if ncols > 2 else np.ones(lignes)
+    lecteur.ajoute(valeurs[:, 0], valeurs[:, 1], poids, lus, texte)
+    lecteur.ligne += fins
+
+
+def _textuels(lecteur, texte, ncols, sep, index, lus):
+    # Bloc de noms de sommets : découpage d'un coup, internement par np.unique.
+    # Les lignes vides sont retirées avant le découpage : un numéro de ligne
+    # se retrouve dans brut avec _ligne_non_vide.
+    brut = texte
+    texte = _LIGNES_VIDES.sub(b"", texte)
+    lignes = texte.count(b"\n")
+    tokens = texte.replace(b"\n", sep).split(sep)[:-1] if sep else texte.split()
+    if len(tokens) != lignes * ncols:
+        # ligne fautive : nombre de champs différent de la première ligne
+        # (introuvable : l'erreur est signalée au début du bloc)
+        lignes_brutes = brut.split(b"\n")
+        k = next((k for k, ligne in enumerate(lignes_brutes)
+                  if ligne.strip() and len(ligne.split(sep) if sep else ligne.split()) != ncols), None)
+        if k is None:
+            raise GraphFormatError(lecteur.path, f"{ncols} colonnes attendues", lecteur.ligne + 1)
+        message = f"{ncols} colonnes attendues"
+        if sep is not None and b'"' in lignes_brutes[k]:
+            message = _GUILLEMET_SEPARATEUR
+        raise GraphFormatError(lecteur.path, message, lecteur.ligne + k + 1)
+    if sep is not None and b'"' in texte:
+        # Champs entre guillemets (export de tableur) : guillemets retirés,
+        # tout autre guillemet trahit un champ qu'on ne sait pas découper
+        for k, token in enumerate(tokens):
+            if b'"' in token:
+                token = _sans_guillemets(token.strip())
+                if token is None:
+                    line = lecteur.ligne + _ligne_non_vide(brut, k // ncols) + 1
+                    raise GraphFormatError(lecteur.path, "guillemet non pris en charge dans un champ", line)
+                tokens[k] = token
+    champs = np.array(tokens).reshape(lignes, ncols)
+    uniques, inverse = np.unique(champs[:, :2], return_inverse=True)
+    ids = np.array([index.setdefault(nom.decode().strip(), len(index)) for nom in uniques], dtype=np.int64)
+    ids = ids[inverse.reshape(-1)].reshape(lignes, 2)
+    try:
+        poids = champs[:, 2].astype(np.float64) if ncols > 2 else np.ones(lignes)
+    except ValueError:
+        k = next(k for k, w in enumerate(champs[:, 2]) if not _est_nombre(w))
+        raise GraphFormatError(lecteur.path, f"poids non numérique : {champs[k, 2].decode(errors='replace')!r}",
+                               lecteur.ligne + _ligne_non_vide(brut, k) + 1) from None
+    lecteur.ajoute(ids[:, 0], ids[:, 1], poids, lus, brut)
+    lecteur.ligne += brut.count(b"\n")
+
+
+def _load_table(path, fmt, directed, name, chunk_bytes, progress):
+    # csv / tsv / edgelist : format des colonnes déduit de la première ligne utile
+    sep = {"csv": b",", "tsv": b"\t"}.get(fmt)
+    lecteur = _Lecteur(path, progress)
+    index = {}          # nom -> identifiant (noms textuels)
+    ncols = numerique = None
+    entete_possible = True  # la première ligne non vide peut être un en-tête
+    with open(path, "rb") as f:
+        for texte, lus in _blocs(f, chunk_bytes):
+            while ncols is None and texte:
+                # lignes vides de tête comptées (numéros de ligne exacts), puis
+                # première ligne utile : en-tête, ou modèle des colonnes
+                vides = _LIGNES_VIDES_TETE.match(texte).end()
+                lecteur.ligne += texte.count(b"\n", 0, vides)
+                texte = texte[vides:]
+                if not texte:
+                    break
+                fin = texte.index(b"\n") + 1
+                premiere = texte[:fin].rstrip()
+                champs = premiere.split(sep) if sep else premiere.split()
+                if len(champs) < 2:
+                    raise GraphFormatError(path, "au moins deux colonnes attendues", lecteur.ligne + 1)
+                if sep is not None and any(_sans_guillemets(c.strip()) is None for c in champs):
+                    # vérifié avant la détection d'en-tête : une ligne coupée dans
+                    # un champ entre guillemets n'est jamais prise pour un en-tête
+                    raise GraphFormatError(path, _GUILLEMET_SEPARATEUR, lecteur.ligne + 1)
+                if entete_possible and _est_entete(champs):
+                    texte = texte[fin:]  # en-tête ignoré
+                    lecteur.ligne += 1
+                    entete_possible = False
+                    continue
+                ncols = len(champs)
+                numerique = all(_est_nombre(c) for c in champs)
+            if ncols is None:
+                continue
+            if sep is not None:
+                texte = texte.replace(b"\r", b"")
+            if numerique:
+                _numeriques(lecteur, texte.replace(sep, b" ") if sep else texte, ncols, lus)
+            else:
+                _textuels(lecteur, texte, ncols, sep, index, lus)
+
+    origines, destinations, poids = lecteur.tableaux(np.int64)
+    if numerique:
+        # identifiants quelconques (ex. OSM) -> 0..n-1 ; le nom reste l'identifiant
+        uniques, inverse = np.unique(np.concatenate((origines, destinations)), return_inverse=True)
+        entiers = np.array_equal(uniques, np.round(uniques))
+        noms = [str(x) for x in (uniques.astype(np.int64) if entiers else uniques).tolist()]
+        m = len(origines)
+        origines, destinations = inverse[:m], inverse[m:]
+    else:
+        noms = list(index)
+    return CompactGraph.from_arrays(noms, origines, destinations, poids, directed, name)
+
+
+def _load_dimacs(path, directed, name, chunk_bytes, progress):
+    lecteur = _Lecteur(path, progress)
+    n = m = None
+    with open(path, "rb") as f:
+        for texte, lus in _blocs(f, chunk_bytes):
+            if n is None:
+                entete = re.search(rb"^p\s+sp\s+(\d+)\s+(\d+)", texte, re.M)
+                if entete is not None:
+                    n, m = int(entete.group(1)), int(entete.group(2))
+                elif re.search(rb"^a", texte, re.M):
+                    raise GraphFormatError(path, "ligne « p sp n m » manquante avant les arcs")
+            if b"c" in texte or b"p" in texte:  # commentaires / en-tête (en général au début)
+                lecteur.ligne += len(_LIGNES_DIMACS.findall(texte))
+                texte = _LIGNES_DIMACS.sub(b"", texte)
+            _numeriques(lecteur, texte, 3, lus, prefixe=b"a")
+
+    if n is None:
+        raise GraphFormatError(path, "ligne « p sp n m » manquante")
+    origines, destinations, poids = lecteur.tableaux(np.float64)
+    if m != len(origines):
+        raise GraphFormatError(path, f"{m} arcs annoncés, {len(origines)} lus")
+    origines, destinations = origines.astype(np.int64) - 1, destinations.astype(np.int64) - 1
+    for ids in (origines, destinations):
+        if len(ids) and (ids.min() < 0 or ids.max() >= n):
+            raise GraphFormatError(path, f"identifiant de sommet hors de 1..{n}")
+    noms = list(map(str, range(1, n + 1)))
+    return CompactGraph.from_arrays(noms, origines, destinations, poids, directed, name)
+
+
+def _load_graphml(path, directed, name, progress):
+    # Flux d'événements XML : chaque élément est libéré dès qu'il est lu
+    lecteur = _Lecteur(path, progress)
+    cles_poids = set()  # une clé par type de poids déclaré
+    oriente = False
+    sources, cibles, poids = [], [], []
+    with open(path, "rb") as f:
+        for evenement, elem in ET.iterparse(f, events=("start", "end")):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if evenement == "start":
+                if tag == "graph":
+                    oriente = elem.get("edgedefault") == "directed"
+                continue
+            if tag == "key" and elem.get("for") in ("edge", "all") and elem.get("attr.name") == "weight":
+                cles_poids.add(elem.get("id"))
+            elif tag == "edge":
+                sources.append(elem.get("source"))
+                cibles.append(elem.get("target"))
+                w = 1.0
+                for data in elem:
+                    if data.get("key") in cles_poids:
+                        w = float(data.text)
+                poids.append(w)
+                if len(poids) % 100_000 == 0 and progress is not None:
+                    progress(f.tell(), lecteur.total, len(poids))
+                elem.clear()
+            elif tag == "node":
+                elem.clear()
+
+    if not sources:
+        raise GraphFormatError(path, "aucune arête")
+    uniques, inverse = np.unique(np.array(sources + cibles), return_inverse=True)
+    m = len(sources)
+    lecteur.ajoute(inverse[:m], inverse[m:], np.array(poids), lecteur.total)
+    origines, destinations, w = lecteur.tableaux(np.int64)
+    return CompactGraph.from_arrays(uniques.tolist(), origines, destinations, w,
+                                    oriente if directed is None else directed, name)
+
+
+def load_graph(path, fmt=None, directed=None, name=None, chunk_bytes=CHUNK_BYTES, progress=None):
+    # Charge un fichier d'arêtes en CompactGraph.
+    # fmt : déduit de l'extension si absent ; directed : False par défaut
+    # (True pour DIMACS, edgedefault pour GraphML) ; progress(octets lus,
+    # octets totaux, arêtes lues) est appelé après chaque bloc.
+    # Lève GraphFormatError (ValueError) si le fichier est invalide.
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    if fmt == "snapshot":
+        return load_snapshot(path, name)
+    if fmt == "dimacs":
+        return _load_dimacs(path, True if directed is None else directed, name, chunk_bytes, progress)
+    if fmt == "graphml":
+        return _load_graphml(path, directed, name, progress)
+    if fmt in ("csv", "tsv", "edgelist"):
+        return _load_table(path, fmt, bool(directed), name, chunk_bytes, progress)
+    raise ValueError(f"Format de graphe inconnu : {fmt}")
+
+
+def _load_cached(path, fmt, directed, name, snapshot, progress):
+    # Ouvre l'instantané s'il est plus récent que le fichier source ; sinon
+    # charge la source, écrit l'instantané et le rouvre par mmap pour que
+    # les processus qui démarrent ensuite partagent les mêmes pages
+    if os.path.exists(snapshot) and os.path.getmtime(snapshot) >= os.path.getmtime(path):
+        try:
+            return load_snapshot(snapshot, name)
+        except ValueError as e:  # version ancienne ou fichier abîmé : on le refait
+            log.warning("Instantané %s ignoré : %s", snapshot, e)
+    G = load_graph(path, fmt, directed, name, progress=progress)
+    try:
+        save_snapshot(snapshot, G)
+    except OSError as e:
+        log.warning("Instantané %s non écrit : %s", snapshot, e)
+        return G
+    return load_snapshot(snapshot, name)
+
+
+def register_graphs(directory):
+    # Un fichier <nom>.json par graphe dans directory, par exemple :
+    #   {"path": "france.gr", "format": "dimacs", "directed": true, "default_source": "1",
+    #    "snapshot": "france.cgs"}
+    # path (et snapshot, facultatif) sont relatifs au répertoire. Avec snapshot,
+    # le graphe est lu depuis l'instantané binaire tant qu'il est à jour.
+    # Renvoie {nom: {"graph", "default_source"}} ; un graphe invalide est
+    # signalé dans le journal et ignoré.
+    graphs = {}
+    if not os.path.isdir(directory):
+        return graphs
+    for fichier in sorted(os.listdir(directory)):
+        if not fichier.endswith(".json"):
+            continue
+        nom = fichier[:-len(".json")]
+        try:
+            with open(os.path.join(directory, fichier), encoding="utf-8") as f:
+                conf = json.load(f)
+            nom = conf.get("name", nom)
+
+            def progress(lus, total, aretes, nom=nom):
+                log.info("%s : %d / %d octets, %d arêtes", nom, lus, total, aretes)
+
+            path = os.path.join(directory, conf["path"])
+            if conf.get("snapshot"):
+                G = _load_cached(path, conf.get("format"), conf.get("directed"), nom,
+                                 os.path.join(directory, conf["snapshot"]), progress)
+            else:
+                G = load_graph(path, conf.get("format"), conf.get("directed"), nom, progress=progress)
+        except (OSError, ValueError, KeyError, ET.ParseError) as e:
+            log.warning("Graphe %s ignoré : %s", nom, e)
+            continue
+        default = conf.get("default_source")
+        graphs[nom] = {
+            "graph": G,
+            "default_source": default if default in G else (G.names[0] if G.names else None),
+        }
+    return graphs
@@ -0,0 +1,240 @@
+# snapshot.py
+# ===========================================================
+# Instantanés binaires de CompactGraph, ouverts par mmap
+# ===========================================================
+# Disposition du fichier (petit-boutiste) :
+#   MAGIC (8 octets) | version (u32) | taille de l'en-tête (u32) | en-tête JSON
+#   puis, alignées sur ALIGN octets, les sections décrites par l'en-tête :
+#     offsets, targets, weights      tableaux CSR du graphe
+#     names_offsets, names_blob      table des noms (UTF-8 concaténés)
+#     names_hash                     table de hachage nom -> id (adressage ouvert, crc32)
+#     <index>/<champ>                index précalculés facultatifs ("ch", "alt")
+# À l'ouverture rien n'est recopié : les tableaux sont des vues sur le mmap,
+# partagées entre tous les processus qui ouvrent le même fichier.
+
+from collections.abc import Mapping, Sequence
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from algorithms import CompactGraph
+
+MAGIC = b"CGSNAP\x00\x00"
+VERSION = 1
+ALIGN = 64
+
+# Champs enregistrés pour chaque index précalculé
+INDEX_FIELDS = {
+    "ch": ("rank", "src", "dst", "cost", "middle"),
+    "alt": ("landmarks", "forward", "backward", "poids"),
+}
+
+_PREAMBULE = struct.Struct("<8sII")
+
+
+def _aligne(x):
+    return -(-x // ALIGN) * ALIGN
+
+
+class _NameTable(Sequence):
+    # id -> nom, décodé à la demande depuis le blob UTF-8. Un parcours complet
+    # décode toute la table d'un coup et la garde (une fois par processus) :
+    # les algorithmes qui visitent tous les sommets ne paient pas n décodages
+    # à chaque appel.
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+        self._decodes = None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if self._decodes is not None:
+            return self._decodes[i]
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        if self._decodes is None:
+            bornes = self._offsets.tolist()
+            texte = str(self._blob[:bornes[-1]], "utf-8")
+            if texte.isascii():  # positions en octets = positions en caractères
+                self._decodes = [texte[a:b] for a, b in zip(bornes, bornes[1:])]
+            else:
+                brut = self._blob[:bornes[-1]].tobytes()
+                self._decodes = [brut[a:b].decode() for a, b in zip(bornes, bornes[1:])]
+        return iter(self._decodes)
+
+
+def _table_hachage(encodes):
+    # Adressage ouvert, sondage linéaire, taux de remplissage <= 1/2 :
+    # case crc32(nom) & masque, puis les suivantes ; -1 = case vide
+    taille = 1 << max(1, 2 * len(encodes) - 1).bit_length()
+    masque = taille - 1
+    table = [-1] * taille
+    for i, cle in enumerate(encodes):
+        case = zlib.crc32(cle) & masque
+        while table[case] >= 0:
+            case = (case + 1) & masque
+        table[case] = i
+    return np.array(table, dtype="<i8")
+
+
+class _NameIndex(Mapping):
+    # nom -> id dans la table de hachage de l'instantané : pas de dictionnaire à construire
+    def __init__(self, names, table):
+        self._names = names
+        self._table = table
+        self._masque = len(table) - 1
+
+    def __getitem__(self, name):
+        if not isinstance(name, str):
+            raise KeyError(name)
+        cle = name.encode()
+        offsets, blob, table = self._names._offsets, self._names._blob, self._table
+        case = zlib.crc32(cle) & self._masque
+        while True:
+            i = table[case]
+            if i < 0:
+                raise KeyError(name)
+            if blob[offsets[i]:offsets[i + 1]] == cle:
+                return i
+            case = (case + 1) & self._masque
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+def save_snapshot(path, graph, indexes=None):
+    # graph : CompactGraph (ou Graph, converti) ; indexes : {"ch": ContractionHierarchy,
+    # "alt": LandmarkIndex} à embarquer. Écriture dans un fichier temporaire puis
+    # renommage : un lecteur ne voit jamais de fichier partiel.
+    if not isinstance(graph, CompactGraph):
+        graph = CompactGraph.from_graph(graph)
+    encodes = [str(nom).encode() for nom in graph.names]
+    longueurs = np.fromiter((len(e) for e in encodes), dtype=np.int64, count=len(encodes))
+    names_offsets = np.zeros(len(encodes) + 1, dtype="<i8")
+    np.cumsum(longueurs, out=names_offsets[1:])
+
+    sections = {
+        "offsets": np.frombuffer(graph.offsets, dtype=np.int64),
+        "targets": np.frombuffer(graph.targets, dtype=np.int32),
+        "weights": np.frombuffer(graph.weights, dtype=np.float64),
+        "names_offsets": names_offsets,
+        "names_blob": np.frombuffer(b"".join(encodes), dtype=np.uint8),
+        "names_hash": _table_hachage(encodes),
+    }
+    for nom, index in (indexes or {}).items():
+        for champ in INDEX_FIELDS[nom]:
+            sections[f"{nom}/{champ}"] = np.asarray(getattr(index, champ))
+
+    description, position = {}, 0
+    for cle, tableau in sections.items():
+        tableau = tableau.astype(tableau.dtype.newbyteorder("<"), copy=False)
+        sections[cle] = tableau
+        description[cle] = {"offset": position, "dtype": tableau.dtype.str, "shape": list(tableau.shape)}
+        position = _aligne(position + tableau.nbytes)
+    entete = json.dumps({
+        "version": VERSION, "name": graph.name, "directed": graph.directed,
+        "n": len(graph.names), "m": len(graph.targets), "sections": description,
+    }).encode()
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBULE.pack(MAGIC, VERSION, len(entete)))
+        f.write(entete)
+        debut = _aligne(_PREAMBULE.size + len(entete))
+        for cle, tableau in sections.items():
+            f.seek(debut + description[cle]["offset"])
+            f.write(np.ascontiguousarray(tableau).tobytes())
+        f.truncate(debut + position)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path, name=None):
+    # Ouvre l'instantané par mmap : CompactGraph dont les tableaux CSR, la table
+    # des noms et les index sont des vues en lecture seule sur le fichier.
+    # Lève ValueError si le fichier n'est pas un instantané lisible.
+    with open(path, "rb") as f:
+        preambule = f.read(_PREAMBULE.size)
+        if len(preambule) != _PREAMBULE.size:
+            raise ValueError(f"{path} : pas un instantané de graphe")
+        magic, version, taille = _PREAMBULE.unpack(preambule)
+        if magic != MAGIC:
+            raise ValueError(f"{path} : pas un instantané de graphe")
+        if version != VERSION:
+            raise ValueError(f"{path} : version d'instantané {version} non prise en charge (attendue : {VERSION})")
+        entete = f.read(taille)
+        if len(entete) != taille:
+            raise ValueError(f"{path} : en-tête tronqué")
+        entete = json.loads(entete)
+        carte = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    debut = _aligne(_PREAMBULE.size + taille)
+    vue = memoryview(carte)
+
+    def section(cle):
+        d = entete["sections"][cle]
+        dtype = np.dtype(d["dtype"])
+        taille = int(np.prod(d["shape"], dtype=np.int64)) * dtype.itemsize
+        brut = vue[debut + d["offset"]:debut + d["offset"] + taille]
+        if len(brut) != taille:
+            raise ValueError(f"{path} : section {cle} tronquée")
+        return np.frombuffer(brut, dtype=dtype).reshape(d["shape"])
+
+    def tampon(cle, code):
+        # memoryview typée : indexation Python aussi rapide qu'un array
+        tableau = section(cle)
+        if sys.byteorder == "little":
+            return vue[debut + entete["sections"][cle]["offset"]:][:tableau.nbytes].cast(code)
+        return memoryview(tableau.astype(tableau.dtype.newbyteorder("="))).cast(code)
+
+    n, m = entete["n"], entete["m"]
+    offsets, targets, weights = tampon("offsets", "q"), tampon("targets", "i"), tampon("weights", "d")
+    if len(offsets) != n + 1 or len(targets) != m or len(weights) != m:
+        raise ValueError(f"{path} : tailles incohérentes avec l'en-tête")
+    names = _NameTable(tampon("names_offsets", "q"), tampon("names_blob", "B"))
+    graph = CompactGraph(names, offsets, targets, weights, entete["directed"], name or entete["name"],
+                         index=_NameIndex(names, tampon("names_hash", "q")))
+    for nom, champs in INDEX_FIELDS.items():
+        if all(f"{nom}/{c}" in entete["sections"] for c in champs):
+            graph.indexes[nom] = {c: section(f"{nom}/{c}") for c in champs}
+    return graph
+
+
+if __name__ == "__main__":
+    # python snapshot.py fichier_source instantane.cgs [--ch] [--alt] [--directed]
+    import argparse
+    from loaders import load_graph
+
+    parser = argparse.ArgumentParser(description="Construit un instantané binaire d'un graphe")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--format")
+    parser.add_argument("--directed", action="store_true", default=None)
+    parser.add_argument("--ch", action="store_true", help="embarque les hiérarchies de contraction")
+    parser.add_argument("--alt", action="store_true", help="embarque l'index ALT")
+    args = parser.parse_args()
+
+    G = load_graph(args.source, args.format, args.directed)
+    indexes = {}
+    if args.ch or args.alt:
+        from alt import LandmarkIndex
+        from ch import ContractionHierarchy
+        noms, origines, destinations, poids = G._arc_arrays()
+        if args.ch:
+            indexes["ch"] = ContractionHierarchy.build(noms, origines, destinations, poids)
+        if args.alt:
+            indexes["alt"] = LandmarkIndex.build(noms, origines, destinations, poids)
+    save_snapshot(args.destination, G, indexes)
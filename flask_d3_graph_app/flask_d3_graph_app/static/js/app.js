@@ -1,6 +1,15 @@
 const width = window.innerWidth;
 const height = document.getElementById('graph').offsetHeight;
 
+// Algorithmes point à point : une cible est obligatoire
+const POINT_TO_POINT = {
+  dijkstra: 'Dijkstra',
+  bidijkstra: 'Dijkstra bidirectionnel',
+  astar: 'A*',
+  alt: 'ALT (points de repère)',
+  ch: 'Contraction Hierarchies'
+};
+
 // SVG + container (pour le zoom/pan)
 const svg = d3.select('#graph').append('svg')
   .attr('width', width)
@@ -121,7 +130,7 @@ nodesEnter.append('title')
   const srcSel = document.getElementById('source');
   const tgtSel = document.getElementById('target');
 
-  if (algo === 'dijkstra') {
+  if (algo in POINT_TO_POINT) {
     tgtSel.value = d.id;  // sélectionne la cible
   } else {
     srcSel.value = d.id;  // met à jour la source
@@ -191,9 +200,9 @@ function renderResult(algo, data){
     setChips(data.order || []);
   }
 
-  if(algo === 'dijkstra'){
+  if(algo in POINT_TO_POINT){
     setSummary([
-      ['Algorithme', 'Dijkstra'],
+      ['Algorithme', POINT_TO_POINT[algo]],
       ['Coût total', data.cost != null ? data.cost : '—'],
       ['Longueur du chemin', (data.path || []).length]
     ]);
@@ -226,7 +235,7 @@ if(algo === 'bellman'){
     ['Source', document.getElementById('source').value || '—']
   ]);
   if (data.error){
-    setChips(['Cycle négatif détecté']);
+    setChips(['Cycle négatif détecté'].concat(data.cycle || []));
   } else if (data.table) {
     const rows = data.table.map(r => [
       r.node,
@@ -296,9 +305,97 @@ function setFWTable(dist){
 }
 
 
+// Calcul long lancé en tâche de fond (réponse 202) : attend sa fin
+async function waitForJob(job){
+  while (!['done', 'failed', 'cancelled', 'timeout'].includes(job.status)) {
+    document.getElementById('status').textContent = `Calcul en cours (${job.status})…`;
+    const res = await fetch(`/api/jobs/${job.id}?wait=10`);
+    job = await res.json();
+  }
+  return job;
+}
+
+
+async function runFloydStream(graph, algo = 'floyd'){
+  clearResult();
+  clearHighlights();
+  const res = await fetch('/api/run', {
+    method:'POST',
+    headers:{'Content-Type':'application/json'},
+    body: JSON.stringify({ graph, algo, stream: true })
+  });
+  if (res.status === 202) {
+    // matrices en cours de calcul côté serveur : on relance le flux ensuite
+    const job = await waitForJob(await res.json());
+    if (job.status === 'done') return runFloydStream(graph, algo);
+    document.getElementById('status').textContent = 'Erreur';
+    setChips([job.error || 'Erreur']);
+    return;
+  }
+  if (!res.ok) {
+    const out = await res.json();
+    document.getElementById('status').textContent = 'Erreur';
+    document.getElementById('output').textContent = JSON.stringify(out, null, 2);
+    setChips([out.error || 'Erreur']);
+    return;
+  }
+
+  const thead = document.getElementById('thead');
+  const tbody = document.getElementById('tbody');
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let nodes = [];
+  let rows = 0;
+
+  // Chaque ligne complète du flux est ajoutée au tableau dès sa réception
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const msg = JSON.parse(line);
+    if (msg.nodes) {
+      nodes = msg.nodes;
+      thead.innerHTML = `<tr>${[''].concat(nodes).map(h=>`<th>${h}</th>`).join('')}</tr>`;
+      return;
+    }
+    const tr = document.createElement('tr');
+    tr.innerHTML = [msg.source].concat(msg.distances.map(d => d !== null ? d : '∞'))
+      .map(x => `<td>${x}</td>`).join('');
+    tbody.appendChild(tr);
+    rows += 1;
+    document.getElementById('status').textContent = `${rows} / ${nodes.length} lignes`;
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer);
+
+  setSummary([
+    ['Algorithme', algo === 'johnson' ? 'Johnson' : 'Floyd–Warshall'],
+    ['Paires totales', rows * nodes.length]
+  ]);
+  document.getElementById('status').textContent = 'OK';
+  document.getElementById('output').textContent = `${rows} lignes reçues en flux (NDJSON)`;
+}
+
+
+// Présentation "columns" de /api/graph -> objets attendus par D3
+function expandGraph(data){
+  const ids = data.nodes;
+  const { source, target, weight } = data.links;
+  data.nodes = ids.map(id => ({ id }));
+  data.links = source.map((s, i) => ({ source: ids[s], target: ids[target[i]], weight: weight[i] }));
+  return data;
+}
+
 async function loadGraph(name = document.getElementById('graphSelect')?.value || 'fr_routes'){
-  const res = await fetch('/api/graph?name=' + encodeURIComponent(name));
-  const data = await res.json();
+  const res = await fetch('/api/graph?format=columns&name=' + encodeURIComponent(name));
+  const data = expandGraph(await res.json());
   renderGraph(data);
 
 // ✅ mets à jour l’UI "orienté / non orienté"
@@ -323,6 +420,21 @@ async function loadGraph(name = document.getElementById('graphSelect')?.value ||
   if (typeof updateControls === 'function') updateControls();
 }
 
+// Ajoute au menu les graphes chargés depuis des fichiers côté serveur
+async function loadGraphList(){
+  const res = await fetch('/api/graphs');
+  const graphs = await res.json();
+  const sel = document.getElementById('graphSelect');
+  const known = new Set([...sel.options].map(o => o.value));
+  graphs.filter(g => !known.has(g.name)).forEach(g => {
+    const opt = document.createElement('option');
+    opt.value = g.name;
+    opt.textContent = `${g.name} (${g.nodes} sommets)`;
+    sel.appendChild(opt);
+  });
+}
+
+loadGraphList();
 loadGraph();
 
 document.getElementById('graphSelect').addEventListener('change', (e) => {
@@ -336,8 +448,8 @@ document.getElementById('runBtn').addEventListener('click', async () => {
   const target = document.getElementById('target').value; // select
 
   // Cible requise pour Dijkstra
-  if (algo === 'dijkstra' && !target) {
-    document.getElementById('status').textContent = 'Choisis une cible (ville) pour Dijkstra';
+  if (algo in POINT_TO_POINT && !target) {
+    document.getElementById('status').textContent = `Choisis une cible (ville) pour ${POINT_TO_POINT[algo]}`;
     document.getElementById('target').classList.add('input-error');
     return;
   }
@@ -345,17 +457,33 @@ document.getElementById('runBtn').addEventListener('click', async () => {
 
   document.getElementById('status').textContent = '...';
 
+  // Floyd–Warshall / Johnson : la matrice arrive ligne par ligne (NDJSON)
+  if (algo === 'floyd' || algo === 'johnson') {
+    try {
+      await runFloydStream(graph, algo);
+    } catch (err) {
+      document.getElementById('status').textContent = 'Erreur réseau';
+    }
+    return;
+  }
+
   try {
     const res = await fetch('/api/run', {
       method:'POST',
       headers:{'Content-Type':'application/json'},
       body: JSON.stringify({ graph, algo, source, target })
     });
-    const out = await res.json();
-    document.getElementById('status').textContent = res.ok ? 'OK' : 'Erreur';
+    let out = await res.json();
+    let ok = res.ok;
+    if (res.status === 202) {
+      const job = await waitForJob(out);
+      out = job.status === 'done' ? job.result : { error: job.error };
+      ok = job.status === 'done' && !out.error;
+    }
+    document.getElementById('status').textContent = ok ? 'OK' : 'Erreur';
     renderResult(algo, out);
     document.getElementById('output').textContent = JSON.stringify(out, null, 2);
-    if (res.ok) highlightResult(out);
+    if (ok) highlightResult(out);
   } catch (err) {
     document.getElementById('status').textContent = 'Erreur réseau';
   }
@@ -373,7 +501,7 @@ function selectPlaceholder(sel){
 }
 
 function updateControls(){
-  const needsTarget = (algoSel.value === 'dijkstra');
+  const needsTarget = (algoSel.value in POINT_TO_POINT);
   targetInput.disabled = !needsTarget;
   if (!needsTarget) {
     selectPlaceholder(targetInput);
@@ -0,0 +1,6 @@
+# Les modules de l'application s'importent à plat (from ch import ...) :
+# on ajoute leur dossier au chemin de recherche pour les tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,114 @@
+# test_batch.py
+# ===========================================================
+# Requêtes groupées (/api/batch, batch_shortest_paths, distance_matrix)
+# comparées à des Dijkstra / Bellman-Ford individuels
+# ===========================================================
+
+import math
+import random
+
+import pytest
+
+import app
+import apsp
+from algorithms import Graph, batch_shortest_paths, distance_matrix
+
+
+def graphe_aleatoire(seed, directed, n=30, m=70, poids=(1, 20)):
+    rng = random.Random(seed)
+    G = Graph(directed=directed, name=f"batch{seed}")
+    for i in range(n):
+        G.graph[f"s{i}"]
+    for _ in range(m):
+        i, j = sorted(rng.sample(range(n), 2))  # i < j : pas de cycle négatif si orienté
+        G.add_edge(f"s{i}", f"s{j}", rng.randint(*poids) + rng.random())
+    return G
+
+
+def distances(G, source):
+    negatif = any(w < 0 for w, _, _ in G.edges)
+    return G.bellman_ford(source)[0] if negatif else G.dijkstra(source)
+
+
+@pytest.mark.parametrize("directed, poids", [(False, (1, 20)), (True, (1, 20)), (True, (-5, 15))])
+def test_distance_matrix(directed, poids):
+    G = graphe_aleatoire(len(poids) + directed + poids[0], directed, poids=poids)
+    sources = [f"s{i}" for i in range(0, 30, 3)] + ["inconnu"]
+    cibles = [f"s{i}" for i in range(30)] + ["inconnu"]
+    matrice = distance_matrix(G, sources, cibles)
+    for s, ligne in zip(sources, matrice):
+        attendu = distances(G, s) if s in G else {}
+        for t, d in zip(cibles, ligne):
+            ref = attendu.get(t, math.inf)
+            assert (math.isinf(d) and math.isinf(ref)) or d == pytest.approx(ref), (s, t)
+
+
+@pytest.mark.parametrize("poids", [(1, 20), (-5, 15)])
+def test_batch_shortest_paths(poids, monkeypatch):
+    G = graphe_aleatoire(7 + poids[0], True, poids=poids)
+    rng = random.Random(1)
+    queries = [(f"s{rng.randrange(30)}", f"s{rng.randrange(30)}") for _ in range(60)]
+    queries += [("inconnu", "s1"), ("s1", "inconnu")]
+    for workers in (1, 2):
+        monkeypatch.setattr(apsp, "BATCH_PARALLEL_MIN", 1)
+        for (s, t), (chemin, cout) in zip(queries, batch_shortest_paths(G, queries, workers=workers)):
+            ref = distances(G, s).get(t, math.inf) if s in G else math.inf
+            if math.isinf(ref):
+                assert (chemin, cout) == ([], math.inf), (s, t)
+                continue
+            assert cout == pytest.approx(ref), (s, t)
+            assert chemin[0] == s and chemin[-1] == t
+            total = sum(min(w for x, w in G.graph[a] if x == b) for a, b in zip(chemin, chemin[1:]))
+            assert total == pytest.approx(ref)
+
+
+def test_cycle_negatif():
+    G = Graph(directed=True)
+    G.add_edge("a", "b", 1)
+    G.add_edge("b", "a", -2)
+    with pytest.raises(ValueError, match="Cycle négatif"):
+        distance_matrix(G, ["a"], ["b"])
+
+
+def test_api_batch_requetes():
+    client = app.app.test_client()
+    queries = [{"algo": "dijkstra", "source": "Rennes", "target": "Nancy"},
+               {"source": "Rennes", "target": "Grenoble"},
+               {"algo": "bfs", "source": "Paris"},
+               {"algo": "astar", "source": "Caen", "target": "Lyon"},
+               {"source": "Atlantis", "target": "Paris"},
+               {"source": "Paris"}]
+    r = client.post("/api/batch", json={"graph": "fr_routes", "queries": queries})
+    assert r.status_code == 200
+    results = r.get_json()["results"]
+    G = app.GRAPHS["fr_routes"]["graph"]
+    for q, res in zip(queries[:4], results):
+        if "target" in q:
+            assert res["cost"] == pytest.approx(G.dijkstra(q["source"])[q["target"]])
+    assert results[2]["order"][0] == "Paris"
+    assert "inconnue" in results[4]["error"] and results[5]["error"] == "Cible manquante"
+
+
+def test_api_batch_matrice():
+    client = app.app.test_client()
+    r = client.post("/api/batch", json={"graph": "demo_small", "sources": ["A", "E"], "targets": ["D", "A"]})
+    assert r.status_code == 200
+    assert r.get_json()["distances"] == [[1.0, 0.0], [1.0, None]]
+    r = client.post("/api/batch", json={"graph": "demo_small", "sources": ["A", "B"]})
+    assert r.get_json()["targets"] == ["A", "B"]
+
+
+@pytest.mark.parametrize("corps", [
+    {"sources": "Paris"},
+    {"sources": ["Paris"], "targets": "Lyon"},
+    {"sources": [["Paris"]]},
+    {"sources": ["Atlantis"]},
+    {"queries": "x"},
+    {"queries": [1]},
+    {"queries": [{"source": ["Paris"], "target": "Lyon"}]},
+    {"queries": [{"source": "Paris", "target": {"a": 1}}]},
+    ["Paris"],
+])
+def test_api_batch_invalide(corps):
+    r = app.app.test_client().post("/api/batch", json=corps)
+    assert r.status_code == 400, r.get_json()
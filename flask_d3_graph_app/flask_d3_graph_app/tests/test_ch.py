@@ -0,0 +1,113 @@
+# test_ch.py
+# ===========================================================
+# Hiérarchies de contraction comparées à Dijkstra simple
+# ===========================================================
+
+import math
+import random
+
+import pytest
+
+from algorithms import Graph
+from ch import ContractionHierarchy
+
+
+def graphe_aleatoire(seed, directed, n=40, m=90, poids_entiers=True):
+    # Arcs tirés parmi les n - 3 premiers sommets ; les trois derniers forment
+    # un sommet isolé et une composante à part : il y a des paires inatteignables
+    rng = random.Random(seed)
+    G = Graph(directed=directed)
+    for i in range(n):
+        G.graph[f"s{i}"]
+    for _ in range(m):
+        u, v = rng.sample(range(n - 3), 2)
+        w = rng.randint(0, 20) if poids_entiers else rng.uniform(0.1, 20.0)
+        G.add_edge(f"s{u}", f"s{v}", w)
+    G.add_edge(f"s{n - 2}", f"s{n - 1}", 1)
+    return G
+
+
+def hierarchie(G, **options):
+    sommets, origines, destinations, poids = G._arc_arrays()
+    return ContractionHierarchy.build([str(s) for s in sommets], origines, destinations, poids, **options)
+
+
+def cout_chemin(G, chemin):
+    # Coût d'un chemin en suivant les arcs réels (le plus léger s'il y en a plusieurs)
+    total = 0
+    for u, v in zip(chemin, chemin[1:]):
+        poids = [w for x, w in G.graph[u] if x == v]
+        assert poids, f"arc inexistant {u} -> {v}"
+        total += min(poids)
+    return total
+
+
+def verifier(G, ch):
+    sommets = list(G.graph)
+    inatteignables = 0
+    for s in sommets:
+        dist = G.dijkstra(s)
+        for t in sommets:
+            attendu = dist.get(t, math.inf)
+            chemin, cout = ch.query(s, t)
+            if math.isinf(attendu):
+                inatteignables += 1
+                assert (chemin, cout) == ([], math.inf), (s, t)
+                continue
+            assert cout == pytest.approx(attendu), (s, t)
+            assert chemin[0] == s and chemin[-1] == t
+            assert cout_chemin(G, chemin) == pytest.approx(attendu), (s, t, chemin)
+    return inatteignables
+
+
+@pytest.mark.parametrize("directed", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_distances_et_chemins_comme_dijkstra(seed, directed):
+    G = graphe_aleatoire(seed, directed)
+    assert verifier(G, hierarchie(G)) > 0  # le jeu de test contient des paires inatteignables
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_poids_reels(directed):
+    G = graphe_aleatoire(42, directed, poids_entiers=False)
+    verifier(G, hierarchie(G))
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_recherche_de_temoin_tronquee(directed):
+    # Témoins limités à un sommet : beaucoup de raccourcis superflus, mêmes réponses
+    G = graphe_aleatoire(7, directed)
+    verifier(G, hierarchie(G, witness_limit=1))
+
+
+def test_arcs_paralleles_et_boucles():
+    G = Graph(directed=True)
+    G.add_edge("a", "b", 5)
+    G.add_edge("a", "b", 2)
+    G.add_edge("b", "b", 1)
+    G.add_edge("b", "c", 3)
+    G.graph["d"]
+    assert hierarchie(G).query("a", "c") == (["a", "b", "c"], 5)
+    verifier(G, hierarchie(G))
+
+
+def test_sommets_inconnus_et_source_egale_cible():
+    G = graphe_aleatoire(3, True, n=10, m=20)
+    ch = hierarchie(G)
+    assert ch.query("s0", "absent") == ([], math.inf)
+    assert ch.query("absent", "s0") == ([], math.inf)
+    assert ch.query("s0", "s0") == (["s0"], 0)
+
+
+def test_sauvegarde_et_rechargement(tmp_path):
+    G = graphe_aleatoire(11, True)
+    chemin = tmp_path / "ch.npz"
+    hierarchie(G).save(chemin)
+    verifier(G, ContractionHierarchy.load(chemin))
+
+
+def test_poids_negatif_refuse():
+    G = Graph(directed=True)
+    G.add_edge("a", "b", -1)
+    with pytest.raises(ValueError):
+        hierarchie(G)
@@ -0,0 +1,243 @@
+# test_dynamic.py
+# ===========================================================
+# Modifications d'un graphe : arbres, matrices all-pairs et résultats en
+# cache réparés comparés à un recalcul complet
+# ===========================================================
+
+import itertools
+import math
+import random
+
+import numpy as np
+import pytest
+
+import algorithms
+import apsp
+from algorithms import Graph, apply_changes, shortest_path_tree
+from cache import ResultCache
+
+_noms = itertools.count()
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(apsp, "STORE_DIR", str(tmp_path / "apsp"))
+    return tmp_path / "apsp"
+
+
+def graphe_aleatoire(seed, directed, n=30, m=70):
+    rng = random.Random(seed)
+    G = Graph(directed=directed, name=f"dyn{next(_noms)}")
+    for i in range(n):
+        G.graph[f"s{i}"]
+    for _ in range(m):
+        u, v = rng.sample(range(n), 2)
+        G.add_edge(f"s{u}", f"s{v}", rng.randint(1, 20))
+    return G
+
+
+def lot_aleatoire(rng, G, taille, ops=("add", "remove", "update")):
+    # Lot valide : chaque paire n'est touchée qu'une fois, remove / update
+    # seulement sur des arcs existants
+    sommets = G._all_nodes()
+    existants = sorted({(u, v) for _, u, v in G.edges}, key=str)
+    rng.shuffle(existants)
+    changes = []
+    for _ in range(taille):
+        op = rng.choice(ops)
+        if op == "add" or not existants:
+            u, v = rng.sample(sommets, 2)
+            changes.append(("add", u, v, rng.randint(1, 20)))
+        else:
+            u, v = existants.pop()
+            changes.append((op, u, v, None if op == "remove" else rng.randint(1, 20)))
+    return changes
+
+
+def distances_egales(a, b):
+    for x in set(a) | set(b):
+        da, db = a.get(x, math.inf), b.get(x, math.inf)
+        assert (math.isinf(da) and math.isinf(db)) or da == pytest.approx(db), x
+
+
+def verifier_arbre(G, source, dist, pred):
+    # Distances égales à un Dijkstra neuf, et chaque prédécesseur est un arc réel qui les réalise
+    distances_egales(dist, G.dijkstra(source))
+    for x, p in pred.items():
+        if p is None:
+            assert x == source or math.isinf(dist[x])
+            continue
+        assert any(y == x and dist[p] + w == pytest.approx(dist[x]) for y, w in G.graph[p]), (p, x)
+
+
+@pytest.mark.parametrize("directed", [True, False])
+@pytest.mark.parametrize("ops", [("update",), ("remove",), ("add",), ("add", "remove", "update")])
+def test_arbres_repares_comme_recalcul(directed, ops):
+    rng = random.Random(len(ops) * 2 + directed)
+    G = graphe_aleatoire(rng.random(), directed)
+    sources = ["s0", "s1", "s2"]
+    for s in sources:
+        shortest_path_tree(G, s)
+    for _ in range(15):
+        summary = apply_changes(G, lot_aleatoire(rng, G, rng.randint(1, 4), ops))
+        assert summary["trees_repaired"] == len(sources)
+        for s in sources:
+            assert algorithms.tree_ready(G, s)
+            verifier_arbre(G, s, *algorithms._cached_tree(G, s))
+
+
+def test_hausses_et_baisses_de_poids():
+    # Hausse d'un arc de l'arbre (sous-arbre à refaire) puis baisse (propagation)
+    G = Graph(directed=True, name=f"dyn{next(_noms)}")
+    for u, v, w in [("a", "b", 1), ("b", "c", 1), ("c", "d", 1), ("a", "d", 10), ("a", "c", 5)]:
+        G.add_edge(u, v, w)
+    shortest_path_tree(G, "a")
+    apply_changes(G, [("update", "a", "b", 8)])
+    dist, pred = algorithms._cached_tree(G, "a")
+    assert (dist["c"], pred["c"], dist["d"]) == (5, "a", 6)
+    apply_changes(G, [("update", "a", "b", 0)])
+    dist, pred = algorithms._cached_tree(G, "a")
+    assert (dist["c"], pred["c"], dist["d"]) == (1, "b", 2)
+    apply_changes(G, [("remove", "b", "c", None), ("remove", "a", "c", None)])
+    dist, pred = algorithms._cached_tree(G, "a")
+    assert (dist["c"], dist["d"], pred["d"]) == (math.inf, 10, "a")
+
+
+def test_arbre_avec_poids_negatifs():
+    # DAG (arcs i -> j avec i < j) : poids négatifs sans cycle négatif
+    rng = random.Random(7)
+    G = Graph(directed=True, name=f"dyn{next(_noms)}")
+    for _ in range(60):
+        i, j = sorted(rng.sample(range(25), 2))
+        G.add_edge(f"s{i}", f"s{j}", rng.randint(-5, 15))
+    shortest_path_tree(G, "s0")
+    for _ in range(10):
+        changes = [(op, u, v, w if w is None else rng.randint(-5, 15))
+                   for op, u, v, w in lot_aleatoire(rng, G, 3, ("update", "remove"))]
+        apply_changes(G, changes)
+        dist, _ = algorithms._cached_tree(G, "s0")
+        distances_egales(dist, G.bellman_ford("s0")[0])
+
+
+def test_cycle_negatif_abandonne_l_arbre():
+    G = Graph(directed=True, name=f"dyn{next(_noms)}")
+    G.add_edge("a", "b", 1)
+    G.add_edge("b", "c", 1)
+    G.add_edge("c", "b", 1)
+    shortest_path_tree(G, "a")
+    summary = apply_changes(G, [("update", "c", "b", -5)])
+    assert (summary["trees_repaired"], summary["trees_dropped"]) == (0, 1)
+    assert not algorithms.tree_ready(G, "a")
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_matrices_all_pairs_reparees_comme_recalcul(directed, tmp_path):
+    rng = random.Random(11 + directed)
+    G = graphe_aleatoire(rng.random(), directed, n=25, m=60)
+    algorithms.all_pairs_store(G)
+    repares = 0
+    for k in range(20):
+        summary = apply_changes(G, lot_aleatoire(rng, G, 1, ("update", "remove")))
+        if summary["all_pairs"] != "repaired":
+            algorithms.all_pairs_store(G)  # trop de lignes à refaire : recalcul, on continue
+            continue
+        repares += 1
+        store = algorithms.all_pairs_store(G)
+        sommets, origines, destinations, poids = G._arc_arrays()
+        attendu = apsp.build_store(str(tmp_path / f"ref{k}"), [str(s) for s in sommets],
+                                   origines, destinations, poids)
+        assert store.nodes == attendu.nodes
+        np.testing.assert_allclose(store.dist, attendu.dist)
+        for u in store.nodes:
+            for v in store.nodes:
+                chemin = store.path(u, v)
+                if math.isinf(store.distance(u, v)):
+                    assert chemin == []
+                    continue
+                cout = sum(min(w for x, w in G.graph[a] if x == b) for a, b in zip(chemin, chemin[1:]))
+                assert cout == pytest.approx(store.distance(u, v))
+    assert repares > 0
+
+
+def test_anciens_fichiers_supprimes(store_dir):
+    G = graphe_aleatoire(3, True)
+    algorithms.all_pairs_store(G)
+    avant = set(p.name for p in store_dir.iterdir())
+    apply_changes(G, [("update", *next((u, v) for _, u, v in G.edges), 99)])
+    apres = set(p.name for p in store_dir.iterdir() if not p.name.startswith("."))
+    assert len(apres) == 1 and not (avant & apres)
+
+
+# ----------------------
+# Résultats en cache gardés d'une version à l'autre
+# ----------------------
+def test_carry_over():
+    cache = ResultCache()
+    cache.put(("g", 1, "dijkstra", "a", "b"), "garde")
+    cache.put(("g", 1, "dijkstra", "a", "c"), "jete")
+    cache.put(("g", 0, "bfs", "a", None), "ancien")
+    cache.put(("h", 1, "bfs", "a", None), "autre graphe")
+    cache.carry_over("g", 1, 2, lambda key, value: value == "garde")
+    assert cache.get(("g", 2, "dijkstra", "a", "b")) == "garde"
+    assert cache.get(("g", 1, "dijkstra", "a", "b")) is None
+    assert cache.get(("g", 2, "dijkstra", "a", "c")) is None
+    assert cache.get(("g", 0, "bfs", "a", None)) is None
+    assert cache.get(("h", 1, "bfs", "a", None)) == "autre graphe"
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_resultats_gardes_exacts(directed, monkeypatch):
+    import app
+    rng = random.Random(5 + directed)
+    G = graphe_aleatoire(rng.random(), directed)
+    monkeypatch.setitem(app.GRAPHS, G.name, {"graph": G, "default_source": "s0"})
+    client = app.app.test_client()
+    requetes = [("dijkstra", f"s{rng.randrange(30)}", f"s{rng.randrange(30)}") for _ in range(20)]
+    requetes += [("kruskal", "s0", None), ("prim", "s1", None), ("bfs", "s2", None), ("dfs", "s3", None)]
+    gardes = 0
+    for _ in range(12):
+        for algo, s, t in requetes:
+            client.post("/api/run", json={"graph": G.name, "algo": algo, "source": s, "target": t})
+        ops = rng.choice([("update",), ("add", "remove", "update")])
+        changes = [{"op": op, "source": u, "target": v, "weight": w if w is None else rng.randint(1, 30)}
+                   for op, u, v, w in lot_aleatoire(rng, G, 2, ops)]
+        r = client.post(f"/api/graphs/{G.name}/changes", json={"changes": changes})
+        assert r.status_code == 200, r.get_json()
+        version = r.get_json()["version"]
+        for key, (_, result) in list(app.RESULTS._entries.items()):
+            if key[0] != G.name:
+                continue
+            assert key[1] == version
+            gardes += 1
+            attendu, _ = app._run_algorithm(G, key[2], key[3] or "s0", key[4])
+            if key[2] in app.POINT_TO_POINT or key[2] in ("kruskal", "prim"):
+                cle = "cost" if key[2] in app.POINT_TO_POINT else "total"
+                assert result[cle] == pytest.approx(attendu[cle]), key
+            else:
+                assert result == attendu, key
+    assert gardes > 0
+
+
+def test_changes_invalides():
+    import app
+    client = app.app.test_client()
+    for corps in [{"changes": [{"op": "update", "source": ["a"], "target": "b", "weight": 1}]},
+                  {"changes": [{"op": "update", "source": "Paris", "target": "Lyon", "weight": "x"}]},
+                  {"changes": [{"op": "remove", "source": "Paris", "target": "Inconnu"}]},
+                  {"changes": [{"op": "frob", "source": "Paris", "target": "Lyon", "weight": 1}]},
+                  {"changes": "x"}, {"changes": [1]}, {}]:
+        r = client.post("/api/graphs/fr_routes/changes", json=corps)
+        assert r.status_code == 400, corps
+    assert client.post("/api/graphs/fr_routes/changes", json={"changes": [], "version": -1}).status_code == 409
+
+
+def test_sommets_apres_modifications():
+    # in / number_of_nodes (tenus à jour) d'accord avec _all_nodes après chaque lot
+    rng = random.Random(2)
+    for directed in (True, False):
+        G = graphe_aleatoire(rng.random(), directed, n=15, m=20)
+        for _ in range(30):
+            apply_changes(G, lot_aleatoire(rng, G, 3, ("add", "remove")))
+            sommets = G._all_nodes()
+            assert G.number_of_nodes() == len(sommets)
+            assert all(s in G for s in sommets) and "absent" not in G
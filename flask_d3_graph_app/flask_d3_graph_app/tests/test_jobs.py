@@ -0,0 +1,167 @@
+# test_jobs.py
+# ===========================================================
+# Tâches dans des processus fils (jobs.py) et routes /api/jobs
+# ===========================================================
+
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+
+import app
+from jobs import CANCELLED, DONE, FAILED, TIMEOUT, JobManager, fork_safe_lock
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="tâches lancées par fork")
+
+
+def vivant(pid):
+    # Processus existant et pas zombie (un fils tué attend parfois d'être récupéré)
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+    except FileNotFoundError:
+        return False
+
+
+def attendre(condition, delai=10.0):
+    fin = time.monotonic() + delai
+    while time.monotonic() < fin:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def carre(x):
+    return {"pid": os.getpid(), "valeur": x * x}
+
+
+def echoue():
+    raise ValueError("calcul impossible")
+
+
+def dort_avec_petit_fils(fichier):
+    # Lance un petit-fils (même groupe de processus) puis ne rend jamais la main
+    petit_fils = subprocess.Popen(["sleep", "60"])
+    with open(fichier, "w") as f:
+        f.write(f"{os.getpid()} {petit_fils.pid}")
+    time.sleep(60)
+
+
+def pids(fichier):
+    assert attendre(lambda: os.path.exists(fichier) and os.path.getsize(fichier))
+    with open(fichier) as f:
+        return [int(p) for p in f.read().split()]
+
+
+@pytest.fixture
+def jobs():
+    return JobManager(max_workers=2, default_timeout=30.0)
+
+
+def test_soumission_attente_resultat(jobs):
+    job = jobs.submit(carre, 7)
+    assert job.done.wait(10)
+    assert job.status == DONE
+    assert job.result["valeur"] == 49
+    assert job.result["pid"] != os.getpid()  # calculé dans un fils
+    assert jobs.get(job.id) is job
+    assert job.to_dict()["result"]["valeur"] == 49
+
+
+def test_erreur_et_on_done(jobs):
+    vus = []
+    ok = jobs.submit(carre, 3, on_done=vus.append)
+    ko = jobs.submit(echoue, on_done=vus.append)
+    assert ok.done.wait(10) and ko.done.wait(10)
+    assert (ko.status, ko.error) == (FAILED, "calcul impossible")
+    assert vus == [ok]  # on_done seulement pour une tâche réussie
+
+
+def test_meme_cle_une_seule_tache(jobs, tmp_path):
+    fichier = str(tmp_path / "pids")
+    a = jobs.submit(dort_avec_petit_fils, fichier, key=("k",))
+    b = jobs.submit(carre, 1, key=("k",))
+    assert a is b
+    jobs.cancel(a.id)
+
+
+@pytest.mark.parametrize("arret", ["annulation", "limite de temps"])
+def test_arret_tue_le_fils_et_son_groupe(jobs, tmp_path, arret):
+    fichier = str(tmp_path / "pids")
+    job = jobs.submit(dort_avec_petit_fils, fichier, timeout=60 if arret == "annulation" else 1.0)
+    fils, petit_fils = pids(fichier)
+    assert vivant(fils) and vivant(petit_fils)
+    if arret == "annulation":
+        jobs.cancel(job.id)
+    assert job.done.wait(10)
+    assert job.status == (CANCELLED if arret == "annulation" else TIMEOUT)
+    assert attendre(lambda: not vivant(fils) and not vivant(petit_fils))
+
+
+def test_annulation_avant_demarrage(tmp_path):
+    jobs = JobManager(max_workers=1)
+    occupe = jobs.submit(dort_avec_petit_fils, str(tmp_path / "pids"))
+    en_attente = jobs.submit(carre, 2)
+    jobs.cancel(en_attente.id)
+    assert en_attente.done.is_set() and en_attente.status == CANCELLED
+    jobs.cancel(occupe.id)
+    assert occupe.done.wait(10)
+    assert en_attente.process is None
+
+
+def test_verrou_tenu_pendant_le_fork(jobs):
+    # Un autre thread tient le verrou : le fork attend qu'il soit rendu, et le
+    # fils ne le trouve jamais pris
+    verrou = fork_safe_lock()
+    pris, relache = threading.Event(), threading.Event()
+
+    def tient():
+        with verrou:
+            pris.set()
+            relache.wait(10)
+
+    threading.Thread(target=tient).start()
+    assert pris.wait(10)
+
+    def dans_le_fils():
+        with verrou:
+            return "ok"
+
+    job = jobs.submit(dans_le_fils)
+    time.sleep(0.2)
+    assert not job.done.is_set()  # fork en attente du verrou
+    relache.set()
+    assert job.done.wait(10)
+    assert (job.status, job.result) == (DONE, "ok")
+
+
+# ----------------------
+# Routes /api/jobs
+# ----------------------
+def test_api_jobs():
+    client = app.app.test_client()
+    r = client.post("/api/jobs", json={"graph": "demo_small", "algo": "bellman", "source": "A", "timeout": 20})
+    assert r.status_code == 202 and r.headers["Location"].endswith(r.get_json()["id"])
+    r = client.get(f"/api/jobs/{r.get_json()['id']}?wait=10")
+    assert r.status_code == 200
+    job = r.get_json()
+    assert job["status"] == DONE
+    assert {row["node"]: row["distance"] for row in job["result"]["table"]}["D"] == 1.0
+
+
+@pytest.mark.parametrize("timeout", [0, -1, "abc", True, float("nan"), [1]])
+def test_api_jobs_timeout_invalide(timeout):
+    r = app.app.test_client().post(
+        "/api/jobs", json={"graph": "demo_small", "algo": "bellman", "source": "A", "timeout": timeout})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("wait", ["-1", "abc", "nan", "inf"])
+def test_api_jobs_wait_invalide(wait):
+    client = app.app.test_client()
+    job = client.post("/api/jobs", json={"graph": "demo_small", "algo": "bellman", "source": "A"}).get_json()
+    assert client.get(f"/api/jobs/{job['id']}?wait={wait}").status_code == 400
+    assert client.get("/api/jobs/inconnue").status_code == 404
@@ -0,0 +1,140 @@
+# test_loaders.py
+# ===========================================================
+# Chargement des fichiers d'arêtes (csv, tsv, edgelist, DIMACS, GraphML)
+# ===========================================================
+
+import pytest
+
+from loaders import GraphFormatError, load_graph
+
+# Petits blocs : les fichiers de test sont coupés au milieu des lignes
+TAILLES_BLOCS = [7, 64, 1 << 20]
+
+
+def aretes(G):
+    return sorted((u, v, w) for w, u, v in G.edges)
+
+
+def ecrire(tmp_path, nom, contenu):
+    path = tmp_path / nom
+    path.write_bytes(contenu.encode() if isinstance(contenu, str) else contenu)
+    return str(path)
+
+
+def charger(tmp_path, nom, contenu, **options):
+    return {taille: load_graph(ecrire(tmp_path, nom, contenu), chunk_bytes=taille, directed=True, **options)
+            for taille in TAILLES_BLOCS}
+
+
+def erreur(tmp_path, nom, contenu, **options):
+    # Même erreur (message et ligne) quelle que soit la taille des blocs
+    erreurs = set()
+    for taille in TAILLES_BLOCS:
+        with pytest.raises(GraphFormatError) as e:
+            load_graph(ecrire(tmp_path, nom, contenu), chunk_bytes=taille, **options)
+        erreurs.add((e.value.line, str(e.value)))
+    assert len(erreurs) == 1, erreurs
+    return erreurs.pop()
+
+
+def test_csv_noms_avec_entete_et_lignes_vides(tmp_path):
+    contenu = "\n\nsource,target,weight\nParis,Lyon,465\n\nLyon,Marseille,315.5\r\nParis,Lille,225\n"
+    for G in charger(tmp_path, "routes.csv", contenu).values():
+        assert aretes(G) == [("Lyon", "Marseille", 315.5), ("Paris", "Lille", 225.0), ("Paris", "Lyon", 465.0)]
+
+
+def test_csv_numerique_sans_poids(tmp_path):
+    contenu = "".join(f"{i},{i + 1}\n" for i in range(50))
+    for G in charger(tmp_path, "chaine.csv", contenu).values():
+        assert len(G.edges) == 50 and all(w == 1 for w, _, _ in G.edges)
+        assert ("1", "2") in {(u, v) for _, u, v in G.edges}
+
+
+def test_tsv_et_edgelist(tmp_path):
+    for G in charger(tmp_path, "g.tsv", "u\tv\tw\na\tb\t2\nb\tc\t3\n").values():
+        assert aretes(G) == [("a", "b", 2.0), ("b", "c", 3.0)]
+    for G in charger(tmp_path, "g.txt", "10  20 1.5\n20\t30   2\n").values():
+        assert aretes(G) == [("10", "20", 1.5), ("20", "30", 2.0)]
+
+
+def test_non_oriente_par_defaut(tmp_path):
+    G = load_graph(ecrire(tmp_path, "g.csv", "a,b,1\n"))
+    assert aretes(G) == [("a", "b", 1.0), ("b", "a", 1.0)]
+
+
+def test_csv_champs_entre_guillemets(tmp_path):
+    contenu = '"source","target","weight"\n"Saint-Étienne","Lyon",62\nLyon,"Paris",465\n'
+    for G in charger(tmp_path, "g.csv", contenu).values():
+        assert aretes(G) == [("Lyon", "Paris", 465.0), ("Saint-Étienne", "Lyon", 62.0)]
+
+
+@pytest.mark.parametrize("position", [0, 1, 3])
+def test_csv_separateur_entre_guillemets(tmp_path, position):
+    # Refusé avec son numéro de ligne, y compris en première ligne (pas pris pour un en-tête)
+    lignes = ["a,b,1", "b,c,2", "c,d,3", "d,e,4"]
+    lignes.insert(position, '"a, x",b,1')
+    line, message = erreur(tmp_path, "g.csv", "\n".join(lignes) + "\n")
+    assert line == position + 1
+    assert "guillemet" in message
+
+
+def test_csv_guillemet_dans_un_champ(tmp_path):
+    line, message = erreur(tmp_path, "g.csv", 'a,b,1\nb,c"d,2\n')
+    assert line == 2 and "guillemet" in message
+
+
+def test_csv_poids_invalides(tmp_path):
+    line, message = erreur(tmp_path, "g.csv", "source,target,weight\n\nParis,Lyon,465\nLyon,Nice,abc\n")
+    assert line == 4 and "abc" in message
+    line, message = erreur(tmp_path, "g.csv", "a,b,1\n\nb,c,inf\n")
+    assert line == 3 and "non fini" in message
+    line, _ = erreur(tmp_path, "g.csv", "1,2,3\n2,3,nan\n")
+    assert line == 2
+
+
+def test_nombre_de_colonnes(tmp_path):
+    line, message = erreur(tmp_path, "g.csv", "a,b,1\nb,c,2\nc,d\nd,e,4\n")
+    assert line == 3 and "3 colonnes" in message
+    line, _ = erreur(tmp_path, "g.txt", "1 2 3\n\n2 3\n")
+    assert line == 3
+    line, message = erreur(tmp_path, "g.csv", "\n\nseul\n")
+    assert line == 3 and "deux colonnes" in message
+
+
+def test_dimacs(tmp_path):
+    contenu = "c exemple\np sp 4 3\nc arcs\na 1 2 7\na 2 3 1\na 4 1 2\n"
+    for G in charger(tmp_path, "g.gr", contenu).values():
+        assert aretes(G) == [("1", "2", 7.0), ("2", "3", 1.0), ("4", "1", 2.0)]
+        assert G.number_of_nodes() == 4
+
+
+def test_dimacs_invalide(tmp_path):
+    with pytest.raises(GraphFormatError, match="p sp"):
+        load_graph(ecrire(tmp_path, "g.gr", "a 1 2 3\n"))
+    with pytest.raises(GraphFormatError, match="2 arcs annoncés"):
+        load_graph(ecrire(tmp_path, "g.gr", "p sp 3 2\na 1 2 3\n"))
+    with pytest.raises(GraphFormatError, match="hors de 1..3"):
+        load_graph(ecrire(tmp_path, "g.gr", "p sp 3 1\na 1 4 3\n"))
+    line, _ = erreur(tmp_path, "g.gr", "c x\np sp 3 2\na 1 2 3\na 2 x 1\n")
+    assert line == 4
+
+
+def test_graphml(tmp_path):
+    contenu = """<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <key id="d0" for="edge" attr.name="weight" attr.type="double"/>
+  <graph edgedefault="directed">
+    <node id="a"/><node id="b"/><node id="c"/>
+    <edge source="a" target="b"><data key="d0">2.5</data></edge>
+    <edge source="b" target="c"/>
+  </graph>
+</graphml>
+"""
+    G = load_graph(ecrire(tmp_path, "g.graphml", contenu))
+    assert G.is_directed()
+    assert aretes(G) == [("a", "b", 2.5), ("b", "c", 1.0)]
+
+
+def test_format_inconnu(tmp_path):
+    with pytest.raises(ValueError, match="inconnu"):
+        load_graph(ecrire(tmp_path, "g.xyz", "a b\n"))
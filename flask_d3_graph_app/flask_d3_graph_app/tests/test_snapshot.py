@@ -0,0 +1,159 @@
+# test_snapshot.py
+# ===========================================================
+# Instantanés binaires : aller-retour save_snapshot / load_snapshot
+# ===========================================================
+
+import json
+import math
+import os
+import random
+import struct
+
+import numpy as np
+import pytest
+
+import algorithms
+import apsp
+from algorithms import CompactGraph, Graph
+from alt import LandmarkIndex
+from ch import ContractionHierarchy
+from snapshot import INDEX_FIELDS, MAGIC, VERSION, load_snapshot, save_snapshot
+
+NOMS = ["Paris", "Besançon", "Zürich", "東京", "Łódź", "a", "b,c", "", "🚲"] + [f"s{i}" for i in range(40)]
+
+
+def graphe(directed, seed=3):
+    rng = random.Random(seed)
+    G = Graph(directed=directed, name="instantane")
+    for _ in range(150):
+        u, v = rng.sample(NOMS, 2)
+        G.add_edge(u, v, rng.randint(1, 30) + rng.random())
+    CG = CompactGraph.from_graph(G)
+    CG.name = G.name
+    return CG
+
+
+def index(G):
+    noms, origines, destinations, poids = G._arc_arrays()
+    noms = [str(s) for s in noms]
+    return {
+        "ch": ContractionHierarchy.build(noms, origines, destinations, poids),
+        "alt": LandmarkIndex.build(noms, origines, destinations, poids),
+    }
+
+
+@pytest.fixture
+def sauvegarde(tmp_path):
+    G = graphe(True)
+    indexes = index(G)
+    path = str(tmp_path / "g.cgs")
+    save_snapshot(path, G, indexes)
+    return path, G, indexes
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_aller_retour(tmp_path, directed):
+    G = graphe(directed)
+    path = str(tmp_path / "g.cgs")
+    save_snapshot(path, G)
+    H = load_snapshot(path)
+    assert (H.name, H.directed) == ("instantane", directed)
+    assert list(H.names) == list(G.names)
+    assert [H.names[i] for i in range(len(G.names))] == list(G.names)
+    for tableau in ("offsets", "targets", "weights"):
+        assert np.array_equal(np.asarray(getattr(H, tableau)), np.asarray(getattr(G, tableau)))
+    assert sorted(H.edges) == sorted(G.edges)
+    assert load_snapshot(path, "autre").name == "autre"
+    assert H.indexes == {}
+
+
+def test_table_des_noms(sauvegarde):
+    path, G, _ = sauvegarde
+    H = load_snapshot(path)
+    for i, nom in enumerate(G.names):
+        assert H.index[nom] == i
+        assert nom in H
+    for absent in ("Pari", "paris", "Besancon", "東", "s40", " a"):
+        assert absent not in H.index and absent not in H
+        with pytest.raises(KeyError):
+            H.index[absent]
+    with pytest.raises(KeyError):
+        H.index[5]
+    assert len(H.index) == len(G.names) and list(H.index) == list(G.names)
+
+
+def test_index_embarques(sauvegarde, tmp_path, monkeypatch):
+    path, G, indexes = sauvegarde
+    H = load_snapshot(path)
+    assert set(H.indexes) == {"ch", "alt"}
+    for nom, champs in INDEX_FIELDS.items():
+        for champ in champs:
+            assert np.array_equal(H.indexes[nom][champ], np.asarray(getattr(indexes[nom], champ)))
+
+    # Les index embarqués servent tels quels : rien n'est calculé ni écrit dans STORE_DIR
+    monkeypatch.setattr(apsp, "STORE_DIR", str(tmp_path / "apsp"))
+    monkeypatch.setattr(ContractionHierarchy, "build", None)
+    monkeypatch.setattr(LandmarkIndex, "build", None)
+    rng = random.Random(0)
+    for _ in range(30):
+        s, t = rng.sample(NOMS, 2)
+        attendu = G.dijkstra(s).get(t, math.inf)
+        for engine in ("ch", "alt"):
+            chemin, cout = algorithms.dijkstra(H, s, t, engine)
+            assert (math.isinf(cout) and math.isinf(attendu)) or cout == pytest.approx(attendu), (engine, s, t)
+    assert not os.path.exists(tmp_path / "apsp")
+
+
+def _taille_utile(path):
+    # Fin de la dernière section (le fichier peut se terminer par du bourrage)
+    with open(path, "rb") as f:
+        _, _, taille = struct.unpack("<8sII", f.read(16))
+        entete = json.loads(f.read(taille))
+    debut = -(-(16 + taille) // 64) * 64
+    return debut + max(d["offset"] + np.dtype(d["dtype"]).itemsize * int(np.prod(d["shape"]))
+                       for d in entete["sections"].values()), taille
+
+
+def test_magic_et_version_refuses(sauvegarde, tmp_path):
+    path, _, _ = sauvegarde
+    with open(path, "rb") as f:
+        contenu = f.read()
+    faux = tmp_path / "faux.cgs"
+    faux.write_bytes(b"PASUNCGS" + contenu[8:])
+    with pytest.raises(ValueError, match="pas un instantané"):
+        load_snapshot(str(faux))
+    faux.write_bytes(MAGIC + struct.pack("<I", VERSION + 1) + contenu[12:])
+    with pytest.raises(ValueError, match="version"):
+        load_snapshot(str(faux))
+
+
+def test_fichier_tronque(sauvegarde, tmp_path):
+    path, _, _ = sauvegarde
+    with open(path, "rb") as f:
+        contenu = f.read()
+    utile, taille_entete = _taille_utile(path)
+    for coupe in (0, 5, 12, 16 + taille_entete // 2, 16 + taille_entete, (16 + taille_entete + utile) // 2, utile - 1):
+        tronque = tmp_path / f"t{coupe}.cgs"
+        tronque.write_bytes(contenu[:coupe])
+        with pytest.raises(ValueError):
+            load_snapshot(str(tronque))
+
+
+def test_alt_embarque_mis_a_jour_apres_modification(sauvegarde, tmp_path, monkeypatch):
+    # Après des mises à jour de poids, l'index ALT de l'instantané sert de
+    # point de départ : seules les distances touchées sont recalculées
+    path, G, _ = sauvegarde
+    H = load_snapshot(path, "instantane_modifie")
+    monkeypatch.setattr(apsp, "STORE_DIR", str(tmp_path / "apsp"))
+    monkeypatch.setattr(LandmarkIndex, "build", None)
+    rng = random.Random(4)
+    arcs = rng.sample([(u, v) for _, u, v in H.edges], 5)
+    algorithms.apply_changes(H, [("update", u, v, rng.randint(1, 60)) for u, v in arcs])
+    index = algorithms.landmark_index(H)
+    assert np.array_equal(index.poids, np.asarray(H.weights))
+    assert not np.shares_memory(index.forward, H.indexes["alt"]["forward"])
+    for _ in range(30):
+        s, t = rng.sample(NOMS, 2)
+        attendu = H.dijkstra(s).get(t, math.inf)
+        _, cout = algorithms.dijkstra(H, s, t, "alt")
+        assert (math.isinf(cout) and math.isinf(attendu)) or cout == pytest.approx(attendu), (s, t)